@@ -11,6 +11,8 @@ class Settings(BaseSettings):
     
     # YouTube API
     youtube_api_key: str = ""
+    # Point at a local stand-in (see bench/fake_youtube.py) for offline runs
+    youtube_api_base: str = "https://www.googleapis.com/youtube/v3"
     
     # CORS
     cors_origins: str = ""
@@ -27,6 +29,27 @@ class Settings(BaseSettings):
     fee_decay_threshold: float = 500_000  # Fee normalizes after this many tokens are bought
     initial_token_supply: float = 9_000_000  # Initial pool token supply
     
+    # Background jobs (intervals in seconds; 0 = only when triggered manually)
+    scheduler_enabled: bool = True
+    schedule_daily_maintenance_s: float = 86_400
+    schedule_creator_stats_s: float = 86_400
+    schedule_avatars_s: float = 604_800
+    trade_events_interval_s: float = 30.0  # How often pool trade aggregates are folded in
+    export_dir: str = ""  # Background ledger exports; defaults to <tmp>/nombre-exports
+    
+    # Request instrumentation (Server-Timing headers are always sent)
+    log_requests: bool = True  # One JSON log line per request
+    slow_request_ms: float = 1000.0  # Slower requests also log every DB / YouTube call
+    metrics_token: str = ""  # GET /metrics requires "Authorization: Bearer <token>"; unset = disabled unless debug
+    tracing_exporter: str = ""  # "", "console", "file" or "otel" (see utils/tracing.py)
+    tracing_file: str = "traces.jsonl"  # Used by the "file" exporter
+    
+    # Startup warm-up and caches (see services/warmup.py)
+    warmup_concurrency: int = 2  # Warm-up tasks loading at once
+    warmup_timeout_s: float = 30.0  # /health?ready=true reports ready after this even if still warming
+    leaderboard_cache_ttl_s: float = 30.0  # Max age of the ranked leaderboard snapshot; 0 = rebuild per request
+    response_cache_size: int = 256  # Rendered public GET responses kept by ETag (utils/http_cache.py); 0 = off
+    
     # Security
     cron_secret: str = ""
     
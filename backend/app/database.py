@@ -1,18 +1,101 @@
-from supabase import create_client, Client
+import threading
+from typing import TYPE_CHECKING, Any
+
 from .config import get_settings
+from .utils.request_metrics import timed_call
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+# The supabase SDK (postgrest, gotrue, storage, realtime) takes ~250ms to
+# import, so it's imported on first use rather than when the app loads.
+_supabase_client: "Client | None" = None
+_client_lock = threading.Lock()
+
+# Builder methods that name the kind of query, e.g. "transactions.select"
+_QUERY_VERBS = {"select", "insert", "update", "upsert", "delete"}
+
+
+class _TimedBuilder:
+    """Wraps a PostgREST request builder so execute() is timed and counted."""
+
+    def __init__(self, builder: Any, label: str):
+        self._builder = builder
+        self._label = label
+
+    def __getattr__(self, attr: str) -> Any:
+        value = getattr(self._builder, attr)
+        if attr == "execute":
+            def execute():
+                with timed_call("db", self._label):
+                    return value()
+            return execute
+
+        label = f"{self._label}.{attr}" if attr in _QUERY_VERBS else self._label
+        if callable(value):
+            def chain(*args, **kwargs):
+                result = value(*args, **kwargs)
+                return _TimedBuilder(result, label) if hasattr(result, "execute") else result
+            return chain
+        # Properties such as .not_ return builders too
+        return _TimedBuilder(value, label) if hasattr(value, "execute") else value
+
+
+class _TimedNamespace:
+    """Times every method call on a sub-client (e.g. client.auth)."""
+
+    def __init__(self, target: Any, label: str):
+        self._target = target
+        self._label = label
+
+    def __getattr__(self, attr: str) -> Any:
+        value = getattr(self._target, attr)
+        if not callable(value):
+            return value
+
+        def call(*args, **kwargs):
+            with timed_call("db", f"{self._label}.{attr}"):
+                return value(*args, **kwargs)
+        return call
+
+
+class InstrumentedClient:
+    """
+    Thin wrapper around the Supabase client that counts and times every
+    round trip against the current request (see utils/request_metrics.py).
+    Everything else is passed through unchanged.
+    """
+
+    def __init__(self, client: "Client"):
+        self._client = client
+        self.auth = _TimedNamespace(client.auth, "auth")
+
+    def table(self, table_name: str) -> _TimedBuilder:
+        return _TimedBuilder(self._client.table(table_name), table_name)
+
+    from_ = table
+
+    def rpc(self, fn: str, params: dict = None, **kwargs) -> _TimedBuilder:
+        return _TimedBuilder(self._client.rpc(fn, params, **kwargs), f"rpc:{fn}")
 
-_supabase_client: Client | None = None
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._client, attr)
 
 
-def get_supabase() -> Client:
-    """Get Supabase client singleton."""
+def get_supabase() -> "Client":
+    """Get Supabase client singleton (instrumented, see InstrumentedClient)."""
     global _supabase_client
     
     if _supabase_client is None:
-        settings = get_settings()
-        _supabase_client = create_client(
-            settings.supabase_url,
-            settings.supabase_service_key
-        )
+        # Startup warm-up (worker thread) and the first request can race here
+        with _client_lock:
+            if _supabase_client is None:
+                from supabase import create_client
+                
+                settings = get_settings()
+                _supabase_client = InstrumentedClient(create_client(
+                    settings.supabase_url,
+                    settings.supabase_service_key
+                ))
     
     return _supabase_client
@@ -1,85 +1,215 @@
-from fastapi import FastAPI
+"""
+Nombre API
+
+create_app() builds the FastAPI app. uvicorn calls it as a factory
+(`uvicorn --factory app.main:create_app`), so importing this module builds
+nothing; the routers are imported when the app is created.
+
+Nothing else slow happens at startup. The Supabase SDK, numpy (CPI) and the
+YouTube service are imported on first use, and the lifespan handler warms
+clients and caches in the background (services/warmup.py), so the process
+answers /health as soon as uvicorn is listening; /health?ready=true answers
+503 until warm-up is done.
+"""
+
+import asyncio
+import re
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+from fastapi import APIRouter, FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
 
 from .config import get_settings
-from .routers import auth, users, creators, trading, portfolio, leaderboard, maintenance, admin
-
-settings = get_settings()
-
-# DEBUG: Log loaded settings at startup
-print(f"=== STARTUP DEBUG ===")
-print(f"SUPABASE_URL: '{settings.supabase_url[:30]}...' (len={len(settings.supabase_url)})" if settings.supabase_url else "SUPABASE_URL: EMPTY!")
-print(f"SUPABASE_SERVICE_KEY: '{settings.supabase_service_key[:10]}...' (len={len(settings.supabase_service_key)})" if settings.supabase_service_key else "SUPABASE_SERVICE_KEY: EMPTY!")
-print(f"CORS_ORIGINS: '{settings.cors_origins}'")
-print(f"=== END DEBUG ===")
-
-app = FastAPI(
-    title="Nombre API",
-    description="SocialFi Creator Stock Trading Platform",
-    version="0.1.0",
-    docs_url="/docs" if settings.debug else None,
-    redoc_url="/redoc" if settings.debug else None,
-)
-
-# CORS Configuration
-raw_origins = settings.cors_origins.split(",")
-origins = []
-for origin in raw_origins:
-    origin = origin.strip()
-    # Remove quotes if user added them
-    origin = origin.replace('"', '').replace("'", "")
-    # Remove trailing slash if present
-    if origin.endswith("/"):
-        origin = origin[:-1]
-    if origin:  # Only add non-empty origins
-        origins.append(origin)
-
-# Check if wildcard mode
-is_wildcard = "*" in origins or not origins
-
-print(f"DEBUG CORS: origins={origins}, is_wildcard={is_wildcard}")
-
-if is_wildcard:
-    # Use regex to match any origin - this properly handles preflight
-    app.add_middleware(
-        CORSMiddleware,
-        allow_origin_regex=r".*",  # Match any origin
-        allow_credentials=False,   # Required when allowing all origins
-        allow_methods=["*"],
-        allow_headers=["*"],
-    )
-else:
-    # Explicit origins - enable credentials
-    app.add_middleware(
-        CORSMiddleware,
-        allow_origins=origins,
-        allow_credentials=True,
-        allow_methods=["*"],
-        allow_headers=["*"],
+from .services.leaderboard_service import get_leaderboard_cache
+from .services.rolling_stats import BUCKET_SECONDS, get_rolling_stats
+from .services.warmup import get_warmup
+from .utils.http_cache import CacheRule, HttpCacheMiddleware, data_versions
+from .utils.http_client import close_http_client
+from .utils.metrics import render_metrics
+from .utils.request_metrics import RequestMetricsMiddleware
+from .utils.tracing import configure_tracing
+
+# Root, health and metrics endpoints (no prefix)
+service_router = APIRouter()
+
+
+def _cors_origins(raw: str) -> List[str]:
+    """Parse CORS_ORIGINS; tolerates quotes, spaces and trailing slashes."""
+    origins = []
+    for origin in raw.split(","):
+        origin = origin.strip()
+        # Remove quotes if user added them
+        origin = origin.replace('"', '').replace("'", "")
+        # Remove trailing slash if present
+        if origin.endswith("/"):
+            origin = origin[:-1]
+        if origin:  # Only add non-empty origins
+            origins.append(origin)
+    return origins
+
+
+def _rolling_version() -> tuple:
+    # Rolling 24h values move as 5-minute buckets expire, with or without writes
+    return (get_rolling_stats().hydrated, int(time.time() // BUCKET_SECONDS))
+
+
+def _leaderboard_version(match: re.Match) -> Optional[tuple]:
+    generation = get_leaderboard_cache().version()
+    return (generation,) if generation is not None else None
+
+
+# Public reads that only change when pool/creator data is written (utils/http_cache.py).
+# Detail and history are revalidated on every use, since a trader expects their
+# own trade to show up right away; a 304 is still cheap.
+CACHE_RULES = [
+    CacheRule(
+        "creators", re.compile(r"^/api/v1/creators$"),
+        lambda match: (data_versions.all_pools(), _rolling_version()),
+        "public, max-age=5, stale-while-revalidate=30",
+    ),
+    CacheRule(
+        "creator", re.compile(r"^/api/v1/creators/(?P<creator_id>[^/]+)$"),
+        lambda match: (data_versions.creator(match["creator_id"]), _rolling_version()),
+        "public, no-cache",
+    ),
+    CacheRule(
+        "price_history", re.compile(r"^/api/v1/creators/(?P<creator_id>[^/]+)/price-history$"),
+        lambda match: (data_versions.creator(match["creator_id"]), int(time.time() // BUCKET_SECONDS)),
+        "public, no-cache",
+    ),
+    # Includes the caller's rank, so keyed on their Authorization header
+    CacheRule(
+        "leaderboard", re.compile(r"^/api/v1/leaderboard$"), _leaderboard_version,
+        "private, max-age=10, stale-while-revalidate=30", private=True,
+    ),
+]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background warm-up and the scheduler; release shared resources on shutdown."""
+    settings = get_settings()
+    warm_up = asyncio.create_task(get_warmup().run(settings.warmup_concurrency))
+
+    scheduler = None
+    if settings.scheduler_enabled:
+        from .services.scheduler import get_scheduler
+        scheduler = get_scheduler()
+        scheduler.start()
+
+    try:
+        yield
+    finally:
+        warm_up.cancel()
+        if scheduler is not None:
+            await scheduler.stop()
+        await close_http_client()
+
+
+def create_app() -> FastAPI:
+    """Build the API: middleware, routers and lifespan."""
+    # Imported here so importing app.main for its helpers doesn't build every router
+    from .routers import auth, users, creators, trading, portfolio, leaderboard, maintenance, admin
+
+    settings = get_settings()
+    configure_tracing(settings.tracing_exporter, settings.tracing_file)
+
+    app = FastAPI(
+        title="Nombre API",
+        description="SocialFi Creator Stock Trading Platform",
+        version="0.1.0",
+        docs_url="/docs" if settings.debug else None,
+        redoc_url="/redoc" if settings.debug else None,
+        # orjson renders responses several times faster than the stdlib encoder
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan,
     )
 
-# Include routers
-app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
-app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
-app.include_router(creators.router, prefix="/api/v1/creators", tags=["creators"])
-app.include_router(trading.router, prefix="/api/v1/trade", tags=["trading"])
-app.include_router(portfolio.router, prefix="/api/v1/portfolio", tags=["portfolio"])
-app.include_router(leaderboard.router, prefix="/api/v1/leaderboard", tags=["leaderboard"])
-app.include_router(maintenance.router, prefix="/api/v1/maintenance", tags=["maintenance"])
-app.include_router(admin.router, prefix="/api/v1/admin", tags=["admin"])
+    # Innermost, so cached bodies never carry another request's CORS headers
+    app.add_middleware(HttpCacheMiddleware, rules=CACHE_RULES, max_entries=settings.response_cache_size)
+
+    # CORS Configuration
+    origins = _cors_origins(settings.cors_origins)
+
+    # Check if wildcard mode
+    is_wildcard = "*" in origins or not origins
 
+    if is_wildcard:
+        # Use regex to match any origin - this properly handles preflight
+        app.add_middleware(
+            CORSMiddleware,
+            allow_origin_regex=r".*",  # Match any origin
+            allow_credentials=False,   # Required when allowing all origins
+            allow_methods=["*"],
+            allow_headers=["*"],
+        )
+    else:
+        # Explicit origins - enable credentials
+        app.add_middleware(
+            CORSMiddleware,
+            allow_origins=origins,
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+        )
 
-@app.get("/")
+    # Outermost, so timings cover CORS handling and every route
+    app.add_middleware(RequestMetricsMiddleware)
+
+    # Include routers
+    app.include_router(service_router)
+    app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
+    app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
+    app.include_router(creators.router, prefix="/api/v1/creators", tags=["creators"])
+    app.include_router(trading.router, prefix="/api/v1/trade", tags=["trading"])
+    app.include_router(portfolio.router, prefix="/api/v1/portfolio", tags=["portfolio"])
+    app.include_router(leaderboard.router, prefix="/api/v1/leaderboard", tags=["leaderboard"])
+    app.include_router(maintenance.router, prefix="/api/v1/maintenance", tags=["maintenance"])
+    app.include_router(admin.router, prefix="/api/v1/admin", tags=["admin"])
+
+    return app
+
+
+@service_router.get("/")
 async def root():
     """Health check endpoint."""
     return {"status": "ok", "message": "Nombre API is running"}
 
 
-@app.get("/health")
-async def health():
-    """Detailed health check."""
-    return {
+@service_router.get("/health")
+async def health(ready: bool = False):
+    """
+    Detailed health check.
+
+    With ?ready=true this is a readiness check: it reports startup warm-up
+    per cache and answers 503 until the worker is warm (services/warmup.py).
+    """
+    body = {
         "status": "healthy",
         "version": "0.1.0",
-        "debug": settings.debug
+        "debug": get_settings().debug
     }
+    if not ready:
+        return body
+
+    warmup = get_warmup().status()
+    body["warmup"] = warmup
+    if not warmup["ready"]:
+        body["status"] = "warming"
+        return JSONResponse(body, status_code=503)
+    return body
+
+
+@service_router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics(authorization: str = Header(default="")):
+    """Prometheus metrics for this process; needs METRICS_TOKEN unless DEBUG is on."""
+    settings = get_settings()
+    if not settings.metrics_token:
+        if not settings.debug:
+            raise HTTPException(status_code=404, detail="Metrics are disabled (set METRICS_TOKEN)")
+    elif authorization != f"Bearer {settings.metrics_token}":
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
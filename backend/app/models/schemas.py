@@ -92,6 +92,8 @@ class PoolResponse(BaseModel):
     volume_24h: float = 0.0
     market_cap: float = 0.0
     holder_count: int = 0
+    trade_count: int = 0
+    fees_collected: float = 0.0
     created_at: datetime
     
     class Config:
@@ -240,6 +242,41 @@ class PriceHistoryResponse(BaseModel):
     prices: List[PricePoint]
 
 
+# ============ Creator Fundamentals ============
+
+class FundamentalsPoint(BaseModel):
+    recorded_at: datetime
+    subscriber_count: int
+    view_count_30d: int
+    view_count_lifetime: int
+    video_count: int
+    cpi_score: float
+
+
+class FundamentalsGrowth(BaseModel):
+    days: float
+    subscriber_delta: int
+    subscribers_per_day: float
+    cpi_delta: float
+
+
+class FundamentalsResponse(BaseModel):
+    creator_id: str
+    points: List[FundamentalsPoint]
+    velocity_7d: Optional[FundamentalsGrowth] = None
+    growth_period: Optional[FundamentalsGrowth] = None
+
+
+class CreatorVelocity(BaseModel):
+    creator_id: str
+    subscriber_count: int
+    subscriber_delta: int
+    subscribers_per_day: float
+    cpi_score: float
+    cpi_delta: float
+    days_covered: float
+
+
 # ============ Error Response ============
 
 class ErrorDetail(BaseModel):
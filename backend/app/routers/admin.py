@@ -5,13 +5,21 @@ Provides administrative endpoints for user management, platform stats,
 and portfolio inspection. All endpoints require admin privileges.
 """
 
-from datetime import datetime, timedelta, timezone
+import os
+from datetime import datetime, timezone
 from typing import Optional, List
 from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import FileResponse, StreamingResponse
 
 from ..database import get_supabase
 from ..models.schemas import PortfolioResponse
+from ..services.ledger_service import (
+    LedgerFilters, filtered_query, search_page, iter_export, parquet_available,
+    export_dir, EXPORT_MEDIA_TYPES
+)
 from ..services.portfolio_service import get_user_holdings
+from ..services.scheduler import get_scheduler
+from ..utils.pagination import after_keyset, decode_cursor, encode_cursor
 from .auth import require_admin
 
 router = APIRouter()
@@ -64,32 +72,14 @@ async def get_platform_stats(admin_user: dict = Depends(require_admin)):
     supabase = get_supabase()
     
     try:
-        # Total users count
-        users_response = supabase.table("users").select("id", count="exact").execute()
-        total_users = users_response.count or 0
-        
-        # New users in last 24h
-        yesterday = datetime.now(timezone.utc) - timedelta(hours=24)
-        new_users_response = supabase.table("users").select("id", count="exact").gte(
-            "created_at", yesterday.isoformat()
-        ).execute()
-        new_users_24h = new_users_response.count or 0
-        
-        # Total NMBR circulating (sum of all user balances)
-        balances_response = supabase.table("users").select("nmbr_balance").execute()
-        total_nmbr = sum(u.get("nmbr_balance", 0) for u in (balances_response.data or []))
-        
-        # 24h volume from transactions
-        volume_response = supabase.table("transactions").select("nmbr_amount").gte(
-            "created_at", yesterday.isoformat()
-        ).execute()
-        volume_24h = sum(abs(t.get("nmbr_amount", 0)) for t in (volume_response.data or []))
+        # Maintained by triggers (013_platform_counters.sql) - one O(1) read
+        stats = supabase.rpc("get_platform_stats", {}).execute().data or {}
         
         return AdminStatsResponse(
-            total_users=total_users,
-            new_users_24h=new_users_24h,
-            total_nmbr_circulating=total_nmbr,
-            volume_24h=volume_24h,
+            total_users=int(stats.get("total_users") or 0),
+            new_users_24h=int(stats.get("new_users_24h") or 0),
+            total_nmbr_circulating=float(stats.get("nmbr_circulating") or 0),
+            volume_24h=float(stats.get("volume_24h") or 0),
             system_status="healthy"  # Can expand with actual health checks
         )
     except Exception as e:
@@ -356,9 +346,10 @@ class AdminTransactionItem(BaseModel):
 
 class AdminTransactionListResponse(BaseModel):
     transactions: List[AdminTransactionItem]
-    total: int
+    total: Optional[int] = None  # None when count="none"
     limit: int
     offset: int
+    next_cursor: Optional[str] = None  # Pass as `cursor` for the next page
 
 
 @router.get("/transactions", response_model=AdminTransactionListResponse)
@@ -372,93 +363,57 @@ async def list_transactions(
     time_range: Optional[str] = Query("all", enum=["24h", "7d", "30d", "all"]),
     type: Optional[str] = None,
     min_amount: Optional[float] = None,
-    max_amount: Optional[float] = None
+    max_amount: Optional[float] = None,
+    cursor: Optional[str] = None,
+    count: str = Query("exact", enum=["exact", "planned", "estimated", "none"])
 ):
     """
     Global Ledger: Get paginated list of all transactions.
     Supports filtering by user, pool, search string, time range, type, and amount.
+    
+    Pagination: pass `next_cursor` back as `cursor` to get the next page in
+    constant time (keyset on created_at, id); `offset` still works but gets
+    slower the deeper it goes. `count` picks how `total` is computed -
+    "planned"/"estimated" use Postgres statistics instead of a full count,
+    "none" skips it. Searches only count in "exact" mode.
     """
     supabase = get_supabase()
     
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    filters = LedgerFilters.from_params(
+        time_range, search=search, user_id=user_id, pool_id=pool_id, type=type,
+        min_amount=min_amount, max_amount=max_amount
+    )
+    
     try:
-        # Base query with joins
-        query = supabase.table("transactions").select(
-            "*, users(id, display_name, username, avatar_url), pools(creators(display_name, token_symbol))",
-            count="exact"
-        )
-        
-        # Apply Filters
-        if user_id:
-            query = query.eq("user_id", user_id)
-            
-        if pool_id:
-            query = query.eq("pool_id", pool_id)
-
-        if type:
-            query = query.eq("type", type)
-
-        if min_amount is not None:
-            query = query.gte("nmbr_amount", min_amount)
-
-        if max_amount is not None:
-            query = query.lte("nmbr_amount", max_amount)
-
-        if time_range != "all":
-            now = datetime.now(timezone.utc)
-            if time_range == "24h":
-                start_time = now - timedelta(hours=24)
-            elif time_range == "7d":
-                start_time = now - timedelta(days=7)
-            elif time_range == "30d":
-                start_time = now - timedelta(days=30)
-            
-            query = query.gte("created_at", start_time.isoformat())
-            
-        # Enhanced Search Logic
         if search:
-            # 1. Search Users
-            users = supabase.table("users").select("id").or_(f"username.ilike.%{search}%,display_name.ilike.%{search}%").execute()
-            user_ids = [u["id"] for u in (users.data or [])]
-            
-            # 2. Search Creators/Tokens -> Pools
-            # We need to find pools where the creator matches
-            # 'pool_ids' will come from 'pools' table, so we need to find pools where creator matches
-            # Since join filtering is complex, we search creators first then pools
-            creators = supabase.table("creators").select("id").or_(f"token_symbol.ilike.%{search}%,display_name.ilike.%{search}%").execute()
-            creator_ids = [c["id"] for c in (creators.data or [])]
-            
-            pool_ids = []
-            if creator_ids:
-                pools_resp = supabase.table("pools").select("id").in_("creator_id", creator_ids).execute()
-                pool_ids = [p["id"] for p in (pools_resp.data or [])]
-            
-            # 3. Construct OR condition for transactions
-            or_conditions = []
-            
-            # ID match (if valid UUID ish)
-            if len(search) > 20: 
-                or_conditions.append(f"id.eq.{search}")
-            
-            if user_ids:
-                or_conditions.append(f"user_id.in.({','.join(user_ids)})")
-            
-            if pool_ids:
-                or_conditions.append(f"pool_id.in.({','.join(pool_ids)})")
-                
-            if or_conditions:
-                query = query.or_(",".join(or_conditions))
+            # Matching users/creators/ids, filters and paging in one call
+            rows, total = search_page(filters, after, offset, limit, count)
+        else:
+            query = filtered_query(filters, count=None if count == "none" else count)
+
+            # Order and paginate; id breaks ties so pages never overlap.
+            # One extra row tells whether there is a next page.
+            query = query.order("created_at", desc=True).order("id", desc=True)
+            if after:
+                query = after_keyset(query, after["value"], after["id"], descending=True).limit(limit + 1)
             else:
-                # No matches found for users/creators, and search string is likely not an ID
-                # Force no results
-                query = query.eq("id", "00000000-0000-0000-0000-000000000000")
-
-        # Order and paginate
-        query = query.order("created_at", desc=True).range(offset, offset + limit - 1)
+                query = query.range(offset, offset + limit)
+            
+            response = query.execute()
+            rows = response.data or []
+            total = None if count == "none" else (response.count or 0)
         
-        response = query.execute()
+        next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
         
         txs = []
-        for row in (response.data or []):
+        for row in rows[:limit]:
             user_data = row.get("users") or {}
             pool_data = row.get("pools") or {}
             creator_data = pool_data.get("creators") or {}
@@ -488,15 +443,91 @@ async def list_transactions(
             
         return AdminTransactionListResponse(
             transactions=txs,
-            total=response.count or 0,
+            total=total,
             limit=limit,
-            offset=offset
+            offset=offset,
+            next_cursor=next_cursor
         )
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch transactions: {str(e)}")
 
 
+@router.get("/transactions/export")
+async def export_transactions(
+    admin_user: dict = Depends(require_admin),
+    format: str = Query("csv", enum=["csv", "parquet"]),
+    background: bool = False,
+    search: Optional[str] = None,
+    user_id: Optional[str] = None,
+    pool_id: Optional[str] = None,
+    time_range: Optional[str] = Query("all", enum=["24h", "7d", "30d", "all"]),
+    type: Optional[str] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None
+):
+    """
+    Global Ledger: Export every matching transaction, newest first.
+    Takes the same filters as the ledger list.
+    
+    Streams the file directly; rows are read page by page, so memory stays
+    flat however large the range. With background=true the export is
+    written to disk by the "ledger_export" job instead; the returned
+    download_url answers 409 until the file is ready.
+    """
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=400, detail="Parquet export requires pyarrow on the server")
+    
+    filters = LedgerFilters.from_params(
+        time_range, search=search, user_id=user_id, pool_id=pool_id, type=type,
+        min_amount=min_amount, max_amount=max_amount
+    )
+    
+    if background:
+        try:
+            run_id = get_scheduler().enqueue("ledger_export", {"filters": filters.to_dict(), "format": format})
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to queue export: {str(e)}")
+        return {
+            "status": "queued",
+            "run_id": run_id,
+            "download_url": f"/api/v1/admin/transactions/export/{run_id}"
+        }
+    
+    filename = f"ledger-{datetime.now(timezone.utc):%Y%m%dT%H%M%S}.{format}"
+    return StreamingResponse(
+        iter_export(filters, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/transactions/export/{run_id}")
+async def download_transaction_export(
+    run_id: str,
+    admin_user: dict = Depends(require_admin)
+):
+    """
+    Global Ledger: Download a finished background export.
+    """
+    try:
+        run = get_scheduler().get_run(run_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch export: {str(e)}")
+    
+    if not run or run.get("job_name") != "ledger_export":
+        raise HTTPException(status_code=404, detail="Export not found")
+    if run["status"] != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Export is {run['status']}: {run.get('error') or 'not ready yet'}")
+    
+    result = run.get("result") or {}
+    path = os.path.join(export_dir(), os.path.basename(result.get("file", "")))
+    if not result.get("file") or not os.path.isfile(path):
+        raise HTTPException(status_code=410, detail="Export file has expired")
+    
+    return FileResponse(path, media_type=EXPORT_MEDIA_TYPES[result["format"]], filename=result["file"])
+
+
 @router.get("/transactions/{tx_id}", response_model=AdminTransactionItem)
 async def get_transaction_details(
     tx_id: str,
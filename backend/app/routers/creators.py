@@ -5,6 +5,7 @@ Handles creator listing, details, price history, and YouTube integration.
 """
 
 from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi.responses import ORJSONResponse
 from typing import Optional, List
 from datetime import datetime, timedelta
 from pydantic import BaseModel
@@ -12,9 +13,15 @@ import uuid
 
 from ..database import get_supabase
 from ..models.schemas import (
-    CreatorListItem, CreatorWithPool, PriceHistoryResponse, PricePoint
+    CreatorWithPool, PriceHistoryResponse,
+    FundamentalsResponse, CreatorVelocity
 )
-from ..services.youtube_service import youtube_service
+from ..services.youtube_service import get_youtube_service
+from ..services.rolling_stats import RollingStats, get_rolling_stats
+from ..services.fundamentals_service import (
+    snapshot_row, record_snapshots, get_fundamentals, get_velocity_leaders
+)
+from ..utils.http_cache import mark_changed
 from .auth import require_admin
 
 router = APIRouter()
@@ -40,6 +47,36 @@ class AddCreatorResponse(BaseModel):
 router = APIRouter()
 
 
+def creator_list_item(row: dict, rolling: RollingStats) -> dict:
+    """A creators row with its embedded pool as a CreatorListItem-shaped dict."""
+    pool = row.get("pools") or {}
+    if isinstance(pool, list):
+        pool = pool[0] if pool else {}
+    rolling.overlay(pool)
+    
+    return {
+        "id": row["id"],
+        "username": row["username"],
+        "display_name": row["display_name"],
+        "avatar_url": row.get("avatar_url"),
+        "subscriber_count": int(row.get("subscriber_count", 0)),
+        "token_symbol": row["token_symbol"],
+        "current_price": float(pool.get("current_price", 0)),
+        "price_change_24h": float(pool.get("price_change_24h", 0)),
+        "market_cap": float(pool.get("market_cap", 0)),
+        "volume_24h": float(pool.get("volume_24h", 0)),
+    }
+
+
+def price_point(row: dict) -> dict:
+    """A price_history row as a PricePoint-shaped dict (timestamp passed through as stored)."""
+    return {
+        "timestamp": row["timestamp"],
+        "price": float(row["price"]),
+        "volume": float(row.get("volume", 0)),
+    }
+
+
 @router.get("", response_model=dict)
 async def list_creators(
     limit: int = Query(default=20, ge=1, le=100),
@@ -57,7 +94,7 @@ async def list_creators(
         # Build query
         query = supabase.table("creators").select(
             "id, username, display_name, avatar_url, subscriber_count, token_symbol, "
-            "pools(current_price, price_change_24h, market_cap, volume_24h)",
+            "pools(id, current_price, price_change_24h, market_cap, volume_24h)",
             count="exact"
         )
         
@@ -68,42 +105,21 @@ async def list_creators(
         # Execute query
         response = query.range(offset, offset + limit - 1).execute()
         
-        # Transform results
-        creators = []
-        for row in response.data:
-            pool = row.get("pools") or {}
-            if isinstance(pool, list):
-                pool = pool[0] if pool else {}
-            
-            creators.append(CreatorListItem(
-                id=row["id"],
-                username=row["username"],
-                display_name=row["display_name"],
-                avatar_url=row.get("avatar_url"),
-                subscriber_count=row.get("subscriber_count", 0),
-                token_symbol=row["token_symbol"],
-                current_price=float(pool.get("current_price", 0)),
-                price_change_24h=float(pool.get("price_change_24h", 0)),
-                market_cap=float(pool.get("market_cap", 0)),
-                volume_24h=float(pool.get("volume_24h", 0))
-            ))
+        # Transform results (CreatorListItem-shaped dicts, serialized by orjson
+        # without building a model per row)
+        rolling = get_rolling_stats()
+        creators = [creator_list_item(row, rolling) for row in response.data]
         
-        # Sort by pool fields
-        sort_key = {
-            "price_change_24h": lambda x: x.price_change_24h,
-            "volume_24h": lambda x: x.volume_24h,
-            "market_cap": lambda x: x.market_cap,
-            "cpi_score": lambda x: x.subscriber_count  # Fallback to subscribers
-        }[sort_by]
+        # Sort by pool fields (cpi_score falls back to subscribers)
+        sort_field = "subscriber_count" if sort_by == "cpi_score" else sort_by
+        creators.sort(key=lambda x: x[sort_field], reverse=(order == "desc"))
         
-        creators.sort(key=sort_key, reverse=(order == "desc"))
-        
-        return {
+        return ORJSONResponse({
             "creators": creators,
             "total": response.count or len(creators),
             "limit": limit,
             "offset": offset
-        }
+        })
     except Exception as e:
         import traceback
         print(f"ERROR in list_creators: {e}")
@@ -129,6 +145,7 @@ async def get_creator(creator_id: str):
     pool_data = creator.get("pools")
     if isinstance(pool_data, list):
         pool_data = pool_data[0] if pool_data else None
+    get_rolling_stats().overlay(pool_data)
     
     return {
         **creator,
@@ -175,16 +192,40 @@ async def get_price_history(
         "timestamp", start_time.isoformat()
     ).order("timestamp", desc=False).execute()
     
-    prices = [
-        PricePoint(
-            timestamp=row["timestamp"],
-            price=float(row["price"]),
-            volume=float(row.get("volume", 0))
-        )
-        for row in history_response.data
-    ]
+    # Up to thousands of points: plain dicts, no PricePoint per row
+    return ORJSONResponse({"prices": [price_point(row) for row in history_response.data]})
+
+
+@router.get("/{creator_id}/fundamentals", response_model=FundamentalsResponse)
+async def get_creator_fundamentals(
+    creator_id: str,
+    period: str = Query(default="30d", regex="^(7d|30d|90d|1y|all)$"),
+    max_points: int = Query(default=500, ge=2, le=5000)
+):
+    """
+    Get CPI and YouTube fundamentals over time, with 7-day subscriber velocity.
+    Served from creator_stats_history - never calls YouTube.
+    """
+    period_days = {"7d": 7, "30d": 30, "90d": 90, "1y": 365, "all": None}
     
-    return PriceHistoryResponse(prices=prices)
+    try:
+        return get_fundamentals(creator_id, period_days[period], max_points)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get fundamentals: {str(e)}")
+
+
+@router.get("/fundamentals/velocity", response_model=List[CreatorVelocity])
+async def get_creator_velocity(
+    days: int = Query(default=7, ge=1, le=90),
+    limit: int = Query(default=20, ge=1, le=100)
+):
+    """
+    Fastest-growing creators by subscribers per day over the window.
+    """
+    try:
+        return get_velocity_leaders(days, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get creator velocity: {str(e)}")
 
 
 @router.get("/youtube/search", response_model=List[YouTubeSearchResult])
@@ -198,7 +239,7 @@ async def search_youtube_channels(
     try:
         # Check if it's a handle search
         if q.startswith("@"):
-            channel = await youtube_service.get_channel_by_handle(q)
+            channel = await get_youtube_service().get_channel_by_handle(q)
             if channel:
                 return [YouTubeSearchResult(
                     channel_id=channel["channel_id"],
@@ -210,7 +251,7 @@ async def search_youtube_channels(
             return []
         
         # Regular search
-        channels = await youtube_service.search_channel(q)
+        channels = await get_youtube_service().search_channel(q)
         return [
             YouTubeSearchResult(
                 channel_id=c["channel_id"],
@@ -250,19 +291,20 @@ async def add_creator_from_youtube(
         )
     
     # Fetch channel data from YouTube
-    channel_data = await youtube_service.get_channel_by_id(request.channel_id)
+    youtube = get_youtube_service()
+    channel_data = await youtube.get_channel_by_id(request.channel_id)
     
     if not channel_data:
         raise HTTPException(status_code=404, detail="YouTube channel not found")
     
     # Calculate 30-day views (this costs extra API quota)
     try:
-        view_count_30d = await youtube_service.calculate_30d_views(request.channel_id)
+        view_count_30d = await youtube.calculate_30d_views(request.channel_id)
     except Exception:
         view_count_30d = 0
     
     # Calculate CPI score using new formula
-    cpi_score = youtube_service.calculate_cpi_score(
+    cpi_score = youtube.calculate_cpi_score(
         channel_data["subscriber_count"],
         view_count_30d,
         channel_data["view_count_lifetime"]
@@ -271,8 +313,8 @@ async def add_creator_from_youtube(
     # Calculate initial price based on CPI
     # Formula: Market_Cap = CPI × $100, Price = Market_Cap / Supply
     token_supply = 9_000_000
-    initial_market_cap = youtube_service.calculate_initial_market_cap(cpi_score)
-    initial_price = youtube_service.calculate_initial_price(cpi_score, token_supply)
+    initial_market_cap = youtube.calculate_initial_market_cap(cpi_score)
+    initial_price = youtube.calculate_initial_price(cpi_score, token_supply)
     
     # Generate token symbol from username (NO $ prefix - stored clean)
     username = channel_data["username"].upper().replace(" ", "")[:6]
@@ -316,6 +358,8 @@ async def add_creator_from_youtube(
         }
         
         supabase.table("pools").insert(pool_data).execute()
+        get_rolling_stats().add_pool(pool_data["id"], initial_price)
+        mark_changed(creator_id)
         
         return AddCreatorResponse(
             success=True,
@@ -348,33 +392,38 @@ async def refresh_creator_stats(creator_id: str):
         raise HTTPException(status_code=400, detail="Creator has no linked YouTube channel")
     
     # Fetch fresh stats
-    stats = await youtube_service.get_channel_stats(channel_id)
+    youtube = get_youtube_service()
+    stats = await youtube.get_channel_stats(channel_id)
     
     if not stats:
         raise HTTPException(status_code=500, detail="Failed to fetch YouTube stats")
     
     # Calculate 30-day views
     try:
-        view_count_30d = await youtube_service.calculate_30d_views(channel_id)
+        view_count_30d = await youtube.calculate_30d_views(channel_id)
     except Exception:
         view_count_30d = creator.data.get("view_count_30d", 0)
     
     # Recalculate CPI with new formula
-    cpi_score = youtube_service.calculate_cpi_score(
+    cpi_score = youtube.calculate_cpi_score(
         stats["subscriber_count"],
         view_count_30d,
         stats["view_count_lifetime"]
     )
     
     # Update creator
+    now = datetime.utcnow().isoformat()
     supabase.table("creators").update({
         "subscriber_count": stats["subscriber_count"],
         "view_count_30d": view_count_30d,
         "view_count_lifetime": stats["view_count_lifetime"],
         "video_count": stats["video_count"],
         "cpi_score": cpi_score,
-        "updated_at": datetime.utcnow().isoformat()
+        "updated_at": now
     }).eq("id", creator_id).execute()
+    mark_changed(creator_id)
+    
+    record_snapshots([snapshot_row(creator_id, stats, view_count_30d, cpi_score, now)])
     
     return {
         "success": True,
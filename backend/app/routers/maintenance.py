@@ -2,11 +2,13 @@
 Maintenance Router
 
 Exposes endpoints for cron jobs (e.g. Supabase Edge Functions or pg_cron)
-to trigger daily maintenance tasks.
+to trigger daily maintenance tasks. Jobs run in the background scheduler;
+endpoints queue a run and return its id.
 """
 
-from fastapi import APIRouter, HTTPException, Header, Depends
-from ..services.maintenance_service import run_all_maintenance
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Header, Depends, Query
+from ..services.scheduler import get_scheduler, UnknownJobError
 from ..config import get_settings
 
 router = APIRouter()
@@ -25,23 +27,83 @@ async def verify_cron_secret(x_cron_secret: str = Header(None)):
     return True
 
 
+def _enqueue(job_name: str, params: Optional[dict] = None) -> dict:
+    try:
+        run_id = get_scheduler().enqueue(job_name, params)
+    except UnknownJobError:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_name}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to enqueue {job_name}: {str(e)}")
+    return {
+        "status": "queued",
+        "job": job_name,
+        "run_id": run_id,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
 @router.post("/run-daily", response_model=dict)
 async def trigger_daily_maintenance(
     authorized: bool = Depends(verify_cron_secret)
 ):
     """
-    Trigger the daily maintenance tasks.
-    Should be called once every 24 hours (e.g. at 00:00 UTC).
+    Queue the daily maintenance tasks and return immediately.
+    The scheduler also runs them every 24 hours; poll /runs/{run_id} for the outcome.
+    """
+    return _enqueue("daily_maintenance")
+
+
+@router.post("/refresh-creators", response_model=dict)
+async def trigger_creator_refresh(
+    resume: bool = Query(default=True, description="Continue from the last checkpoint"),
+    concurrency: int = Query(default=8, ge=1, le=32),
+    authorized: bool = Depends(verify_cron_secret)
+):
+    """
+    Queue a YouTube stats and CPI refresh for all creators.
+    Stops early (and can be resumed) if the YouTube quota runs out.
+    """
+    return _enqueue("refresh_creator_stats", {"resume": resume, "concurrency": concurrency})
+
+
+@router.post("/jobs/{job_name}/run", response_model=dict)
+async def trigger_job(
+    job_name: str,
+    authorized: bool = Depends(verify_cron_secret)
+):
+    """
+    Queue any registered job (daily_maintenance, refresh_creator_stats,
+    refresh_avatars, trade_events) with its default parameters.
+    """
+    return _enqueue(job_name)
+
+
+@router.get("/runs", response_model=dict)
+async def list_job_runs(
+    job: Optional[str] = Query(default=None, description="Filter by job name"),
+    limit: int = Query(default=20, ge=1, le=100),
+    authorized: bool = Depends(verify_cron_secret)
+):
+    """
+    Recent job runs, newest first, with status and duration.
     """
     try:
-        results = await run_all_maintenance()
-        return {
-            "status": "success",
-            "message": "Daily maintenance completed successfully",
-            "results": results,
-            "timestamp": datetime.utcnow().isoformat()
-        }
+        return {"runs": get_scheduler().get_runs(job, limit)}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=f"Failed to fetch job runs: {str(e)}")
+
+
+@router.get("/runs/{run_id}", response_model=dict)
+async def get_job_run(
+    run_id: str,
+    authorized: bool = Depends(verify_cron_secret)
+):
+    """
+    Status, result and duration of one job run.
+    """
+    run = get_scheduler().get_run(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Job run not found")
+    return run
 
 from datetime import datetime
@@ -6,6 +6,7 @@ Handles buy/sell quotes and trade execution.
 
 from fastapi import APIRouter, HTTPException, Depends
 from datetime import datetime, timedelta
+import time
 import uuid
 
 from ..database import get_supabase
@@ -17,12 +18,42 @@ from ..models.schemas import (
 )
 from ..services.trading_engine import get_trading_engine
 from ..services.portfolio_service import update_avg_buy_price, update_user_portfolio_stats
+from ..services.rolling_stats import get_rolling_stats
 from ..config import get_settings
+from ..utils.http_cache import mark_changed
+from ..utils.metrics import TRADE_QUOTES, TRADE_REJECTIONS, TRADES_EXECUTED, TRADE_SECONDS
+from ..utils.request_metrics import current_metrics
 from .auth import get_current_user
 
 router = APIRouter()
 
 
+def _trade_clock() -> tuple:
+    """Start point for _observe_trade: wall clock plus DB read/write time so far."""
+    metrics = current_metrics()
+    if metrics is None:
+        return time.perf_counter(), 0.0, 0.0
+    return time.perf_counter(), metrics.db_read_time_s, metrics.db_write_time_s
+
+
+def _observe_trade(side: str, pool: str, clock: tuple) -> None:
+    """
+    Record an executed trade and its latency split into stages:
+    fetch (DB reads), write (DB writes) and compute (everything else -
+    pricing, slippage checks, bookkeeping).
+    """
+    started, read_before, write_before = clock
+    total = time.perf_counter() - started
+    metrics = current_metrics()
+    fetch = metrics.db_read_time_s - read_before if metrics else 0.0
+    write = metrics.db_write_time_s - write_before if metrics else 0.0
+    TRADE_SECONDS.observe(fetch, side=side, stage="fetch")
+    TRADE_SECONDS.observe(write, side=side, stage="write")
+    TRADE_SECONDS.observe(max(total - fetch - write, 0.0), side=side, stage="compute")
+    TRADE_SECONDS.observe(total, side=side, stage="total")
+    TRADES_EXECUTED.inc(side=side, pool=pool)
+
+
 from .auth import get_current_user
 
 router = APIRouter()
@@ -39,6 +70,7 @@ async def get_trade_quote(
     supabase = get_supabase()
     settings = get_settings()
     engine = get_trading_engine()
+    TRADE_QUOTES.inc(side=request.type)
     
     # Get pool for creator
     pool_response = supabase.table("pools").select(
@@ -109,6 +141,7 @@ async def execute_trade(
     """
     supabase = get_supabase()
     engine = get_trading_engine()
+    clock = _trade_clock()
     
     # Validate input
     if request.amount <= 0:
@@ -142,6 +175,7 @@ async def execute_trade(
         
         # Check balance
         if user_balance < nmbr_amount:
+            TRADE_REJECTIONS.inc(side="buy", reason="insufficient_balance")
             raise HTTPException(
                 status_code=400,
                 detail=f"Insufficient balance. Required: {nmbr_amount}, Available: {user_balance}"
@@ -166,6 +200,7 @@ async def execute_trade(
         )
         
         if not is_ok:
+            TRADE_REJECTIONS.inc(side="buy", reason="slippage")
             raise HTTPException(
                 status_code=400,
                 detail=f"Slippage tolerance exceeded. Expected {expected_output:.4f} tokens but would receive {result.output_amount:.4f} ({actual_slippage:.2f}% slippage)"
@@ -178,18 +213,21 @@ async def execute_trade(
             "total_invested": float(current_user.get("total_invested", 0)) + nmbr_amount
         }).eq("id", user_id).execute()
         
-        # Update pool - include market_cap and volume_all_time
+        # Update pool - all-time volume, trade and holder counts are folded
+        # in from trade_events by the background consumer
         # Market cap = current_price × total_supply (10M tokens)
         total_token_supply = 10_000_000  # Total minted tokens
         new_market_cap = result.new_price * total_token_supply
         
+        # Trailing-24h volume and change from the in-memory rolling window
+        rolling = get_rolling_stats().record_trade(pool_id, result.new_price, nmbr_amount)
+        
         supabase.table("pools").update({
             "nmbr_reserve": result.new_nmbr_reserve,
             "token_supply": result.new_token_supply,
             "current_price": result.new_price,
             "market_cap": new_market_cap,
-            "volume_24h": float(pool.get("volume_24h", 0)) + nmbr_amount,
-            "volume_all_time": float(pool.get("volume_all_time", 0)) + nmbr_amount
+            **(rolling or {"volume_24h": float(pool.get("volume_24h", 0)) + nmbr_amount})
         }).eq("id", pool_id).execute()
         
         # Record price history
@@ -199,13 +237,14 @@ async def execute_trade(
             "volume": nmbr_amount,
         }).execute()
         
+        # Cached responses for this creator (utils/http_cache.py) are stale now
+        mark_changed(request.creator_id)
+        
         # Update or create holding
         holding_response = supabase.table("user_holdings").select("*").eq(
             "user_id", user_id
         ).eq("creator_id", request.creator_id).execute()
         
-        is_new_holder = not holding_response.data
-        
         # Track the final holding values for the response
         final_token_amount = result.output_amount
         final_avg_price = result.price_per_token
@@ -238,13 +277,6 @@ async def execute_trade(
                 "total_cost_basis": nmbr_amount
             }).execute()
         
-        # Update holder count if new holder
-        if is_new_holder:
-            current_holder_count = pool.get("holder_count", 0) or 0
-            supabase.table("pools").update({
-                "holder_count": current_holder_count + 1
-            }).eq("id", pool_id).execute()
-        
         # Create transaction record
         tx_data = {
             "user_id": user_id,
@@ -263,7 +295,7 @@ async def execute_trade(
         # Update portfolio stats
         await update_user_portfolio_stats(user_id)
         
-
+        _observe_trade("buy", creator.get("token_symbol", "unknown"), clock)
         
         # Calculate PnL for the total holding
         current_value = final_token_amount * result.new_price
@@ -298,12 +330,14 @@ async def execute_trade(
         ).eq("creator_id", request.creator_id).single().execute()
         
         if not holding_response.data:
+            TRADE_REJECTIONS.inc(side="sell", reason="no_holding")
             raise HTTPException(status_code=400, detail="You don't own any of these tokens")
         
         holding = holding_response.data
         current_holding = float(holding["token_amount"])
         
         if current_holding < token_amount:
+            TRADE_REJECTIONS.inc(side="sell", reason="insufficient_tokens")
             raise HTTPException(
                 status_code=400,
                 detail=f"Insufficient tokens. Have: {current_holding}, Selling: {token_amount}"
@@ -328,6 +362,7 @@ async def execute_trade(
         )
         
         if not is_ok:
+            TRADE_REJECTIONS.inc(side="sell", reason="slippage")
             raise HTTPException(
                 status_code=400,
                 detail=f"Slippage tolerance exceeded. Expected {expected_output:.4f} NMBR but would receive {result.output_amount:.4f} ({actual_slippage:.2f}% slippage)"
@@ -350,17 +385,20 @@ async def execute_trade(
             "total_invested": new_total_invested
         }).eq("id", user_id).execute()
         
-        # Update pool - include market_cap and volume_all_time
+        # Update pool - all-time volume, trade and holder counts are folded
+        # in from trade_events by the background consumer
         total_token_supply = 10_000_000  # Total minted tokens
         new_market_cap = result.new_price * total_token_supply
         
+        # Trailing-24h volume and change from the in-memory rolling window
+        rolling = get_rolling_stats().record_trade(pool_id, result.new_price, nmbr_gross)
+        
         supabase.table("pools").update({
             "nmbr_reserve": result.new_nmbr_reserve,
             "token_supply": result.new_token_supply,
             "current_price": result.new_price,
             "market_cap": new_market_cap,
-            "volume_24h": float(pool.get("volume_24h", 0)) + nmbr_gross,
-            "volume_all_time": float(pool.get("volume_all_time", 0)) + nmbr_gross
+            **(rolling or {"volume_24h": float(pool.get("volume_24h", 0)) + nmbr_gross})
         }).eq("id", pool_id).execute()
         
         # Record price history (use gross volume for consistency)
@@ -370,9 +408,11 @@ async def execute_trade(
             "volume": nmbr_gross,
         }).execute()
         
+        # Cached responses for this creator (utils/http_cache.py) are stale now
+        mark_changed(request.creator_id)
+        
         # Update holding
         new_token_amount = current_holding - token_amount
-        sold_all_tokens = new_token_amount <= 0
         
         if new_token_amount > 0:
             supabase.table("user_holdings").update({
@@ -382,14 +422,6 @@ async def execute_trade(
             # Remove holding if sold all
             supabase.table("user_holdings").delete().eq("id", holding["id"]).execute()
         
-        # Update holder count if sold all tokens
-        if sold_all_tokens:
-            current_holder_count = pool.get("holder_count", 0) or 0
-            if current_holder_count > 0:
-                supabase.table("pools").update({
-                    "holder_count": current_holder_count - 1
-                }).eq("id", pool_id).execute()
-        
         # Create transaction record
         tx_data = {
             "user_id": user_id,
@@ -408,7 +440,7 @@ async def execute_trade(
         # Update portfolio stats
         await update_user_portfolio_stats(user_id)
         
-
+        _observe_trade("sell", creator.get("token_symbol", "unknown"), clock)
         
         # Calculate remaining holding info
         remaining_holding = None
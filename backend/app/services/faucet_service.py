@@ -2,46 +2,44 @@
 Faucet Service
 
 Manages initial token distribution to new users with anti-cheat protection.
+
+The checks and the claim run as one conditional statement in the database
+(claim_faucet in 012_claim_faucet.sql), so concurrent claims can't both
+succeed. Fingerprints known to be used are remembered in a bounded
+in-memory cache, so repeat attempts during signup bursts are rejected
+without a round trip.
 """
 
-from typing import Tuple
+from collections import OrderedDict
+from typing import Optional, Tuple
 from ..database import get_supabase
 from ..config import get_settings
+from ..utils.metrics import CACHE_LOOKUPS
 
+# Max fingerprints remembered per process (LRU eviction)
+USED_FINGERPRINT_CACHE_SIZE = 10_000
 
-async def can_claim_faucet(
-    user_id: str,
-    device_fingerprint: str
-) -> Tuple[bool, str]:
-    """
-    Check if user can claim faucet tokens.
-    
-    Anti-cheat checks:
-    1. Has this user already claimed?
-    2. Is this device fingerprint already used?
-    
-    Returns:
-        (can_claim, reason_code)
-    """
-    supabase = get_supabase()
-    
-    # Check 1: Has user already claimed?
-    user_response = supabase.table("users").select(
-        "faucet_claimed"
-    ).eq("id", user_id).single().execute()
-    
-    if user_response.data and user_response.data.get("faucet_claimed"):
-        return False, "ALREADY_CLAIMED"
-    
-    # Check 2: Is device already used?
-    device_response = supabase.table("users").select("id").eq(
-        "device_fingerprint", device_fingerprint
-    ).neq("id", user_id).execute()
-    
-    if device_response.data and len(device_response.data) > 0:
-        return False, "DEVICE_BLOCKED"
-    
-    return True, "OK"
+# fingerprint -> id of the user who claimed with it. A used fingerprint
+# stays used (users.device_fingerprint is unique and never cleared), so
+# entries don't expire.
+_used_fingerprints: "OrderedDict[str, str]" = OrderedDict()
+
+
+def _remember_used(device_fingerprint: str, owner_id: Optional[str]) -> None:
+    if not owner_id:
+        return
+    _used_fingerprints[device_fingerprint] = owner_id
+    _used_fingerprints.move_to_end(device_fingerprint)
+    while len(_used_fingerprints) > USED_FINGERPRINT_CACHE_SIZE:
+        _used_fingerprints.popitem(last=False)
+
+
+def _cached_rejection(user_id: str, device_fingerprint: str) -> Optional[str]:
+    owner_id = _used_fingerprints.get(device_fingerprint)
+    if owner_id is None:
+        return None
+    _used_fingerprints.move_to_end(device_fingerprint)
+    return "ALREADY_CLAIMED" if owner_id == user_id else "DEVICE_BLOCKED"
 
 
 async def claim_faucet(
@@ -50,32 +48,34 @@ async def claim_faucet(
 ) -> Tuple[bool, float, str]:
     """
     Claim faucet tokens for a user.
-    
+
+    Anti-cheat checks (enforced atomically by the claim_faucet RPC):
+    1. Has this user already claimed?
+    2. Is this device fingerprint already used?
+
     Returns:
         (success, new_balance, error_code)
     """
+    rejection = _cached_rejection(user_id, device_fingerprint)
+    CACHE_LOOKUPS.inc(cache="used_fingerprints", result="hit" if rejection else "miss")
+    if rejection:
+        return False, 0.0, rejection
+
     settings = get_settings()
     supabase = get_supabase()
-    
-    # Check if can claim
-    can_claim, reason = await can_claim_faucet(user_id, device_fingerprint)
-    
-    if not can_claim:
-        return False, 0.0, reason
-    
-    # Get current balance
-    user_response = supabase.table("users").select(
-        "nmbr_balance"
-    ).eq("id", user_id).single().execute()
-    
-    current_balance = float(user_response.data.get("nmbr_balance", 0))
-    new_balance = current_balance + settings.faucet_amount
-    
-    # Update user: add balance, mark faucet claimed, store fingerprint
-    supabase.table("users").update({
-        "nmbr_balance": new_balance,
-        "faucet_claimed": True,
-        "device_fingerprint": device_fingerprint
-    }).eq("id", user_id).execute()
-    
-    return True, new_balance, "OK"
+
+    response = supabase.rpc("claim_faucet", {
+        "target_user_id": user_id,
+        "fingerprint": device_fingerprint,
+        "amount": settings.faucet_amount,
+    }).execute()
+    result = response.data or {}
+    status = result.get("status", "UNKNOWN")
+
+    if status == "OK":
+        _remember_used(device_fingerprint, user_id)
+        return True, float(result["new_balance"]), "OK"
+
+    if status == "DEVICE_BLOCKED":
+        _remember_used(device_fingerprint, result.get("owner_id"))
+    return False, 0.0, status
@@ -0,0 +1,165 @@
+"""
+Fundamentals Service
+
+Append-only history of creator YouTube fundamentals and CPI, and the
+time-series queries built on it (CPI charts, subscriber velocity).
+
+Snapshots are written by the stats refresh paths; reads never touch the
+YouTube API.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from ..database import get_supabase
+from ..utils.bulk_write import bulk_insert
+from ..utils.pagination import DEFAULT_PAGE_SIZE
+
+HISTORY_TABLE = "creator_stats_history"
+
+# Window for the headline velocity figure
+VELOCITY_DAYS = 7
+
+
+def snapshot_row(
+    creator_id: str,
+    stats: Dict[str, Any],
+    view_count_30d: int,
+    cpi_score: float,
+    recorded_at: str
+) -> Dict[str, Any]:
+    """Build one history row from refreshed YouTube stats."""
+    return {
+        "creator_id": creator_id,
+        "recorded_at": recorded_at,
+        "subscriber_count": stats["subscriber_count"],
+        "view_count_30d": view_count_30d,
+        "view_count_lifetime": stats["view_count_lifetime"],
+        "video_count": stats["video_count"],
+        "cpi_score": cpi_score,
+    }
+
+
+def record_snapshots(rows: List[Dict[str, Any]], chunk_size: int = 500) -> int:
+    """
+    Append a batch of fundamentals snapshots.
+
+    Re-recording the same (creator, recorded_at) - e.g. a retried batch -
+    overwrites the earlier row instead of failing.
+
+    Returns:
+        Number of rows written
+    """
+    if not rows:
+        return 0
+    result = bulk_insert(HISTORY_TABLE, rows, on_conflict="creator_id,recorded_at", chunk_size=chunk_size)
+    if result.failed_chunks:
+        print(f"⚠️ Failed to record {result.failed_chunks} stats history chunks: {result.errors[-1]}")
+    return result.written
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+
+
+def compute_growth(points: List[Dict[str, Any]], window_days: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    Growth between the latest point and the baseline `window_days` earlier.
+
+    The baseline is the newest point at or before the window start, or the
+    oldest point if history is shorter than the window. Points must be
+    sorted by recorded_at ascending. None without at least two points.
+    """
+    if len(points) < 2:
+        return None
+
+    latest = points[-1]
+    latest_at = _parse_time(latest["recorded_at"])
+    baseline = points[0]
+    if window_days is not None:
+        window_start = latest_at - timedelta(days=window_days)
+        for point in points[:-1]:
+            if _parse_time(point["recorded_at"]) <= window_start:
+                baseline = point
+            else:
+                break
+
+    days = (latest_at - _parse_time(baseline["recorded_at"])).total_seconds() / 86400
+    if days <= 0:
+        return None
+
+    subscriber_delta = int(latest["subscriber_count"]) - int(baseline["subscriber_count"])
+    return {
+        "days": round(days, 2),
+        "subscriber_delta": subscriber_delta,
+        "subscribers_per_day": round(subscriber_delta / max(days, 1), 2),
+        "cpi_delta": round(float(latest["cpi_score"]) - float(baseline["cpi_score"]), 2),
+    }
+
+
+def _thin(points: List[Dict[str, Any]], max_points: int) -> List[Dict[str, Any]]:
+    """Evenly drop points so a long series fits a chart, always keeping the latest."""
+    if max_points <= 0 or len(points) <= max_points:
+        return points
+    step = len(points) / max_points
+    thinned = [points[int(i * step)] for i in range(max_points - 1)]
+    thinned.append(points[-1])
+    return thinned
+
+
+def get_fundamentals(creator_id: str, days: Optional[int] = 30, max_points: int = 500) -> Dict[str, Any]:
+    """
+    Fundamentals series for one creator, plus growth rates.
+
+    Fetches enough history to cover both the requested period and the
+    7-day velocity window, oldest first in pages keyed on recorded_at
+    (unique per creator), so long histories aren't cut at PostgREST's row cap.
+
+    Args:
+        creator_id: Creator to fetch
+        days: Period to return (None = all history)
+        max_points: Cap on returned points (growth is computed on the full series)
+    """
+    supabase = get_supabase()
+
+    since = None
+    if days is not None:
+        # Extra lookback so 7d velocity has a baseline even for short periods
+        lookback = max(days, VELOCITY_DAYS) + 1
+        since = (datetime.utcnow() - timedelta(days=lookback)).isoformat()
+
+    rows: List[Dict[str, Any]] = []
+    while True:
+        query = supabase.table(HISTORY_TABLE).select(
+            "recorded_at, subscriber_count, view_count_30d, view_count_lifetime, video_count, cpi_score"
+        ).eq("creator_id", creator_id)
+        if since is not None:
+            query = query.gte("recorded_at", since)
+        if rows:
+            query = query.gt("recorded_at", rows[-1]["recorded_at"])
+        page = query.order("recorded_at", desc=False).limit(DEFAULT_PAGE_SIZE).execute().data or []
+        rows.extend(page)
+        if len(page) < DEFAULT_PAGE_SIZE:
+            break
+
+    if days is not None:
+        period_start = datetime.utcnow() - timedelta(days=days)
+        period = [r for r in rows if _parse_time(r["recorded_at"]) >= period_start]
+    else:
+        period = rows
+
+    return {
+        "creator_id": creator_id,
+        "points": _thin(period, max_points),
+        "velocity_7d": compute_growth(rows, VELOCITY_DAYS),
+        "growth_period": compute_growth(period),
+    }
+
+
+def get_velocity_leaders(window_days: int = VELOCITY_DAYS, limit: int = 20) -> List[Dict[str, Any]]:
+    """Creators ranked by subscriber growth per day over the window (one RPC)."""
+    supabase = get_supabase()
+    # Ranked and cut in SQL: the RPC returns every creator, past PostgREST's row cap
+    return supabase.rpc("get_creator_velocity", {"window_days": window_days}).order(
+        "subscribers_per_day", desc=True, nullsfirst=False
+    ).limit(limit).execute().data or []
@@ -0,0 +1,135 @@
+"""
+Leaderboard Service
+
+Ranks users by Total Valuation = Portfolio Value + Free Cash (nmbr_balance).
+
+Ranking reads every user's holdings, so it costs a round trip per user.
+The ranked list is kept as a process-wide snapshot and rebuilt at most
+every Settings.leaderboard_cache_ttl_s seconds (0 = rebuild on every
+request); concurrent requests that find it stale share one rebuild. The
+startup warm-up builds the first snapshot before the worker reports ready.
+"""
+
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from ..config import get_settings
+from ..database import get_supabase
+from ..utils.metrics import CACHE_LOOKUPS
+from .portfolio_service import get_user_holdings
+
+
+async def compute_rankings() -> List[Dict]:
+    """All users with a positive total valuation, highest first."""
+    supabase = get_supabase()
+
+    # Get all users with their nmbr_balance
+    response = supabase.table("users").select(
+        "id, username, display_name, avatar_url, nmbr_balance"
+    ).execute()
+
+    # Calculate total valuation for each user
+    users_with_valuation = []
+
+    for user in response.data:
+        # Get holdings for this user
+        holdings = await get_user_holdings(user["id"])
+
+        nmbr_balance = float(user.get("nmbr_balance", 0))
+        holdings_value = sum(h["current_value"] for h in holdings) if holdings else 0
+        total_cost_basis = sum(h["cost_basis"] for h in holdings) if holdings else 0
+
+        # Calculate total valuation = portfolio + cash
+        total_valuation = holdings_value + nmbr_balance
+
+        # Skip users with 0 total valuation
+        if total_valuation <= 0:
+            continue
+
+        # Calculate ROI (only if they have invested)
+        if total_cost_basis > 0:
+            roi_pct = ((holdings_value - total_cost_basis) / total_cost_basis) * 100
+        else:
+            roi_pct = 0.0
+
+        users_with_valuation.append({
+            **user,
+            "total_valuation": total_valuation,
+            "portfolio_value": holdings_value,
+            "nmbr_balance": nmbr_balance,
+            "total_invested": total_cost_basis,
+            "roi_pct": roi_pct
+        })
+
+    # Sort by total valuation descending
+    users_with_valuation.sort(
+        key=lambda x: x["total_valuation"],
+        reverse=True
+    )
+    return users_with_valuation
+
+
+class LeaderboardCache:
+    """The latest rankings and when they were computed."""
+
+    def __init__(self):
+        self._rankings: Optional[List[Dict]] = None
+        self._computed_at = 0.0
+        self._generation = 0  # Bumped on every rebuild
+        self._rebuild: Optional[asyncio.Task] = None
+
+    def age_s(self) -> Optional[float]:
+        """Seconds since the snapshot was built, or None if there is none."""
+        if self._rankings is None:
+            return None
+        return time.monotonic() - self._computed_at
+
+    def _fresh(self) -> bool:
+        age = self.age_s()
+        return age is not None and age < get_settings().leaderboard_cache_ttl_s
+
+    async def _compute(self) -> List[Dict]:
+        rankings = await compute_rankings()
+        self._rankings = rankings
+        self._computed_at = time.monotonic()
+        self._generation += 1
+        return rankings
+
+    def version(self) -> Optional[int]:
+        """Generation of the snapshot while it's fresh (an ETag input), else None."""
+        return self._generation if self._fresh() else None
+
+    async def get(self) -> List[Dict]:
+        """Current rankings, rebuilt first if the snapshot is missing or expired."""
+        if self._fresh():
+            CACHE_LOOKUPS.inc(cache="leaderboard", result="hit")
+            return self._rankings
+        CACHE_LOOKUPS.inc(cache="leaderboard", result="miss")
+
+        rebuild = self._rebuild
+        # A task from another event loop (scripts, benchmarks) can't be awaited here
+        if rebuild is None or rebuild.done() or rebuild.get_loop() is not asyncio.get_running_loop():
+            rebuild = self._rebuild = asyncio.ensure_future(self._compute())
+        # Shielded: one caller disconnecting mustn't cancel the rebuild for the others
+        return await asyncio.shield(rebuild)
+
+    async def warm(self) -> int:
+        """Build the snapshot now (startup warm-up); returns the number of ranked users."""
+        return len(await self._compute())
+
+    def invalidate(self) -> None:
+        """Drop the snapshot; the next read rebuilds it."""
+        self._rankings = None
+        self._rebuild = None
+
+
+_leaderboard_cache: Optional[LeaderboardCache] = None
+
+
+def get_leaderboard_cache() -> LeaderboardCache:
+    """Get the process-wide leaderboard snapshot."""
+    global _leaderboard_cache
+    if _leaderboard_cache is None:
+        _leaderboard_cache = LeaderboardCache()
+    return _leaderboard_cache
@@ -0,0 +1,305 @@
+"""
+Ledger Service
+
+Queries behind the admin global ledger (/admin/transactions): the shared
+filters, server-side search, and exports.
+
+Exports page through the ledger by keyset (newest first) and encode one
+page at a time, so memory stays bounded by the page size whatever the
+range. CSV is always available; Parquet needs pyarrow installed.
+"""
+
+import asyncio
+import csv
+import io
+import os
+import tempfile
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..config import get_settings
+from ..database import get_supabase
+from ..utils.pagination import iter_pages
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+    pq = None
+
+LEDGER_SELECT = "*, users(id, display_name, username, avatar_url), pools(creators(display_name, token_symbol))"
+
+# Rows per round trip while exporting (keep <= the PostgREST max-rows setting)
+EXPORT_PAGE_SIZE = 1000
+
+# Finished background exports are deleted after this long
+EXPORT_RETENTION_S = 86_400
+
+EXPORT_COLUMNS = [
+    "id", "created_at", "type",
+    "user_id", "user_display_name", "user_username",
+    "pool_id", "token_symbol", "creator_name",
+    "nmbr_amount", "token_amount", "price_per_token",
+    "fee_amount", "slippage_pct", "price_impact_pct",
+]
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+@dataclass
+class LedgerFilters:
+    """Filters supported by the ledger list and export endpoints."""
+    search: Optional[str] = None
+    user_id: Optional[str] = None
+    pool_id: Optional[str] = None
+    type: Optional[str] = None
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+    since: Optional[str] = None  # ISO timestamp
+
+    @classmethod
+    def from_params(cls, time_range: Optional[str] = "all", **params) -> "LedgerFilters":
+        start = time_range_start(time_range)
+        return cls(since=start.isoformat() if start else None, **params)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def time_range_start(time_range: Optional[str]) -> Optional[datetime]:
+    """Start of a "24h" / "7d" / "30d" window; None for "all"."""
+    windows = {"24h": timedelta(hours=24), "7d": timedelta(days=7), "30d": timedelta(days=30)}
+    if time_range not in windows:
+        return None
+    return datetime.now(timezone.utc) - windows[time_range]
+
+
+# ============ Queries ============
+
+def filtered_query(filters: LedgerFilters, count: Optional[str] = None):
+    """Transactions query with every filter except `search` applied (unordered)."""
+    query = get_supabase().table("transactions").select(LEDGER_SELECT, count=count)
+
+    if filters.user_id:
+        query = query.eq("user_id", filters.user_id)
+    if filters.pool_id:
+        query = query.eq("pool_id", filters.pool_id)
+    if filters.type:
+        query = query.eq("type", filters.type)
+    if filters.min_amount is not None:
+        query = query.gte("nmbr_amount", filters.min_amount)
+    if filters.max_amount is not None:
+        query = query.lte("nmbr_amount", filters.max_amount)
+    if filters.since:
+        query = query.gte("created_at", filters.since)
+    return query
+
+
+def search_page(
+    filters: LedgerFilters,
+    after: Optional[Dict[str, str]] = None,
+    offset: int = 0,
+    limit: int = 50,
+    count: str = "exact"
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """
+    One page of search results, newest first (015_search_transactions.sql).
+
+    Returns:
+        (up to limit + 1 rows, exact total if count is "exact" else None)
+    """
+    result = get_supabase().rpc("search_transactions", {
+        "search_query": filters.search,
+        "filter_user_id": filters.user_id,
+        "filter_pool_id": filters.pool_id,
+        "filter_type": filters.type,
+        "min_amount": filters.min_amount,
+        "max_amount": filters.max_amount,
+        "since": filters.since,
+        "after_created_at": after["value"] if after else None,
+        "after_id": after["id"] if after else None,
+        "page_offset": offset,
+        "page_limit": limit,
+        "count_mode": count,
+    }).execute().data or {}
+    return result.get("transactions") or [], result.get("total")
+
+
+def iter_ledger_pages(filters: LedgerFilters, page_size: int = EXPORT_PAGE_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """Yield every matching transaction, newest first, one keyset page at a time."""
+    if not filters.search:
+        yield from iter_pages(lambda: filtered_query(filters), page_size, descending=True)
+        return
+
+    after = None
+    while True:
+        rows, _ = search_page(filters, after=after, limit=page_size, count="none")
+        page = rows[:page_size]
+        if page:
+            yield page
+        if len(rows) <= page_size:
+            return
+        after = {"value": page[-1]["created_at"], "id": page[-1]["id"]}
+
+
+# ============ Export ============
+
+def export_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a ledger row (with embeds) into EXPORT_COLUMNS."""
+    user_data = row.get("users") or {}
+    creator_data = (row.get("pools") or {}).get("creators") or {}
+    return {
+        "id": row["id"],
+        "created_at": row["created_at"],
+        "type": row["type"],
+        "user_id": row["user_id"],
+        "user_display_name": user_data.get("display_name"),
+        "user_username": user_data.get("username"),
+        "pool_id": row["pool_id"],
+        "token_symbol": creator_data.get("token_symbol"),
+        "creator_name": creator_data.get("display_name"),
+        "nmbr_amount": float(row.get("nmbr_amount") or 0),
+        "token_amount": float(row.get("token_amount") or 0),
+        "price_per_token": float(row.get("price_per_token") or 0),
+        "fee_amount": float(row.get("fee_amount") or 0),
+        "slippage_pct": float(row.get("slippage_pct") or 0),
+        "price_impact_pct": float(row.get("price_impact_pct") or 0),
+    }
+
+
+def iter_csv(filters: LedgerFilters) -> Iterator[bytes]:
+    """CSV export as a stream of chunks, one per page."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for page in iter_ledger_pages(filters):
+        writer.writerows(export_row(row) for row in page)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+class _ChunkSink:
+    """Write-only file object that hands out whatever was written since the last take()."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _parquet_schema():
+    return pa.schema([
+        ("id", pa.string()),
+        ("created_at", pa.timestamp("us", tz="UTC")),
+        ("type", pa.string()),
+        ("user_id", pa.string()),
+        ("user_display_name", pa.string()),
+        ("user_username", pa.string()),
+        ("pool_id", pa.string()),
+        ("token_symbol", pa.string()),
+        ("creator_name", pa.string()),
+        ("nmbr_amount", pa.float64()),
+        ("token_amount", pa.float64()),
+        ("price_per_token", pa.float64()),
+        ("fee_amount", pa.float64()),
+        ("slippage_pct", pa.float64()),
+        ("price_impact_pct", pa.float64()),
+    ])
+
+
+def iter_parquet(filters: LedgerFilters) -> Iterator[bytes]:
+    """Parquet export as a stream of chunks, one row group per page."""
+    if pa is None:
+        raise RuntimeError("Parquet export requires pyarrow")
+
+    schema = _parquet_schema()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+    try:
+        for page in iter_ledger_pages(filters):
+            rows = [export_row(row) for row in page]
+            for row in rows:
+                row["created_at"] = datetime.fromisoformat(row["created_at"].replace("Z", "+00:00"))
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+def iter_export(filters: LedgerFilters, fmt: str = "csv") -> Iterator[bytes]:
+    """Export stream in the given format ("csv" or "parquet")."""
+    if fmt == "parquet":
+        return iter_parquet(filters)
+    return iter_csv(filters)
+
+
+def parquet_available() -> bool:
+    return pa is not None
+
+
+# ============ Background Exports ============
+
+def export_dir() -> str:
+    """Directory for background export files (created on demand)."""
+    path = get_settings().export_dir or os.path.join(tempfile.gettempdir(), "nombre-exports")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _prune_exports(directory: str) -> None:
+    cutoff = time.time() - EXPORT_RETENTION_S
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+            os.remove(path)
+
+
+def _write_export(filters: LedgerFilters, fmt: str) -> Dict[str, Any]:
+    directory = export_dir()
+    _prune_exports(directory)
+
+    name = f"ledger-{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.{fmt}"
+    path = os.path.join(directory, name)
+    partial = path + ".partial"
+    size = 0
+    with open(partial, "wb") as f:
+        for chunk in iter_export(filters, fmt):
+            f.write(chunk)
+            size += len(chunk)
+    os.replace(partial, path)
+    return {"file": name, "format": fmt, "bytes": size}
+
+
+async def export_ledger(filters: Optional[Dict[str, Any]] = None, format: str = "csv") -> Dict[str, Any]:
+    """
+    Write a ledger export to export_dir() in the background.
+
+    Runs as the "ledger_export" scheduler job; the result names the file,
+    which /admin/transactions/export/{run_id} serves once the run succeeded.
+    """
+    return await asyncio.to_thread(_write_export, LedgerFilters(**(filters or {})), format)
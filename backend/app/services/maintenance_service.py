@@ -7,31 +7,55 @@ Handles daily maintenance tasks:
 3. calculating price_change_24h
 4. updating market caps
 5. updating portfolio values
+6. pruning old platform activity buckets (013_platform_counters.sql)
+
+Each task is one set-based SQL function (see 007_maintenance_functions.sql).
+
+Also hosts the bulk creator stats refresh job, which re-fetches YouTube
+stats for the whole catalogue and is resumable via job_checkpoints, and
+the avatar refresh. All of these run as scheduler jobs (see scheduler.py).
 """
 
+import asyncio
+import time
 from datetime import datetime, timedelta
+from typing import Optional
+
 from ..database import get_supabase
+from ..utils.bulk_write import bulk_update, DEFAULT_CHUNK_SIZE
+from ..utils.dag import Step, run_dag
+from ..utils.http_cache import mark_changed
+from ..utils.pagination import DEFAULT_PAGE_SIZE
+from .fundamentals_service import snapshot_row, record_snapshots
+from .youtube_service import get_youtube_service, is_transient_error, MAX_IDS_PER_REQUEST, QuotaExceededError
+
+# Total token supply is always 10M (9M in pool + 1M creator vesting)
+TOTAL_TOKEN_SUPPLY = 10_000_000
+
+# Retries per YouTube call on 429s / 5xx / network errors, with exponential backoff
+YOUTUBE_MAX_RETRIES = 3
+YOUTUBE_RETRY_BACKOFF_S = 0.5
+
+
+def _run_step(function_name: str, params: Optional[dict] = None) -> int:
+    """
+    Run one set-based maintenance function (007_maintenance_functions.sql); returns rows changed.
+    Blocking - the async step wrappers call it in a worker thread so steps can overlap.
+    """
+    supabase = get_supabase()
+    response = supabase.rpc(function_name, params or {}).execute()
+    # Steps rewrite pool columns in bulk; cached creator responses are stale
+    mark_changed()
+    return int(response.data or 0)
+
 
 async def update_price_snapshots():
     """
     Update price_24h_ago with the current price for all pools.
     This should be run at the same time every day so price_change_24h is accurate.
     """
-    supabase = get_supabase()
-    
-    # Get all pools with their current prices
-    pools = supabase.table("pools").select("id, current_price").execute()
-    
-    updated = 0
-    for pool in pools.data:
-        # Set price_24h_ago to current_price
-        # Tomorrow, price_change_24h = ((current_price - price_24h_ago) / price_24h_ago) * 100
-        supabase.table("pools").update({
-            "price_24h_ago": pool["current_price"] 
-        }).eq("id", pool["id"]).execute()
-        updated += 1
-    
-    return updated
+    # Tomorrow, price_change_24h = ((current_price - price_24h_ago) / price_24h_ago) * 100
+    return await asyncio.to_thread(_run_step, "maintenance_update_price_snapshots")
 
 
 async def calculate_volume_24h():
@@ -39,31 +63,8 @@ async def calculate_volume_24h():
     Calculate actual 24-hour volume from transactions table.
     Sums up all nmbr_amount from transactions in the last 24 hours.
     """
-    supabase = get_supabase()
-    
-    # Get timestamp for 24 hours ago
     cutoff = (datetime.utcnow() - timedelta(hours=24)).isoformat()
-    
-    # Get all pools
-    pools = supabase.table("pools").select("id").execute()
-    
-    updated = 0
-    for pool in pools.data:
-        # Sum all transactions for this pool in the last 24 hours
-        tx_response = supabase.table("transactions").select(
-            "nmbr_amount"
-        ).eq("pool_id", pool["id"]).gte("created_at", cutoff).execute()
-        
-        # Calculate total volume
-        volume_24h = sum(float(tx.get("nmbr_amount", 0)) for tx in tx_response.data)
-        
-        # Update pool
-        supabase.table("pools").update({
-            "volume_24h": volume_24h
-        }).eq("id", pool["id"]).execute()
-        updated += 1
-    
-    return updated
+    return await asyncio.to_thread(_run_step, "maintenance_calculate_volume_24h", {"since": cutoff})
 
 
 async def calculate_price_changes():
@@ -71,55 +72,39 @@ async def calculate_price_changes():
     Calculate price_change_24h percentage for all pools.
     Formula: ((current_price - price_24h_ago) / price_24h_ago) * 100
     """
+    return await asyncio.to_thread(_run_step, "maintenance_calculate_price_changes")
+
+
+def _consume_trade_events() -> dict:
     supabase = get_supabase()
-    
-    # Get all pools
-    pools = supabase.table("pools").select(
-        "id, current_price, price_24h_ago"
-    ).execute()
-    
-    updated = 0
-    for pool in pools.data:
-        current = float(pool.get("current_price", 0))
-        yesterday = float(pool.get("price_24h_ago") or current)  # Default to current if no snapshot
-        
-        if yesterday > 0:
-            change_pct = ((current - yesterday) / yesterday) * 100
-        else:
-            change_pct = 0
-        
-        supabase.table("pools").update({
-            "price_change_24h": round(change_pct, 4)
-        }).eq("id", pool["id"]).execute()
-        updated += 1
-    
-    return updated
+    result = supabase.rpc("consume_trade_events", {}).execute().data or {}
+    if result.get("pools_updated"):
+        mark_changed()
+    return result
 
 
-async def update_volume_all_time():
-    """
-    Calculate total all-time volume from transactions.
+async def consume_trade_events() -> dict:
     """
-    supabase = get_supabase()
-    
-    # Get all pools
-    pools = supabase.table("pools").select("id").execute()
+    Fold new trade events into pool aggregates.
     
-    updated = 0
-    for pool in pools.data:
-        # Sum ALL transactions for this pool
-        tx_response = supabase.table("transactions").select(
-            "nmbr_amount"
-        ).eq("pool_id", pool["id"]).execute()
-        
-        volume_all_time = sum(float(tx.get("nmbr_amount", 0)) for tx in tx_response.data)
-        
-        supabase.table("pools").update({
-            "volume_all_time": volume_all_time
-        }).eq("id", pool["id"]).execute()
-        updated += 1
+    Maintains volume_all_time, trade_count, fees_collected and holder_count
+    from the trade_events log (010_trade_events.sql), starting after the
+    last checkpointed offset, so cost is proportional to new trades.
+    """
+    return await asyncio.to_thread(_consume_trade_events)
+
+
+async def update_volume_all_time(full_rebuild: bool = False):
+    """
+    Bring all-time volume (and the other trade aggregates) up to date.
     
-    return updated
+    Normally consumes pending trade events; full_rebuild recomputes every
+    aggregate from transactions and holdings instead.
+    """
+    if full_rebuild:
+        return await asyncio.to_thread(_run_step, "rebuild_pool_trade_aggregates")
+    result = await consume_trade_events()
+    return int(result.get("pools_updated", 0))
 
 
 async def update_market_caps():
@@ -127,86 +112,362 @@ async def update_market_caps():
     Recalculate market cap for all pools.
     Market Cap = Total Token Supply (10M) * Current Price
     """
-    supabase = get_supabase()
+    return await asyncio.to_thread(_run_step, "maintenance_update_market_caps", {"total_supply": TOTAL_TOKEN_SUPPLY})
+
+
+async def update_portfolio_values():
+    """
+    Recalculate portfolio values for all users.
+    """
+    return await asyncio.to_thread(_run_step, "maintenance_update_portfolio_values")
+
+
+async def prune_platform_buckets():
+    """
+    Drop platform activity buckets older than the 24h stats window.
+    """
+    return await asyncio.to_thread(_run_step, "maintenance_prune_platform_buckets")
+
+
+# Result key for each step, as returned by run_all_maintenance
+MAINTENANCE_STEPS = {
+    "volume_24h": "volume_24h_updated",
+    "price_changes": "price_changes_updated",
+    "snapshots": "snapshots_updated",
+    "market_caps": "market_caps_updated",
+    "volume_all_time": "volume_all_time_updated",
+    "portfolios": "portfolios_updated",
+    "platform_buckets": "platform_buckets_pruned",
+}
+
+
+async def run_all_maintenance(concurrency: int = 3, max_retries: int = 2):
+    """
+    Run all maintenance tasks as a dependency graph.
     
-    # Total token supply is always 10M (9M in pool + 1M creator vesting)
-    TOTAL_TOKEN_SUPPLY = 10_000_000
+    Every step is a single server-side statement. Only the price snapshot
+    has to wait (for the price change that reads yesterday's snapshot); the
+    other steps are independent and run up to `concurrency` at a time.
+    Failed steps are retried individually; if one still fails, its
+    dependents are skipped, the rest finish, and a RuntimeError is raised.
     
-    pools = supabase.table("pools").select(
-        "id, current_price"
-    ).execute()
+    Counts are rows whose value actually changed.
+    """
+    graph = [
+        Step("volume_24h", calculate_volume_24h),
+        Step("price_changes", calculate_price_changes),
+        # Snapshots for NEXT day (Must come AFTER calculating change)
+        Step("snapshots", update_price_snapshots, depends_on=["price_changes"]),
+        Step("market_caps", update_market_caps),
+        Step("volume_all_time", update_volume_all_time),
+        Step("portfolios", update_portfolio_values),
+        Step("platform_buckets", prune_platform_buckets),
+    ]
     
-    updated = 0
-    for pool in pools.data:
-        current_price = float(pool.get("current_price", 0))
-        market_cap = TOTAL_TOKEN_SUPPLY * current_price
-        
-        supabase.table("pools").update({
-            "market_cap": market_cap
-        }).eq("id", pool["id"]).execute()
-        updated += 1
+    started = time.perf_counter()
+    report = await run_dag(graph, concurrency=concurrency, max_retries=max_retries)
+    
+    results = {
+        MAINTENANCE_STEPS[name]: step.get("result")
+        for name, step in report.items()
+    }
+    results["elapsed_s"] = round(time.perf_counter() - started, 3)
+    results["step_timings_s"] = {name: step.get("duration_s") for name, step in report.items()}
+    results["steps"] = report
     
-    return updated
+    failed = [name for name, step in report.items() if step["status"] != "succeeded"]
+    if failed:
+        raise RuntimeError(f"Maintenance steps did not complete: {', '.join(failed)} - {report}")
+    return results
 
 
-async def update_portfolio_values():
+# ============ Bulk Creator Stats Refresh ============
+
+REFRESH_STATS_JOB = "refresh_creator_stats"
+
+
+def _load_checkpoint(job_name: str) -> Optional[dict]:
+    """Get a job's checkpoint row, or None if it has never run."""
+    supabase = get_supabase()
+    response = supabase.table("job_checkpoints").select(
+        "cursor, state"
+    ).eq("job_name", job_name).execute()
+    return response.data[0] if response.data else None
+
+
+def _save_checkpoint(job_name: str, cursor: Optional[str], state: dict) -> None:
+    """Record progress so the next run resumes after `cursor`."""
+    supabase = get_supabase()
+    supabase.table("job_checkpoints").upsert({
+        "job_name": job_name,
+        "cursor": cursor,
+        "state": state,
+    }, on_conflict="job_name").execute()
+
+
+def _describe_youtube_error(error: Exception) -> str:
+    """Short reason for logs and job results; not str(error), since httpx puts the URL (API key included) in it."""
+    status_code = getattr(getattr(error, "response", None), "status_code", None)
+    return f"HTTP {status_code}" if status_code else type(error).__name__
+
+
+async def _youtube_with_retries(call, max_retries: int = YOUTUBE_MAX_RETRIES):
+    """Await one YouTube call, retrying transient errors with backoff; others (and quota) are raised."""
+    for attempt in range(max_retries + 1):
+        try:
+            return await call()
+        except QuotaExceededError:
+            raise
+        except Exception as e:
+            if attempt == max_retries or not is_transient_error(e):
+                raise
+            await asyncio.sleep(YOUTUBE_RETRY_BACKOFF_S * 2 ** attempt)
+
+
+async def refresh_all_creator_stats(
+    batch_size: int = 50,
+    concurrency: int = 8,
+    resume: bool = True
+) -> dict:
     """
-    Recalculate portfolio values for all users.
+    Refresh YouTube stats and CPI for every creator.
+    
+    Creators are processed in id order, one batch at a time:
+    1. fetch statistics for the whole batch (1 quota unit per 50 channels)
+    2. estimate 30-day views with at most `concurrency` channels in flight
+    3. recompute CPI
+    4. write the batch back with a single bulk update, and append it to
+       creator_stats_history
+    5. checkpoint the last creator id
+    
+    Transient YouTube errors (429, 5xx, network) are retried with backoff.
+    A batch that still fails is counted as failed and skipped, so one bad
+    batch doesn't stop the pass. If YouTube reports the quota is spent, the
+    job stops after the last completed batch; the next call with
+    resume=True continues from there.
     """
+    # numpy-backed; imported here so the API process doesn't load it at startup
+    from ..utils.cpi import calculate_cpi_batch
+    
     supabase = get_supabase()
+    started = time.perf_counter()
+    stage_timings = {"fetch_stats": 0.0, "fetch_views": 0.0, "compute": 0.0, "write": 0.0}
     
-    # Get all users who have holdings
-    users = supabase.table("users").select("id").execute()
+    checkpoint = _load_checkpoint(REFRESH_STATS_JOB) if resume else None
+    cursor = checkpoint.get("cursor") if checkpoint else None
+    resumed_from = cursor
     
-    updated = 0
-    for user in users.data:
-        user_id = user["id"]
+    refreshed = 0
+    failed = 0
+    batches = 0
+    failed_batches = 0
+    last_error = None
+    status = "completed"
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def fetch_views(channel_id: str, fallback: int) -> int:
+        async with semaphore:
+            try:
+                return await _youtube_with_retries(
+                    lambda: get_youtube_service().calculate_30d_views(channel_id)
+                )
+            except QuotaExceededError:
+                raise
+            except Exception:
+                return fallback
+    
+    while True:
+        query = supabase.table("creators").select(
+            "id, youtube_channel_id, view_count_30d"
+        ).order("id").limit(batch_size)
+        if cursor:
+            query = query.gt("id", cursor)
+        creators = query.execute().data or []
+        
+        if not creators:
+            break
+        
+        try:
+            t0 = time.perf_counter()
+            channel_ids = [c["youtube_channel_id"] for c in creators if c.get("youtube_channel_id")]
+            stats_by_channel = await _youtube_with_retries(
+                lambda: get_youtube_service().get_channels_stats(channel_ids)
+            )
+            t1 = time.perf_counter()
+            
+            to_refresh = [c for c in creators if c.get("youtube_channel_id") in stats_by_channel]
+            views = await asyncio.gather(*[
+                fetch_views(c["youtube_channel_id"], c.get("view_count_30d") or 0)
+                for c in to_refresh
+            ])
+            t2 = time.perf_counter()
+        except QuotaExceededError:
+            status = "quota_exhausted"
+            break
+        except Exception as e:
+            # Out of retries: skip this batch, keep the pass (and checkpoint) moving
+            last_error = _describe_youtube_error(e)
+            print(f"⚠️ Creator stats batch after {cursor} failed: {last_error}")
+            cursor = creators[-1]["id"]
+            failed += len(creators)
+            failed_batches += 1
+            _save_checkpoint(REFRESH_STATS_JOB, cursor, {"refreshed": refreshed, "failed": failed})
+            if len(creators) < batch_size:
+                break
+            continue
+        
+        now = datetime.utcnow().isoformat()
+        batch_stats = [stats_by_channel[c["youtube_channel_id"]] for c in to_refresh]
+        cpi = calculate_cpi_batch(
+            [s["subscriber_count"] for s in batch_stats],
+            views,
+            [s["view_count_lifetime"] for s in batch_stats]
+        )
+        
+        rows = []
+        history = []
+        for creator, stats, view_count_30d, cpi_score in zip(to_refresh, batch_stats, views, cpi.cpi_scores):
+            history.append(snapshot_row(creator["id"], stats, view_count_30d, float(cpi_score), now))
+            rows.append({
+                "id": creator["id"],
+                "subscriber_count": stats["subscriber_count"],
+                "view_count_30d": view_count_30d,
+                "view_count_lifetime": stats["view_count_lifetime"],
+                "video_count": stats["video_count"],
+                "cpi_score": float(cpi_score),
+                "last_stats_update": now,
+            })
+        t3 = time.perf_counter()
+        
+        if rows:
+            write = bulk_update("creators", rows, chunk_size=batch_size)
+            mark_changed()
+            if write.failed_chunks:
+                raise RuntimeError(f"Failed to write creator stats batch: {write.errors[-1]}")
+            record_snapshots(history, chunk_size=batch_size)
         
-        # Get all holdings for this user with current prices
-        holdings = supabase.table("user_holdings").select(
-            "token_amount, creators(pools(current_price))"
-        ).eq("user_id", user_id).gt("token_amount", 0).execute()
+        cursor = creators[-1]["id"]
+        refreshed += len(rows)
+        failed += len(creators) - len(rows)
+        batches += 1
+        _save_checkpoint(REFRESH_STATS_JOB, cursor, {"refreshed": refreshed, "failed": failed})
+        t4 = time.perf_counter()
         
-        # Calculate total portfolio value
-        portfolio_value = 0
-        for h in holdings.data:
-            amount = float(h.get("token_amount", 0))
-            creator = h.get("creators", {})
-            pools = creator.get("pools", {})
-            if isinstance(pools, list):
-                pools = pools[0] if pools else {}
-            price = float(pools.get("current_price", 0))
-            portfolio_value += amount * price
+        stage_timings["fetch_stats"] += t1 - t0
+        stage_timings["fetch_views"] += t2 - t1
+        stage_timings["compute"] += t3 - t2
+        stage_timings["write"] += t4 - t3
         
-        # Update user
-        supabase.table("users").update({
-            "portfolio_value": portfolio_value
-        }).eq("id", user_id).execute()
-        updated += 1
+        if len(creators) < batch_size:
+            break
     
-    return updated
+    if status == "completed":
+        # Full pass done - the next run starts from the beginning
+        _save_checkpoint(REFRESH_STATS_JOB, None, {"refreshed": refreshed, "failed": failed})
+    
+    elapsed = time.perf_counter() - started
+    return {
+        "status": status,
+        "resumed_from": resumed_from,
+        "cursor": cursor,
+        "creators_refreshed": refreshed,
+        "creators_failed": failed,
+        "batches": batches,
+        "batches_failed": failed_batches,
+        "last_error": last_error,
+        "elapsed_s": round(elapsed, 3),
+        "creators_per_s": round(refreshed / elapsed, 2) if elapsed > 0 else 0.0,
+        "stage_timings_s": {k: round(v, 3) for k, v in stage_timings.items()},
+    }
 
 
-async def run_all_maintenance():
-    """Run all maintenance tasks in correct order."""
+# ============ Avatar Refresh ============
+
+async def refresh_all_avatars(
+    dry_run: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    page_size: int = DEFAULT_PAGE_SIZE
+) -> dict:
+    """
+    Refresh avatar URLs for all creators from YouTube.
     
-    # 1. Update calculated stats
-    vol_24h = await calculate_volume_24h()
-    price_change = await calculate_price_changes()
+    YouTube may rotate CDN URLs, so this runs periodically. Creators are
+    read in id order, `page_size` at a time (past PostgREST's row cap);
+    each page's channels are fetched 50 per API call and its changed
+    avatars are written back in bulk. Transient YouTube errors are retried;
+    a call that still fails counts its channels as failed and the job goes on.
+    """
+    supabase = get_supabase()
+    started = time.perf_counter()
     
-    # 2. Update snapshots for NEXT day (Must come AFTER calculating change)
-    snapshots = await update_price_snapshots()
+    total = 0
+    skipped = 0
+    updated = 0
+    unchanged = 0
+    missing = []
+    fetch_failed = 0
+    failed_chunks = 0
+    errors = []
+    cursor = None
     
-    # 3. Update derived stats
-    caps = await update_market_caps()
-    vol_all = await update_volume_all_time()
-    portfolios = await update_portfolio_values()
+    while True:
+        query = supabase.table("creators").select(
+            "id, display_name, youtube_channel_id, avatar_url"
+        ).order("id").limit(page_size)
+        if cursor:
+            query = query.gt("id", cursor)
+        creators = query.execute().data or []
+        if not creators:
+            break
+        
+        with_channel = [c for c in creators if c.get("youtube_channel_id")]
+        fetched = []
+        channels = {}
+        for i in range(0, len(with_channel), MAX_IDS_PER_REQUEST):
+            chunk = with_channel[i:i + MAX_IDS_PER_REQUEST]
+            try:
+                channels.update(await _youtube_with_retries(
+                    lambda: get_youtube_service().get_channels_by_ids([c["youtube_channel_id"] for c in chunk])
+                ))
+                fetched.extend(chunk)
+            except QuotaExceededError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Avatar fetch for {len(chunk)} channels failed: {_describe_youtube_error(e)}")
+                fetch_failed += len(chunk)
+        
+        rows = []
+        for creator in fetched:
+            new_avatar = channels.get(creator["youtube_channel_id"], {}).get("avatar_url")
+            if not new_avatar:
+                missing.append(creator["display_name"])
+            elif new_avatar == creator.get("avatar_url"):
+                unchanged += 1
+            else:
+                rows.append({"id": creator["id"], "avatar_url": new_avatar})
+        
+        write = bulk_update("creators", rows, chunk_size=chunk_size, dry_run=dry_run)
+        if write.written:
+            mark_changed()
+        updated += len(write.changes) if dry_run else write.written
+        failed_chunks += write.failed_chunks
+        errors.extend(write.errors)
+        
+        total += len(creators)
+        skipped += len(creators) - len(with_channel)
+        cursor = creators[-1]["id"]
+        if len(creators) < page_size:
+            break
     
     return {
-        "volume_24h_updated": vol_24h,
-        "price_changes_updated": price_change,
-        "snapshots_updated": snapshots,
-        "market_caps_updated": caps,
-        "volume_all_time_updated": vol_all,
-        "portfolios_updated": portfolios
+        "dry_run": dry_run,
+        "creators": total,
+        "updated": updated,
+        "unchanged": unchanged,
+        "failed": len(missing) + fetch_failed,
+        "skipped": skipped,
+        "missing": missing,
+        "failed_chunks": failed_chunks,
+        "errors": errors,
+        "elapsed_s": round(time.perf_counter() - started, 3),
     }
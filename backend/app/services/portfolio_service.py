@@ -6,6 +6,7 @@ Handles portfolio calculations and holdings management.
 
 from typing import List, Dict, Optional
 from ..database import get_supabase
+from ..utils.tracing import traced
 
 
 def calculate_roi(portfolio_value: float, total_invested: float) -> float:
@@ -45,6 +46,7 @@ def update_avg_buy_price(
     return total_cost / total_amount if total_amount > 0 else 0
 
 
+@traced("portfolio.get_user_holdings")
 async def get_user_holdings(user_id: str) -> List[Dict]:
     """
     Get all holdings for a user with current values.
@@ -89,6 +91,7 @@ async def get_user_holdings(user_id: str) -> List[Dict]:
     return holdings
 
 
+@traced("portfolio.calculate_portfolio_value")
 async def calculate_portfolio_value(user_id: str) -> float:
     """
     Calculate total portfolio value for a user.
@@ -97,6 +100,7 @@ async def calculate_portfolio_value(user_id: str) -> float:
     return sum(h["current_value"] for h in holdings)
 
 
+@traced("portfolio.update_user_portfolio_stats")
 async def update_user_portfolio_stats(user_id: str) -> None:
     """
     Recalculate and update user's portfolio stats in database.
@@ -0,0 +1,216 @@
+"""
+Rolling Stats Service
+
+True trailing-24h volume and price change per pool, kept in memory.
+
+Each pool has a ring buffer of 288 five-minute buckets holding volume and
+open/close price. Trades land in the current bucket; buckets older than
+24h are expired as time moves on, subtracting their volume from a running
+total and handing their close price to the window as "the price 24h ago".
+Reading a pool's volume_24h / price_change_24h is O(1) and always current.
+
+The buffers are seeded on startup from the last 24h of price_history, and
+execute_trade records every trade here and writes the rolling values back
+to the pool row. The nightly maintenance steps still run, as a
+reconciliation for anything this process didn't see.
+
+State is per process: this assumes the API runs as a single worker (as the
+Render deployment does). With several workers each would see only its own
+trades until the next hydrate.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from ..database import get_supabase
+from ..utils.metrics import CACHE_LOOKUPS
+from ..utils.pagination import DEFAULT_PAGE_SIZE, iter_rows
+
+BUCKET_SECONDS = 300
+WINDOW_BUCKETS = 288  # 24h of 5-minute buckets
+WINDOW_SECONDS = BUCKET_SECONDS * WINDOW_BUCKETS
+
+
+def _bucket_of(timestamp: float) -> int:
+    return int(timestamp // BUCKET_SECONDS)
+
+
+class RollingWindow:
+    """Ring buffer of one pool's last 24h of trades."""
+
+    __slots__ = ("buckets", "live", "volume", "base_price", "last_price", "head")
+
+    def __init__(self, base_price: float):
+        # Each slot: [bucket_index, volume, open_price, close_price] or None
+        self.buckets: List[Optional[list]] = [None] * WINDOW_BUCKETS
+        self.live = 0  # Non-empty buckets
+        self.volume = 0.0
+        self.base_price = base_price   # Close of the newest bucket that left the window
+        self.last_price = base_price
+        self.head: Optional[int] = None
+
+    def _advance(self, bucket: int) -> None:
+        """Expire every bucket that is 24h or more behind `bucket`."""
+        if self.head is None:
+            self.head = bucket
+            return
+        if bucket <= self.head:
+            return
+
+        # Oldest live bucket up to the newest one that just fell out (never past head,
+        # so even a long idle gap is at most one lap)
+        last = min(self.head, bucket - WINDOW_BUCKETS)
+        for index in range(self.head - WINDOW_BUCKETS + 1, last + 1):
+            slot = self.buckets[index % WINDOW_BUCKETS]
+            if slot is not None and slot[0] == index:
+                self.volume -= slot[1]
+                self.base_price = slot[3]
+                self.buckets[index % WINDOW_BUCKETS] = None
+                self.live -= 1
+
+        if self.live == 0:
+            self.volume = 0.0  # Drop accumulated float error when the window empties
+        self.head = bucket
+
+    def record(self, price: float, volume: float, timestamp: float) -> None:
+        """Add a trade (post-trade price, $NMBR volume) at `timestamp`."""
+        bucket = _bucket_of(timestamp)
+        self._advance(bucket)
+        # Late arrivals (clock skew, out-of-order hydration) count in the head bucket
+        bucket = max(bucket, self.head)
+
+        slot = self.buckets[bucket % WINDOW_BUCKETS]
+        if slot is None or slot[0] != bucket:
+            slot = [bucket, 0.0, price, price]
+            self.buckets[bucket % WINDOW_BUCKETS] = slot
+            self.live += 1
+        slot[1] += volume
+        slot[3] = price
+        self.volume += volume
+        self.last_price = price
+
+    def snapshot(self, now: float) -> Dict[str, float]:
+        """Current trailing-24h volume and price change."""
+        self._advance(_bucket_of(now))
+        change = (self.last_price - self.base_price) / self.base_price * 100 if self.base_price > 0 else 0.0
+        return {
+            "volume_24h": round(max(self.volume, 0.0), 8),
+            "price_change_24h": round(change, 4),
+        }
+
+
+class RollingStats:
+    """Registry of per-pool rolling windows."""
+
+    def __init__(self):
+        self._windows: Dict[str, RollingWindow] = {}
+        self._lock = threading.Lock()
+        self.hydrated = False
+
+    def hydrate(self) -> int:
+        """
+        Rebuild every pool's window from the last 24h of price_history.
+
+        Returns:
+            Number of trades replayed
+        """
+        supabase = get_supabase()
+        now = datetime.now(timezone.utc)
+        since = now - timedelta(seconds=WINDOW_SECONDS)
+
+        windows = {
+            row["pool_id"]: RollingWindow(float(row["price"] or 0))
+            for row in self._base_prices(supabase, since)
+        }
+
+        replayed = 0
+        for row in iter_rows(
+            lambda: supabase.table("price_history").select("id, pool_id, price, volume, timestamp").gt(
+                "timestamp", since.isoformat()
+            ),
+            time_column="timestamp"
+        ):
+            window = windows.get(row["pool_id"])
+            if window is None:
+                continue
+            at = datetime.fromisoformat(row["timestamp"].replace("Z", "+00:00")).timestamp()
+            window.record(float(row["price"]), float(row.get("volume") or 0), at)
+            replayed += 1
+
+        with self._lock:
+            self._windows = windows
+            self.hydrated = True
+        return replayed
+
+    @staticmethod
+    def _base_prices(supabase, since: datetime) -> List[Dict[str, Any]]:
+        """Every pool's price at `since`, paged by pool_id past PostgREST's row cap."""
+        rows: List[Dict[str, Any]] = []
+        last_pool_id = None
+        while True:
+            query = supabase.rpc("get_pool_prices_at", {"at": since.isoformat()}).order("pool_id")
+            if last_pool_id is not None:
+                query = query.gt("pool_id", last_pool_id)
+            page = query.limit(DEFAULT_PAGE_SIZE).execute().data or []
+            rows.extend(page)
+            if len(page) < DEFAULT_PAGE_SIZE:
+                return rows
+            last_pool_id = page[-1]["pool_id"]
+
+    def add_pool(self, pool_id: str, initial_price: float) -> None:
+        """Start tracking a pool created after hydrate (it has no history to replay)."""
+        with self._lock:
+            if self.hydrated and pool_id not in self._windows:
+                self._windows[pool_id] = RollingWindow(initial_price)
+
+    def record_trade(
+        self,
+        pool_id: str,
+        price_after: float,
+        volume: float
+    ) -> Optional[Dict[str, float]]:
+        """
+        Record a trade and return the pool's updated rolling values.
+
+        Returns None until hydrated, and for pools hydrate didn't seed (nor
+        add_pool), since their window would only cover trades made since
+        this process started; the caller keeps the stored values then.
+        """
+        now = time.time()
+        with self._lock:
+            window = self._windows.get(pool_id) if self.hydrated else None
+            if window is None:
+                return None
+            window.record(price_after, volume, now)
+            return window.snapshot(now)
+
+    def get(self, pool_id: str) -> Optional[Dict[str, float]]:
+        """Rolling values for a pool, or None if not tracked (or not hydrated yet)."""
+        if not self.hydrated:
+            return None
+        with self._lock:
+            window = self._windows.get(pool_id)
+            return window.snapshot(time.time()) if window else None
+
+    def overlay(self, pool: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Replace a pool row's volume_24h / price_change_24h with live values, in place."""
+        if pool and pool.get("id"):
+            live = self.get(pool["id"])
+            CACHE_LOOKUPS.inc(cache="rolling_stats", result="hit" if live else "miss")
+            if live:
+                pool.update(live)
+        return pool
+
+
+# Singleton instance
+_rolling_stats: Optional[RollingStats] = None
+
+
+def get_rolling_stats() -> RollingStats:
+    """Get the rolling stats registry instance."""
+    global _rolling_stats
+    if _rolling_stats is None:
+        _rolling_stats = RollingStats()
+    return _rolling_stats
@@ -0,0 +1,260 @@
+"""
+Scheduler Service
+
+Runs maintenance jobs in the background of the API process instead of
+inside a cron-triggered HTTP request.
+
+- Each job has its own cadence (Settings.schedule_*; 0 = manual only)
+- A run holds a lease in job_locks, so only one worker/instance runs a job
+  at a time; long runs renew the lease with heartbeats
+- Every run is recorded in job_runs with status, result and duration
+- Endpoints enqueue a run and return its id immediately
+
+Due times come from job_runs, so restarts and extra workers don't re-run
+a job that already ran within its interval.
+"""
+
+import asyncio
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ..config import get_settings
+from ..database import get_supabase
+from .ledger_service import export_ledger
+from .maintenance_service import (
+    run_all_maintenance, refresh_all_creator_stats, refresh_all_avatars, consume_trade_events
+)
+
+# How often idle job loops re-check whether they're due
+POLL_INTERVAL_S = 60.0
+
+
+class UnknownJobError(Exception):
+    """Raised when enqueueing a job name that isn't registered."""
+
+
+@dataclass
+class JobSpec:
+    """A schedulable job."""
+    name: str
+    func: Callable[..., Awaitable[Any]]
+    interval_s: float                     # 0 = run only when enqueued
+    lock_ttl_s: int = 900                 # Lease length; renewed every third of it
+    record_history: bool = True           # False for high-frequency jobs
+    default_params: Dict[str, Any] = field(default_factory=dict)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class Scheduler:
+    """Background job runner with DB-backed locks and run history."""
+
+    def __init__(self):
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.jobs: Dict[str, JobSpec] = {}
+        self._loops: List[asyncio.Task] = []
+        self._runs: Dict[str, asyncio.Task] = {}
+
+    def register(self, spec: JobSpec) -> None:
+        self.jobs[spec.name] = spec
+
+    # ============ Locks ============
+
+    def _acquire(self, spec: JobSpec) -> bool:
+        supabase = get_supabase()
+        return bool(supabase.rpc("try_acquire_job_lock", {
+            "lock_name": spec.name,
+            "lock_holder": self.holder,
+            "ttl_seconds": spec.lock_ttl_s,
+        }).execute().data)
+
+    def _release(self, spec: JobSpec) -> None:
+        supabase = get_supabase()
+        supabase.rpc("release_job_lock", {"lock_name": spec.name, "lock_holder": self.holder}).execute()
+
+    async def _heartbeat(self, spec: JobSpec) -> None:
+        """Renew the lease while a long run is in progress."""
+        while True:
+            await asyncio.sleep(spec.lock_ttl_s / 3)
+            try:
+                await asyncio.to_thread(self._acquire, spec)
+            except Exception as e:
+                print(f"⚠️ Lock heartbeat for {spec.name} failed: {e}")
+
+    # ============ History ============
+
+    def _update_run(self, run_id: Optional[str], fields: Dict[str, Any]) -> None:
+        if run_id:
+            get_supabase().table("job_runs").update(fields).eq("id", run_id).execute()
+
+    def _last_started(self, job_name: str) -> Optional[datetime]:
+        """
+        Start time of the latest run that counts towards the cadence.
+        Failed runs count too, so a persistent failure (e.g. spent YouTube
+        quota) waits for the next slot instead of retrying every minute.
+        """
+        response = get_supabase().table("job_runs").select("started_at").eq(
+            "job_name", job_name
+        ).in_("status", ["running", "succeeded", "failed"]).order("started_at", desc=True).limit(1).execute()
+        if response.data and response.data[0].get("started_at"):
+            return _parse_time(response.data[0]["started_at"])
+        return None
+
+    def get_runs(self, job_name: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        query = get_supabase().table("job_runs").select("*")
+        if job_name:
+            query = query.eq("job_name", job_name)
+        return query.order("created_at", desc=True).limit(limit).execute().data or []
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        response = get_supabase().table("job_runs").select("*").eq("id", run_id).execute()
+        return response.data[0] if response.data else None
+
+    # ============ Running ============
+
+    async def _execute(self, spec: JobSpec, run_id: Optional[str], params: Dict[str, Any], scheduled: bool) -> None:
+        """Run one job under its lock, recording the outcome."""
+        if not await asyncio.to_thread(self._acquire, spec):
+            self._update_run(run_id, {
+                "status": "skipped",
+                "error": "Another run of this job holds the lock",
+                "finished_at": _now(),
+            })
+            return
+
+        heartbeat = asyncio.create_task(self._heartbeat(spec))
+        try:
+            # Scheduled runs re-check under the lock: another worker may just have run it
+            if scheduled and spec.record_history:
+                last = await asyncio.to_thread(self._last_started, spec.name)
+                if last and (datetime.now(timezone.utc) - last).total_seconds() < spec.interval_s:
+                    return
+
+            if scheduled and spec.record_history:
+                run_id = get_supabase().table("job_runs").insert({
+                    "job_name": spec.name, "trigger": "schedule", "params": params,
+                }).execute().data[0]["id"]
+
+            started = time.perf_counter()
+            self._update_run(run_id, {"status": "running", "holder": self.holder, "started_at": _now()})
+            try:
+                result = await spec.func(**params)
+            except Exception as e:
+                self._update_run(run_id, {
+                    "status": "failed",
+                    "error": str(e),
+                    "finished_at": _now(),
+                    "duration_ms": int((time.perf_counter() - started) * 1000),
+                })
+                print(f"❌ Job {spec.name} failed: {e}")
+                return
+
+            self._update_run(run_id, {
+                "status": "succeeded",
+                "result": result if isinstance(result, dict) else {"value": result},
+                "finished_at": _now(),
+                "duration_ms": int((time.perf_counter() - started) * 1000),
+            })
+        finally:
+            heartbeat.cancel()
+            await asyncio.to_thread(self._release, spec)
+
+    def enqueue(self, job_name: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Start a manual run in the background.
+
+        Returns:
+            The job_runs id to poll for status
+        """
+        spec = self.jobs.get(job_name)
+        if spec is None:
+            raise UnknownJobError(job_name)
+
+        run_params = {**spec.default_params, **(params or {})}
+        run_id = get_supabase().table("job_runs").insert({
+            "job_name": job_name, "trigger": "manual", "params": run_params,
+        }).execute().data[0]["id"]
+
+        task = asyncio.create_task(self._execute(spec, run_id, run_params, scheduled=False))
+        self._runs[run_id] = task
+        task.add_done_callback(lambda _: self._runs.pop(run_id, None))
+        return run_id
+
+    async def _loop(self, spec: JobSpec) -> None:
+        """Run a job whenever its interval has elapsed."""
+        while True:
+            try:
+                if spec.record_history:
+                    last = await asyncio.to_thread(self._last_started, spec.name)
+                    elapsed = (datetime.now(timezone.utc) - last).total_seconds() if last else None
+                    wait = 0.0 if elapsed is None else max(spec.interval_s - elapsed, 0.0)
+                else:
+                    wait = 0.0
+                if wait > 0:
+                    await asyncio.sleep(min(wait, POLL_INTERVAL_S))
+                    continue
+                await self._execute(spec, None, dict(spec.default_params), scheduled=True)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Scheduler loop for {spec.name} failed: {e}")
+            if not spec.record_history:
+                await asyncio.sleep(spec.interval_s)
+            else:
+                await asyncio.sleep(POLL_INTERVAL_S)
+
+    def start(self) -> None:
+        """Start a background loop for every job with a cadence."""
+        for spec in self.jobs.values():
+            if spec.interval_s > 0:
+                self._loops.append(asyncio.create_task(self._loop(spec)))
+
+    async def stop(self) -> None:
+        """Cancel loops and in-flight runs (their locks expire with the lease)."""
+        tasks = self._loops + list(self._runs.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loops = []
+
+
+def _default_jobs() -> List[JobSpec]:
+    settings = get_settings()
+    return [
+        JobSpec("daily_maintenance", run_all_maintenance, settings.schedule_daily_maintenance_s),
+        JobSpec(
+            "refresh_creator_stats", refresh_all_creator_stats, settings.schedule_creator_stats_s,
+            lock_ttl_s=1800, default_params={"resume": True, "concurrency": 8}
+        ),
+        JobSpec("refresh_avatars", refresh_all_avatars, settings.schedule_avatars_s),
+        # Frequent and cheap - no history rows
+        JobSpec("trade_events", consume_trade_events, settings.trade_events_interval_s,
+                lock_ttl_s=120, record_history=False),
+        # Manual only; one export at a time keeps the ledger scan load bounded
+        JobSpec("ledger_export", export_ledger, 0, lock_ttl_s=1800),
+    ]
+
+
+# Singleton instance
+_scheduler: Optional[Scheduler] = None
+
+
+def get_scheduler() -> Scheduler:
+    """Get the scheduler instance with the default jobs registered."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = Scheduler()
+        for spec in _default_jobs():
+            _scheduler.register(spec)
+    return _scheduler
@@ -8,6 +8,7 @@ for creator token trading.
 from dataclasses import dataclass
 from typing import Tuple
 from ..config import get_settings
+from ..utils.tracing import traced
 
 
 @dataclass
@@ -92,6 +93,7 @@ class TradingEngine:
             return 0.0
         return nmbr_reserve / token_supply
     
+    @traced("engine.calculate_buy")
     def calculate_buy(
         self,
         nmbr_amount: float,
@@ -150,6 +152,7 @@ class TradingEngine:
             new_price=new_price
         )
     
+    @traced("engine.calculate_sell")
     def calculate_sell(
         self,
         token_amount: float,
@@ -230,6 +233,7 @@ class TradingEngine:
         result = self.calculate_sell(token_amount, nmbr_reserve, token_supply)
         return result.output_amount
     
+    @traced("engine.check_slippage")
     def check_slippage(
         self,
         expected_output: float,
@@ -0,0 +1,131 @@
+"""
+Startup Warm-up
+
+Loads a worker's clients and caches before it takes traffic, so the first
+requests after a deploy don't each pay for building them:
+
+- supabase:    the Supabase client (imports the SDK)
+- pool_stats:  rolling 24h volume/price change per pool (rolling_stats.py)
+- leaderboard: the ranked leaderboard snapshot (leaderboard_service.py)
+
+Tasks run in the background from the app's lifespan, at most
+Settings.warmup_concurrency at a time, each in its own try so one failing
+doesn't stop the rest. A failed task leaves that path cold (it loads on
+first use, as before) and is reported, not retried.
+
+GET /health?ready=true reports the state of each task and answers 503
+until warm-up has finished, so a load balancer only routes to warmed
+workers. After Settings.warmup_timeout_s the worker reports ready even if
+a task is still running, so a slow database can't keep every worker out
+of rotation.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ..config import get_settings
+
+
+@dataclass
+class WarmupTask:
+    """One cache or client to load; `load` returns a short summary (e.g. a row count) or None."""
+    name: str
+    load: Callable[[], Awaitable[Any]]
+    status: str = "pending"  # pending, loading, ready, failed
+    load_ms: Optional[float] = None
+    detail: Any = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        entry = {"status": self.status, "load_ms": self.load_ms}
+        if self.detail is not None:
+            entry["detail"] = self.detail
+        if self.error:
+            entry["error"] = self.error
+        return entry
+
+
+async def _load_supabase():
+    from ..database import get_supabase
+    await asyncio.to_thread(get_supabase)
+
+
+async def _load_pool_stats() -> int:
+    from .rolling_stats import get_rolling_stats
+    # Until this succeeds, reads use the stored pool values
+    return await asyncio.to_thread(get_rolling_stats().hydrate)
+
+
+async def _load_leaderboard() -> int:
+    from .leaderboard_service import get_leaderboard_cache
+    return await get_leaderboard_cache().warm()
+
+
+@dataclass
+class Warmup:
+    """Runs the warm-up tasks and tracks their progress for readiness checks."""
+    tasks: List[WarmupTask] = field(default_factory=list)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def register(self, name: str, load: Callable[[], Awaitable[Any]]) -> None:
+        self.tasks.append(WarmupTask(name, load))
+
+    async def _run_task(self, task: WarmupTask, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            task.status = "loading"
+            started = time.perf_counter()
+            try:
+                task.detail = await task.load()
+                task.status = "ready"
+            except Exception as e:
+                task.status = "failed"
+                task.error = str(e)
+                print(f"⚠️ Warm-up of {task.name} failed, it will load on first use: {e}")
+            task.load_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    async def run(self, concurrency: int) -> None:
+        """Run every registered task, at most `concurrency` at once."""
+        self.started_at = time.monotonic()
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        await asyncio.gather(*[self._run_task(task, semaphore) for task in self.tasks])
+        self.finished_at = time.monotonic()
+        summary = ", ".join(f"{t.name} {t.status} in {t.load_ms}ms" for t in self.tasks)
+        print(f"Warm-up finished: {summary}")
+
+    def is_ready(self) -> bool:
+        """Warm-up finished, or has run longer than Settings.warmup_timeout_s."""
+        if self.finished_at is not None:
+            return True
+        if self.started_at is None:
+            return False
+        return time.monotonic() - self.started_at >= get_settings().warmup_timeout_s
+
+    def status(self) -> Dict[str, Any]:
+        if self.finished_at is None:
+            state = "warming" if self.started_at is not None else "cold"
+        elif any(t.status == "failed" for t in self.tasks):
+            state = "degraded"
+        else:
+            state = "warm"
+        return {
+            "state": state,
+            "ready": self.is_ready(),
+            "caches": {t.name: t.to_dict() for t in self.tasks},
+        }
+
+
+_warmup: Optional[Warmup] = None
+
+
+def get_warmup() -> Warmup:
+    """Get the warm-up runner with the default tasks registered."""
+    global _warmup
+    if _warmup is None:
+        _warmup = Warmup()
+        _warmup.register("supabase", _load_supabase)
+        _warmup.register("pool_stats", _load_pool_stats)
+        _warmup.register("leaderboard", _load_leaderboard)
+    return _warmup
@@ -1,36 +1,72 @@
 """
 YouTube Data API v3 Service for fetching creator statistics.
 """
-import httpx
-from typing import Optional, Dict, Any, List
+from typing import TYPE_CHECKING, Optional, Dict, Any, List
 from datetime import datetime, timedelta
 import re
 
 from ..config import get_settings
+from ..utils.http_client import get_http_client
+from ..utils.metrics import YOUTUBE_QUOTA_UNITS
+from ..utils.request_metrics import timed_call
 
-settings = get_settings()
+if TYPE_CHECKING:
+    import httpx
 
-YOUTUBE_API_BASE = "https://www.googleapis.com/youtube/v3"
+# channels.list accepts at most 50 comma-separated IDs per call
+MAX_IDS_PER_REQUEST = 50
+
+# Quota units charged per call (search is expensive, list calls cost 1)
+QUOTA_COST = {"search": 100}
+
+
+class QuotaExceededError(Exception):
+    """Raised when the YouTube Data API rejects a call because the daily quota is spent."""
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Whether a failed call is worth retrying: 429s, 5xx and network errors."""
+    import httpx
+
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(error, httpx.TransportError)
 
 
 class YouTubeService:
     """Service for interacting with YouTube Data API v3."""
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, api_base: str = None):
+        settings = get_settings()
         self.api_key = api_key or settings.youtube_api_key
+        self.api_base = (api_base or settings.youtube_api_base).rstrip("/")
         
     async def _make_request(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """Make a request to YouTube API."""
         params["key"] = self.api_key
         
-        async with httpx.AsyncClient() as client:
+        YOUTUBE_QUOTA_UNITS.inc(QUOTA_COST.get(endpoint, 1), endpoint=endpoint)
+        client = get_http_client()
+        with timed_call("youtube", endpoint):
             response = await client.get(
-                f"{YOUTUBE_API_BASE}/{endpoint}",
+                f"{self.api_base}/{endpoint}",
                 params=params,
                 timeout=10.0
             )
-            response.raise_for_status()
-            return response.json()
+        if response.status_code == 403 and self._is_quota_error(response):
+            raise QuotaExceededError(f"YouTube quota exceeded on {endpoint}")
+        response.raise_for_status()
+        return response.json()
+    
+    @staticmethod
+    def _is_quota_error(response: "httpx.Response") -> bool:
+        """Check whether a 403 response is a quota rejection rather than a permission error."""
+        try:
+            errors = response.json().get("error", {}).get("errors", [])
+        except ValueError:
+            return False
+        return any(e.get("reason") in ("quotaExceeded", "dailyLimitExceeded") for e in errors)
     
     def extract_channel_id(self, url_or_id: str) -> Optional[str]:
         """
@@ -142,11 +178,60 @@ class YouTubeService:
                     "view_count_lifetime": int(stats.get("viewCount", 0)),
                     "video_count": int(stats.get("videoCount", 0)),
                 }
+        except QuotaExceededError:
+            raise
         except Exception:
             pass
         
         return None
     
+    async def get_channels_stats(self, channel_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get statistics for many channels, 50 IDs per API call.
+        
+        Costs 1 quota unit per 50 channels instead of 1 per channel.
+        Channels that YouTube doesn't return are missing from the result.
+        """
+        results = {}
+        for i in range(0, len(channel_ids), MAX_IDS_PER_REQUEST):
+            chunk = channel_ids[i:i + MAX_IDS_PER_REQUEST]
+            data = await self._make_request("channels", {
+                "part": "statistics",
+                "id": ",".join(chunk),
+                "maxResults": MAX_IDS_PER_REQUEST
+            })
+            
+            for item in data.get("items", []):
+                stats = item.get("statistics", {})
+                results[item["id"]] = {
+                    "subscriber_count": int(stats.get("subscriberCount", 0)),
+                    "view_count_lifetime": int(stats.get("viewCount", 0)),
+                    "video_count": int(stats.get("videoCount", 0)),
+                }
+        
+        return results
+    
+    async def get_channels_by_ids(self, channel_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get detailed channel information for many channels, 50 IDs per API call.
+        
+        Same shape as get_channel_by_id, keyed by channel ID.
+        Channels that YouTube doesn't return are missing from the result.
+        """
+        results = {}
+        for i in range(0, len(channel_ids), MAX_IDS_PER_REQUEST):
+            chunk = channel_ids[i:i + MAX_IDS_PER_REQUEST]
+            data = await self._make_request("channels", {
+                "part": "snippet,statistics,brandingSettings",
+                "id": ",".join(chunk),
+                "maxResults": MAX_IDS_PER_REQUEST
+            })
+            
+            for item in data.get("items", []):
+                results[item["id"]] = self._parse_channel_data(item)
+        
+        return results
+    
     async def get_recent_videos(self, channel_id: str, max_results: int = 10) -> List[Dict[str, Any]]:
         """Get recent videos from a channel."""
         try:
@@ -193,6 +278,8 @@ class YouTubeService:
                 })
             
             return videos
+        except QuotaExceededError:
+            raise
         except Exception as e:
             print(f"Error fetching videos for {channel_id}: {e}")
             return []
@@ -257,97 +344,37 @@ class YouTubeService:
     ) -> float:
         """
         Calculate Creator Performance Index (CPI) score.
-        
-        IMPROVED FORMULA v2:
-        - Uses logarithmic scaling for all components for fairness
-        - Has a minimum floor based on subscribers (channels always have value)
-        - More balanced weights when 30-day views unavailable
-        
-        Components:
-        - Subscribers: Base value floor (logarithmic)
-        - 30-day views: Engagement/momentum indicator
-        - Lifetime views: Legacy/credibility
-        - Engagement ratio: Views per subscriber (efficiency)
+        Delegates to app.utils.cpi, the canonical implementation.
         
         Output is used for: Initial_Market_Cap = CPI × $100
         """
-        import math
-        
-        if subscriber_count == 0:
-            return 10.0  # Minimum CPI for any channel
-        
-        # === COMPONENT 1: Subscriber Base (40% weight when views available, 70% as fallback) ===
-        # Logarithmic scale: ln(1K)=6.9, ln(10K)=9.2, ln(100K)=11.5, ln(1M)=13.8, ln(10M)=16.1, ln(100M)=18.4
-        # Scale to 0-100 range: divide by 20 (max ~18.4 for 100M subs) then multiply by 100
-        subscriber_score = (math.log(max(subscriber_count, 1)) / 20) * 100
-        
-        # === COMPONENT 2: 30-day Views Momentum ===
-        # If we have 30-day views, use them; otherwise estimate from lifetime
-        if view_count_30d > 0:
-            # Logarithmic scale for views too
-            # ln(1M)=13.8, ln(10M)=16.1, ln(100M)=18.4, ln(1B)=20.7
-            views_30d_score = (math.log(max(view_count_30d, 1)) / 25) * 100
-            has_recent_data = True
-        else:
-            # Fallback: estimate 30-day views as ~2% of lifetime views (rough approximation)
-            estimated_30d = max(view_count_lifetime * 0.02, 1)
-            views_30d_score = (math.log(estimated_30d) / 25) * 100 * 0.5  # Discount by 50% for estimation
-            has_recent_data = False
-        
-        # === COMPONENT 3: Lifetime Legacy ===
-        # ln(1B)=20.7, ln(10B)=23, ln(50B)=24.6
-        lifetime_score = (math.log(max(view_count_lifetime, 1)) / 25) * 100 if view_count_lifetime > 0 else 0
-        
-        # === COMPONENT 4: Engagement Ratio (views per subscriber) ===
-        # High ratio = engaged audience, low ratio = inactive subscribers
-        if view_count_lifetime > 0 and subscriber_count > 0:
-            views_per_sub = view_count_lifetime / subscriber_count
-            # Expected range: 100-5000 views per sub
-            # ln(100)=4.6, ln(1000)=6.9, ln(5000)=8.5
-            engagement_score = min((math.log(max(views_per_sub, 1)) / 10) * 100, 100)
-        else:
-            engagement_score = 50  # Neutral default
-        
-        # === FINAL CPI CALCULATION ===
-        if has_recent_data:
-            # Full formula with recent data
-            cpi = (
-                0.35 * subscriber_score +    # 35% - Base stability
-                0.40 * views_30d_score +     # 40% - Recent momentum (key driver)
-                0.15 * lifetime_score +       # 15% - Legacy
-                0.10 * engagement_score       # 10% - Efficiency bonus
-            )
-        else:
-            # Fallback formula when 30-day data unavailable
-            cpi = (
-                0.55 * subscriber_score +    # 55% - Rely more on subs
-                0.20 * views_30d_score +     # 20% - Estimated views (discounted)
-                0.15 * lifetime_score +       # 15% - Legacy
-                0.10 * engagement_score       # 10% - Efficiency bonus
-            )
-        
-        # Scale to target range: ~100-1000 for typical creators
-        # Raw CPI is typically 20-80, multiply by 12 to get 240-960 range
-        cpi_scaled = cpi * 12
-        
-        # Minimum floor of 50 CPI (ensures $5,000 minimum market cap)
-        return round(max(cpi_scaled, 50.0), 1)
+        # cpi pulls in numpy; imported here so it isn't paid at app startup
+        from ..utils.cpi import calculate_cpi
+        return calculate_cpi(subscriber_count, view_count_30d, view_count_lifetime)
     
     def calculate_initial_market_cap(self, cpi_score: float) -> float:
         """
         Calculate initial market cap from CPI score.
         Formula: Initial_Market_Cap = CPI × $100
         """
-        return cpi_score * 100
+        from ..utils.cpi import cpi_to_market_cap
+        return cpi_to_market_cap(cpi_score)
     
-    def calculate_initial_price(self, cpi_score: float, token_supply: int = 9_000_000) -> float:
+    def calculate_initial_price(self, cpi_score: float, token_supply: Optional[int] = None) -> float:
         """
         Calculate initial token price from CPI score.
-        Price = Market_Cap / Token_Supply
+        Price = Market_Cap / Token_Supply (default: DEFAULT_POOL_SUPPLY)
         """
-        market_cap = self.calculate_initial_market_cap(cpi_score)
-        return market_cap / token_supply
+        from ..utils.cpi import cpi_to_initial_price, DEFAULT_POOL_SUPPLY
+        return cpi_to_initial_price(cpi_score, token_supply or DEFAULT_POOL_SUPPLY)
+
+
+_youtube_service: Optional[YouTubeService] = None
 
 
-# Singleton instance
-youtube_service = YouTubeService()
+def get_youtube_service() -> YouTubeService:
+    """Get the YouTube service singleton (created on first use, not at import)."""
+    global _youtube_service
+    if _youtube_service is None:
+        _youtube_service = YouTubeService()
+    return _youtube_service
@@ -0,0 +1,184 @@
+"""
+Bulk Write Utility
+
+Chunked multi-row writes for catalogue-wide rewrites (CPI recalculation,
+avatar refresh, symbol cleanup, pool creation, stats refresh).
+
+- bulk_update: partial updates keyed by a column, via the bulk_update_rows
+  server-side function (one round trip per chunk)
+- bulk_insert: multi-row insert, or upsert when on_conflict is given
+
+Failed chunks are retried with exponential backoff. With dry_run=True
+nothing is written; the result lists what would change instead.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..database import get_supabase
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+@dataclass
+class BulkWriteResult:
+    """What a bulk write did (or, in dry-run mode, would do)."""
+    table: str
+    rows: int = 0
+    written: int = 0
+    chunks: int = 0
+    failed_chunks: int = 0
+    retries: int = 0
+    elapsed_s: float = 0.0
+    dry_run: bool = False
+    changes: List[Dict[str, Any]] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+
+def _chunks(rows: List[Dict[str, Any]], size: int) -> Iterable[List[Dict[str, Any]]]:
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def _group_by_columns(rows: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Split rows into groups that share the same set of columns."""
+    groups: Dict[tuple, List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    return list(groups.values())
+
+
+def _with_retries(result: BulkWriteResult, max_retries: int, write) -> Optional[int]:
+    """Run one chunk write, retrying with backoff. Returns rows written or None."""
+    for attempt in range(max_retries + 1):
+        try:
+            return write()
+        except Exception as e:
+            if attempt == max_retries:
+                result.failed_chunks += 1
+                result.errors.append(str(e))
+                return None
+            result.retries += 1
+            time.sleep(0.5 * 2 ** attempt)
+
+
+def _diff_updates(
+    table: str,
+    rows: List[Dict[str, Any]],
+    key: str,
+    chunk_size: int
+) -> List[Dict[str, Any]]:
+    """Compare rows against the database; return only the columns that would change."""
+    supabase = get_supabase()
+    columns = sorted({c for row in rows for c in row} | {key})
+    changes = []
+
+    for chunk in _chunks(rows, chunk_size):
+        current = supabase.table(table).select(", ".join(columns)).in_(
+            key, [row[key] for row in chunk]
+        ).execute()
+        current_by_key = {str(r[key]): r for r in (current.data or [])}
+
+        for row in chunk:
+            existing = current_by_key.get(str(row[key]))
+            if existing is None:
+                changes.append({key: row[key], "_missing": True})
+                continue
+            diff = {
+                col: {"old": existing.get(col), "new": value}
+                for col, value in row.items()
+                if col != key and existing.get(col) != value
+            }
+            if diff:
+                changes.append({key: row[key], **diff})
+
+    return changes
+
+
+def bulk_update(
+    table: str,
+    rows: List[Dict[str, Any]],
+    key: str = "id",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_retries: int = 3,
+    dry_run: bool = False
+) -> BulkWriteResult:
+    """
+    Update many existing rows, one round trip per chunk.
+
+    Each row must contain `key` plus the columns to set; other columns are
+    left untouched. Rows don't all need the same columns.
+
+    Args:
+        table: Table to update (must be allowed by bulk_update_rows)
+        rows: Partial rows, each with the key column
+        key: Column identifying the row to update
+        chunk_size: Rows per round trip
+        max_retries: Retries per failed chunk before giving up on it
+        dry_run: Don't write; report per-row column diffs in `changes`
+    """
+    supabase = get_supabase()
+    started = time.perf_counter()
+    result = BulkWriteResult(table=table, rows=len(rows), dry_run=dry_run)
+
+    if dry_run:
+        result.changes = _diff_updates(table, rows, key, chunk_size)
+        result.elapsed_s = time.perf_counter() - started
+        return result
+
+    for group in _group_by_columns(rows):
+        for chunk in _chunks(group, chunk_size):
+            result.chunks += 1
+            written = _with_retries(result, max_retries, lambda: supabase.rpc("bulk_update_rows", {
+                "target_table": table,
+                "key_column": key,
+                "rows": chunk,
+            }).execute().data)
+            result.written += written or 0
+
+    result.elapsed_s = time.perf_counter() - started
+    return result
+
+
+def bulk_insert(
+    table: str,
+    rows: List[Dict[str, Any]],
+    on_conflict: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_retries: int = 3,
+    dry_run: bool = False
+) -> BulkWriteResult:
+    """
+    Insert many rows with multi-row inserts, one round trip per chunk.
+
+    With on_conflict set, rows that collide on that column are updated
+    instead (upsert) - in that case rows must include all NOT NULL columns.
+
+    Args:
+        table: Table to insert into
+        rows: Complete rows
+        on_conflict: Comma-separated conflict target for upserts
+        chunk_size: Rows per round trip
+        max_retries: Retries per failed chunk before giving up on it
+        dry_run: Don't write; list the rows that would be inserted in `changes`
+    """
+    supabase = get_supabase()
+    started = time.perf_counter()
+    result = BulkWriteResult(table=table, rows=len(rows), dry_run=dry_run)
+
+    if dry_run:
+        result.changes = list(rows)
+        result.elapsed_s = time.perf_counter() - started
+        return result
+
+    for chunk in _chunks(rows, chunk_size):
+        result.chunks += 1
+        if on_conflict:
+            write = lambda: len(supabase.table(table).upsert(chunk, on_conflict=on_conflict).execute().data or [])
+        else:
+            write = lambda: len(supabase.table(table).insert(chunk).execute().data or [])
+        result.written += _with_retries(result, max_retries, write) or 0
+
+    result.elapsed_s = time.perf_counter() - started
+    return result
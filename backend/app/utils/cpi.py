@@ -6,120 +6,182 @@ IMPROVED VERSION v2:
 - Has minimum floor based on subscribers (channels always have value)
 - Gracefully handles missing 30-day view data
 - Includes engagement ratio as a quality signal
+
+This is the single source of truth for CPI. The formula is implemented once,
+vectorized over NumPy column arrays (calculate_cpi_batch), so the whole
+catalogue can be rescored in one pass. calculate_cpi is a scalar wrapper
+for call sites that score one creator at a time.
 """
 
-import math
+from dataclasses import dataclass
+from typing import Sequence, Union
 
+import numpy as np
 
-def calculate_cpi(
-    subscriber_count: int,
-    views_30d: int,
-    lifetime_views: int
-) -> float:
+# Floor for every creator, including channels with no subscribers
+MIN_CPI = 50.0
+
+# Market Cap = CPI × $100
+MARKET_CAP_PER_CPI = 100
+
+# Tokens placed in a new pool (90% of the 10M total supply)
+DEFAULT_POOL_SUPPLY = 9_000_000
+
+# Lower bound of each tier after Micro
+TIER_BOUNDS = np.array([100, 300, 500, 700, 900])
+TIER_NAMES = np.array(["Micro", "Rising", "Established", "Major", "Mega", "Legendary"])
+
+ArrayLike = Union[Sequence[float], np.ndarray]
+
+
+@dataclass
+class CPIBatch:
+    """CPI outputs for a batch of creators, aligned with the input arrays."""
+    cpi_scores: np.ndarray
+    tiers: np.ndarray
+    initial_prices: np.ndarray
+
+
+def calculate_cpi_array(
+    subscriber_counts: ArrayLike,
+    views_30d: ArrayLike,
+    lifetime_views: ArrayLike
+) -> np.ndarray:
     """
-    Calculate Creator Performance Index using improved logarithmic formula.
-    
-    Key Improvements:
-    1. All components use logarithmic scaling (not just subscribers)
-    2. Fallback estimation when 30-day views unavailable
-    3. Engagement ratio rewards efficient channels
-    4. Minimum floor ensures all channels have tradeable value
-    
+    Calculate Creator Performance Index for many creators at once.
+
     Components:
     - Subscribers: 35-55% (base stability, higher weight when views missing)
     - 30-day views: 20-40% (momentum/hype)
     - Lifetime views: 15% (legacy/credibility)
     - Engagement ratio: 10% (views per subscriber efficiency)
-    
-    Output: CPI score typically 50-1000
-    Market Cap = CPI × $100 (so $5,000 to $100,000)
-    
+
+    When 30-day views are unavailable (0), they are estimated as 2% of
+    lifetime views, discounted by half, and subscribers carry more weight.
+
     Args:
-        subscriber_count: Current subscriber count
-        views_30d: Views in the last 30 days (0 if unavailable)
-        lifetime_views: Total lifetime views
-    
+        subscriber_counts: Current subscriber count per creator
+        views_30d: Views in the last 30 days per creator (0 if unavailable)
+        lifetime_views: Total lifetime views per creator
+
     Returns:
-        CPI score (minimum 50, typical range 100-800)
+        Array of CPI scores (minimum 50, typical range 100-800), rounded to 0.1
     """
-    if subscriber_count == 0:
-        return 50.0  # Minimum CPI
-    
+    subs = np.asarray(subscriber_counts, dtype=np.float64)
+    recent = np.asarray(views_30d, dtype=np.float64)
+    lifetime = np.asarray(lifetime_views, dtype=np.float64)
+
     # === COMPONENT 1: Subscriber Base ===
     # ln scale: ln(1K)=6.9, ln(10K)=9.2, ln(100K)=11.5, ln(1M)=13.8, ln(10M)=16.1
-    subscriber_score = (math.log(max(subscriber_count, 1)) / 20) * 100
-    
+    subscriber_score = np.log(np.maximum(subs, 1)) / 20 * 100
+
     # === COMPONENT 2: 30-day Views ===
-    if views_30d > 0:
-        views_30d_score = (math.log(max(views_30d, 1)) / 25) * 100
-        has_recent_data = True
-    else:
-        # Estimate from lifetime (2% monthly approximation, discounted)
-        estimated_30d = max(lifetime_views * 0.02, 1)
-        views_30d_score = (math.log(estimated_30d) / 25) * 100 * 0.5
-        has_recent_data = False
-    
+    # Without recent data, estimate from lifetime (2% monthly approximation, discounted)
+    has_recent_data = recent > 0
+    views_30d_score = np.where(
+        has_recent_data,
+        np.log(np.maximum(recent, 1)) / 25 * 100,
+        np.log(np.maximum(lifetime * 0.02, 1)) / 25 * 100 * 0.5
+    )
+
     # === COMPONENT 3: Lifetime Legacy ===
-    lifetime_score = (math.log(max(lifetime_views, 1)) / 25) * 100 if lifetime_views > 0 else 0
-    
+    lifetime_score = np.log(np.maximum(lifetime, 1)) / 25 * 100
+
     # === COMPONENT 4: Engagement Ratio ===
-    if lifetime_views > 0 and subscriber_count > 0:
-        views_per_sub = lifetime_views / subscriber_count
-        engagement_score = min((math.log(max(views_per_sub, 1)) / 10) * 100, 100)
-    else:
-        engagement_score = 50
-    
+    views_per_sub = lifetime / np.maximum(subs, 1)
+    engagement_score = np.where(
+        (lifetime > 0) & (subs > 0),
+        np.minimum(np.log(np.maximum(views_per_sub, 1)) / 10 * 100, 100),
+        50
+    )
+
     # === WEIGHTED SUM ===
-    if has_recent_data:
-        cpi = (
-            0.35 * subscriber_score +
-            0.40 * views_30d_score +
-            0.15 * lifetime_score +
-            0.10 * engagement_score
-        )
-    else:
-        cpi = (
-            0.55 * subscriber_score +
-            0.20 * views_30d_score +
-            0.15 * lifetime_score +
-            0.10 * engagement_score
-        )
-    
+    subscriber_weight = np.where(has_recent_data, 0.35, 0.55)
+    views_weight = np.where(has_recent_data, 0.40, 0.20)
+    cpi = (
+        subscriber_weight * subscriber_score +
+        views_weight * views_30d_score +
+        0.15 * lifetime_score +
+        0.10 * engagement_score
+    )
+
     # Scale to 100-1000 range
-    cpi_scaled = cpi * 12
-    
-    return round(max(cpi_scaled, 50.0), 1)
+    cpi_scaled = np.round(np.maximum(cpi * 12, MIN_CPI), 1)
+
+    return np.where(subs == 0, MIN_CPI, cpi_scaled)
+
+
+def calculate_cpi_batch(
+    subscriber_counts: ArrayLike,
+    views_30d: ArrayLike,
+    lifetime_views: ArrayLike,
+    token_supply: float = DEFAULT_POOL_SUPPLY
+) -> CPIBatch:
+    """
+    Calculate CPI, tier and initial token price for many creators in one pass.
+
+    Args:
+        subscriber_counts: Current subscriber count per creator
+        views_30d: Views in the last 30 days per creator (0 if unavailable)
+        lifetime_views: Total lifetime views per creator
+        token_supply: Tokens in each liquidity pool (default 9M)
+
+    Returns:
+        CPIBatch with one entry per creator, in input order
+    """
+    cpi_scores = calculate_cpi_array(subscriber_counts, views_30d, lifetime_views)
+    return CPIBatch(
+        cpi_scores=cpi_scores,
+        tiers=TIER_NAMES[np.searchsorted(TIER_BOUNDS, cpi_scores, side="right")],
+        initial_prices=cpi_scores * MARKET_CAP_PER_CPI / token_supply if token_supply > 0 else np.zeros_like(cpi_scores),
+    )
+
+
+def calculate_cpi(
+    subscriber_count: int,
+    views_30d: int,
+    lifetime_views: int
+) -> float:
+    """
+    Calculate CPI for a single creator.
+
+    Scalar wrapper around calculate_cpi_array; see it for the formula.
+
+    Returns:
+        CPI score (minimum 50, typical range 100-800)
+    """
+    return float(calculate_cpi_array([subscriber_count], [views_30d], [lifetime_views])[0])
 
 
 def cpi_to_market_cap(cpi_score: float) -> float:
     """
     Convert CPI score to initial market cap in $NMBR.
-    
+
     Simple linear formula: Market Cap = CPI × 100
-    
+
     Examples:
     - CPI 850 → $85,000 market cap
     - CPI 350 → $35,000 market cap
-    
+
     Args:
         cpi_score: CPI score (0-1000)
-    
+
     Returns:
         Initial market cap in $NMBR
     """
-    return cpi_score * 100
+    return cpi_score * MARKET_CAP_PER_CPI
 
 
-def cpi_to_initial_price(cpi_score: float, token_supply: float = 9_000_000) -> float:
+def cpi_to_initial_price(cpi_score: float, token_supply: float = DEFAULT_POOL_SUPPLY) -> float:
     """
     Calculate initial token price from CPI.
-    
+
     Price = Market Cap / Token Supply
-    
+
     Args:
         cpi_score: CPI score (0-1000)
         token_supply: Tokens in liquidity pool (default 9M)
-    
+
     Returns:
         Initial price per token
     """
@@ -130,22 +192,11 @@ def cpi_to_initial_price(cpi_score: float, token_supply: float = 9_000_000) -> f
 def get_cpi_tier(cpi_score: float) -> str:
     """
     Get human-readable tier for CPI score.
-    
+
     Args:
         cpi_score: CPI score (0-1000)
-    
+
     Returns:
         Tier name (Micro, Rising, Established, Major, Mega, Legendary)
     """
-    if cpi_score < 100:
-        return "Micro"
-    elif cpi_score < 300:
-        return "Rising"
-    elif cpi_score < 500:
-        return "Established"
-    elif cpi_score < 700:
-        return "Major"
-    elif cpi_score < 900:
-        return "Mega"
-    else:
-        return "Legendary"
+    return str(TIER_NAMES[np.searchsorted(TIER_BOUNDS, cpi_score, side="right")])
@@ -0,0 +1,118 @@
+"""
+DAG Runner Utility
+
+Runs async steps that declare their dependencies, as many at a time as
+the dependency graph and a concurrency limit allow.
+
+Each step is retried on failure with exponential backoff. If a step still
+fails, everything downstream of it is skipped, while independent branches
+carry on. The report has per-step status, attempts, start offset and
+duration.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List
+
+
+@dataclass
+class Step:
+    """One node of the graph."""
+    name: str
+    func: Callable[[], Awaitable[Any]]
+    depends_on: List[str] = field(default_factory=list)
+
+
+class DAGError(Exception):
+    """Raised for graphs with unknown dependencies or cycles."""
+
+
+def _validate(steps: Dict[str, Step]) -> None:
+    for step in steps.values():
+        for dep in step.depends_on:
+            if dep not in steps:
+                raise DAGError(f"Step {step.name} depends on unknown step {dep}")
+
+    # Kahn's algorithm: every step must become ready at some point
+    remaining = {name: set(step.depends_on) for name, step in steps.items()}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise DAGError(f"Dependency cycle among: {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+async def run_dag(
+    steps: List[Step],
+    concurrency: int = 3,
+    max_retries: int = 2,
+    retry_backoff_s: float = 1.0
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Execute the steps respecting dependencies.
+
+    Args:
+        steps: Graph nodes; order doesn't matter
+        concurrency: Max steps running at once
+        max_retries: Extra attempts per failing step
+        retry_backoff_s: Delay before the first retry, doubling after
+
+    Returns:
+        {step name: {"status", "attempts", "started_s", "duration_s", "result" | "error"}}
+        with status "succeeded", "failed" or "skipped"
+    """
+    by_name = {step.name: step for step in steps}
+    _validate(by_name)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    started = time.perf_counter()
+    done: Dict[str, asyncio.Task] = {}
+    report: Dict[str, Dict[str, Any]] = {}
+
+    async def run_step(step: Step) -> bool:
+        # Wait for dependencies; skip if any of them didn't succeed
+        results = await asyncio.gather(*[done[dep] for dep in step.depends_on])
+        if not all(results):
+            failed = [dep for dep, ok in zip(step.depends_on, results) if not ok]
+            report[step.name] = {"status": "skipped", "attempts": 0, "error": f"Upstream failed: {', '.join(failed)}"}
+            return False
+
+        async with semaphore:
+            step_started = time.perf_counter()
+            for attempt in range(1, max_retries + 2):
+                try:
+                    result = await step.func()
+                    report[step.name] = {
+                        "status": "succeeded",
+                        "attempts": attempt,
+                        "started_s": round(step_started - started, 3),
+                        "duration_s": round(time.perf_counter() - step_started, 3),
+                        "result": result,
+                    }
+                    return True
+                except Exception as e:
+                    if attempt > max_retries:
+                        report[step.name] = {
+                            "status": "failed",
+                            "attempts": attempt,
+                            "started_s": round(step_started - started, 3),
+                            "duration_s": round(time.perf_counter() - step_started, 3),
+                            "error": str(e),
+                        }
+                        return False
+                    await asyncio.sleep(retry_backoff_s * 2 ** (attempt - 1))
+
+    # Tasks are created in dependency order so every dependency exists in `done`
+    pending = dict(by_name)
+    while pending:
+        for name, step in list(pending.items()):
+            if all(dep in done for dep in step.depends_on):
+                done[name] = asyncio.create_task(run_step(step))
+                del pending[name]
+
+    await asyncio.gather(*done.values())
+    return {name: report[name] for name in by_name}
@@ -0,0 +1,219 @@
+"""
+HTTP Caching Utility
+
+ETags, Cache-Control and 304s for read endpoints whose data only changes
+when this process writes it.
+
+Writers call mark_changed() after they commit (a trade on a creator, a
+maintenance step, a stats refresh). Each cached route derives a version
+from those counters (plus anything else its body depends on), and the
+ETag is a hash of the process nonce, route, path, query and version:
+
+- If-None-Match with the current ETag gets a 304 before the route runs,
+  so no database round trip is made.
+- Public 200 bodies are kept in a small LRU keyed by ETag, so the next
+  request with the same version is answered from memory.
+- A route whose version is unknown right now (returns None) is passed
+  through untouched.
+
+The nonce changes on restart, so ETags from a previous process never
+match. Counters are per process: like rolling_stats, this assumes a single
+API worker. With several, a worker doesn't see another's writes until its
+own counters move.
+"""
+
+import hashlib
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Pattern, Tuple
+
+from .metrics import CACHE_LOOKUPS
+
+# Changes on every restart; part of every ETag
+PROCESS_NONCE = uuid.uuid4().hex
+
+# Bodies larger than this aren't kept in the LRU
+MAX_CACHED_BODY_BYTES = 2 * 1024 * 1024
+
+
+class DataVersions:
+    """Change counters for pool/creator data."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._epoch = 0  # Bumped by bulk writes that may touch any creator
+        self._pools = 0  # Bumped by every write
+        self._creators: Dict[str, int] = {}
+
+    def mark_changed(self, creator_id: Optional[str] = None) -> None:
+        """Record a committed write to one creator/pool, or to all of them if no id is given."""
+        with self._lock:
+            self._pools += 1
+            if creator_id is None:
+                self._epoch += 1
+            else:
+                self._creators[creator_id] = self._creators.get(creator_id, 0) + 1
+
+    def all_pools(self) -> Tuple[int, int]:
+        """Version of anything that lists every creator."""
+        return (self._epoch, self._pools)
+
+    def creator(self, creator_id: str) -> Tuple[int, int]:
+        """Version of one creator's row, pool and price history."""
+        return (self._epoch, self._creators.get(creator_id, 0))
+
+
+data_versions = DataVersions()
+
+
+def mark_changed(creator_id: Optional[str] = None) -> None:
+    """Invalidate cached responses for a creator (or all creators) after a write."""
+    data_versions.mark_changed(creator_id)
+
+
+@dataclass
+class CacheRule:
+    """
+    A cached route.
+
+    version gets the path match and returns what the body depends on, or
+    None to skip caching this request. Private rules also key on the
+    Authorization header and are never stored server-side.
+    """
+    name: str
+    pattern: Pattern
+    version: Callable[[re.Match], Optional[tuple]]
+    cache_control: str
+    private: bool = False
+
+
+def make_etag(rule: CacheRule, path: str, query: bytes, version: tuple, authorization: bytes) -> str:
+    digest = hashlib.blake2b(digest_size=12)
+    for part in (PROCESS_NONCE, rule.name, path, query.decode("latin-1"), repr(version)):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    if rule.private:
+        digest.update(authorization)
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """RFC 9110 weak comparison against an If-None-Match list."""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        # "*" isn't honoured: the route hasn't run, so we don't know the resource exists
+        if candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class ResponseLRU:
+    """Rendered 200 responses by ETag, least recently used evicted first."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[List[Tuple[bytes, bytes]], bytes]]" = OrderedDict()
+
+    def get(self, etag: str) -> Optional[Tuple[List[Tuple[bytes, bytes]], bytes]]:
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is not None:
+                self._entries.move_to_end(etag)
+            return entry
+
+    def put(self, etag: str, headers: List[Tuple[bytes, bytes]], body: bytes) -> None:
+        if self.max_entries <= 0 or len(body) > MAX_CACHED_BODY_BYTES:
+            return
+        with self._lock:
+            self._entries[etag] = (headers, body)
+            self._entries.move_to_end(etag)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Set by the cache on every response it touches; replaced on 304s and hits
+_CACHE_HEADERS = {b"etag", b"cache-control", b"vary"}
+
+
+class HttpCacheMiddleware:
+    """ASGI middleware applying CacheRules to GET requests."""
+
+    def __init__(self, app, rules: List[CacheRule], max_entries: int = 256):
+        self.app = app
+        self.rules = rules
+        self.lru = ResponseLRU(max_entries)
+
+    def _match(self, path: str) -> Tuple[Optional[CacheRule], Optional[re.Match]]:
+        for rule in self.rules:
+            match = rule.pattern.match(path)
+            if match:
+                return rule, match
+        return None, None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        rule, match = self._match(scope["path"])
+        version = rule.version(match) if rule else None
+        if version is None:
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = dict(scope["headers"])
+        etag = make_etag(
+            rule, scope["path"], scope.get("query_string", b""), version,
+            request_headers.get(b"authorization", b"")
+        )
+        cache_headers = [(b"etag", etag.encode()), (b"cache-control", rule.cache_control.encode())]
+        if rule.private:
+            cache_headers.append((b"vary", b"Authorization"))
+
+        if_none_match = request_headers.get(b"if-none-match", b"").decode("latin-1")
+        if if_none_match:
+            matched = etag_matches(if_none_match, etag)
+            CACHE_LOOKUPS.inc(cache="http_etag", result="hit" if matched else "miss")
+            if matched:
+                await send({"type": "http.response.start", "status": 304, "headers": cache_headers})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+        if not rule.private:
+            cached = self.lru.get(etag)
+            CACHE_LOOKUPS.inc(cache="http_response", result="hit" if cached else "miss")
+            if cached is not None:
+                headers, body = cached
+                await send({"type": "http.response.start", "status": 200, "headers": headers + cache_headers})
+                await send({"type": "http.response.body", "body": body})
+                return
+
+        await self._render(scope, receive, send, rule, etag, cache_headers)
+
+    async def _render(self, scope, receive, send, rule: CacheRule, etag: str,
+                      cache_headers: List[Tuple[bytes, bytes]]) -> None:
+        """Run the route, tag 200s with the cache headers and keep public bodies."""
+        status = 0
+        headers: List[Tuple[bytes, bytes]] = []
+        chunks: List[bytes] = []
+
+        async def send_tagged(message):
+            nonlocal status, headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if status == 200:
+                    headers = [(k, v) for k, v in message.get("headers", []) if k.lower() not in _CACHE_HEADERS]
+                    message = {**message, "headers": headers + cache_headers}
+            elif message["type"] == "http.response.body" and status == 200:
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False) and not rule.private:
+                    self.lru.put(etag, headers, b"".join(chunks))
+            await send(message)
+
+        await self.app(scope, receive, send_tagged)
@@ -0,0 +1,44 @@
+"""
+Shared HTTP Client
+
+One httpx.AsyncClient for outbound calls (YouTube Data API), so requests
+reuse pooled connections instead of paying a TCP + TLS handshake each time.
+
+The client is created on first use and closed by the app's lifespan on
+shutdown. An AsyncClient is tied to the event loop it first ran on; scripts
+and benchmarks that call asyncio.run() more than once get a fresh client
+per loop.
+"""
+
+import asyncio
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import httpx
+
+DEFAULT_TIMEOUT_S = 10.0
+
+# httpx (and certifi's CA bundle) is imported with the first outbound call
+_client: Optional["httpx.AsyncClient"] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_http_client() -> "httpx.AsyncClient":
+    """Get the shared AsyncClient for the running event loop."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        import httpx
+
+        # A client from a finished loop can't be closed cleanly any more; drop it
+        _client = httpx.AsyncClient(timeout=DEFAULT_TIMEOUT_S)
+        _client_loop = loop
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client (app shutdown)."""
+    global _client, _client_loop
+    client, _client, _client_loop = _client, None, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
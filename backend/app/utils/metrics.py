@@ -0,0 +1,165 @@
+"""
+Metrics Utility
+
+Process-wide counters and histograms, rendered in the Prometheus text
+format by GET /metrics.
+
+Every metric has a fixed set of label names, and label values come from
+code-defined sets (route templates, table/RPC names, trade sides, token
+symbols) - never user ids or raw paths. As a backstop, a metric that
+reaches MAX_SERIES distinct label combinations folds further ones into a
+single "other" series.
+
+Counters are per process; Prometheus sums across workers/instances.
+"""
+
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+MAX_SERIES = 1000
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+_registry: List["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._series: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        if key not in self._series and len(self._series) >= MAX_SERIES:
+            return ("other",) * len(self.label_names)
+        return key
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            series = list(self._series.items())
+        for key, value in sorted(series):
+            lines.extend(self._render_series(key, value))
+        return lines
+
+    def _render_series(self, key: Tuple[str, ...], value) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic count, e.g. trades executed."""
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        with self._lock:
+            key = self._key(labels)
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def _render_series(self, key, value) -> List[str]:
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"]
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets, e.g. latencies."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        with self._lock:
+            key = self._key(labels)
+            state = self._series.get(key)
+            if state is None:
+                # [per-bucket counts..., +Inf count], sum
+                state = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            counts = state[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            state[1] += value
+
+    def _render_series(self, key, value) -> List[str]:
+        counts, total = value
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            labels = _format_labels(self.label_names, key, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.label_names, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format (0.0.4)."""
+    lines: List[str] = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ============ Instruments ============
+
+# HTTP
+HTTP_REQUEST_SECONDS = Histogram(
+    "nombre_http_request_duration_seconds", "Request latency by route template",
+    ["method", "route", "status"]
+)
+HTTP_REQUEST_DB_CALLS = Histogram(
+    "nombre_http_request_db_calls", "Supabase round trips per request",
+    ["route"], buckets=COUNT_BUCKETS
+)
+
+# Outbound calls (Supabase queries/RPCs/auth, YouTube API)
+OUTBOUND_CALL_SECONDS = Histogram(
+    "nombre_outbound_call_duration_seconds", "Latency of Supabase and YouTube calls",
+    ["kind", "name"]
+)
+YOUTUBE_QUOTA_UNITS = Counter(
+    "nombre_youtube_quota_units_total", "YouTube Data API quota units spent", ["endpoint"]
+)
+
+# Trading
+TRADE_QUOTES = Counter("nombre_trade_quotes_total", "Quotes served", ["side"])
+TRADE_REJECTIONS = Counter(
+    "nombre_trade_rejections_total", "Trades refused before execution", ["side", "reason"]
+)
+TRADES_EXECUTED = Counter("nombre_trades_total", "Trades executed per pool", ["side", "pool"])
+TRADE_SECONDS = Histogram(
+    "nombre_trade_execution_duration_seconds", "Trade execution latency by stage (fetch, compute, write, total)",
+    ["side", "stage"]
+)
+
+# Caches
+CACHE_LOOKUPS = Counter("nombre_cache_lookups_total", "In-process cache lookups", ["cache", "result"])
@@ -0,0 +1,110 @@
+"""
+Keyset Pagination Utility
+
+Streams large result sets page by page without OFFSET and without hitting
+PostgREST's per-response row cap (1000 by default), which otherwise
+truncates results silently.
+
+Pages are ordered by (created_at, id) - or another timestamp column - and
+each page starts strictly after the last row of the previous one, so every
+page is an index range scan and memory stays bounded by page_size. The
+or() tie-break alone gives Postgres no range to start from, so
+after_keyset() also bounds the timestamp column on its own.
+
+encode_cursor / decode_cursor wrap the same position as an opaque token
+for API endpoints that page this way.
+"""
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+DEFAULT_PAGE_SIZE = 1000
+
+
+def keyset_filter(value: str, row_id: str, time_column: str = "created_at", descending: bool = False) -> str:
+    """PostgREST or() filter for rows strictly after (time_column, id) in the given order."""
+    op = "lt" if descending else "gt"
+    # Timestamps contain ':' and '.', so quote them for the or() syntax
+    return f'{time_column}.{op}."{value}",and({time_column}.eq."{value}",id.{op}.{row_id})'
+
+
+def after_keyset(query: Any, value: str, row_id: str, time_column: str = "created_at", descending: bool = False) -> Any:
+    """Restrict a query to rows strictly after (time_column, id) in the given order."""
+    # Plain bound first: lets the (time_column, id) indexes start the scan at the cursor
+    query = query.lte(time_column, value) if descending else query.gte(time_column, value)
+    return query.or_(keyset_filter(value, row_id, time_column, descending))
+
+
+def encode_cursor(row: Dict[str, Any], time_column: str = "created_at") -> str:
+    """Opaque API cursor pointing just past `row`."""
+    payload = json.dumps([row[time_column], row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, str]:
+    """
+    Inverse of encode_cursor; returns {"value": ..., "id": ...}.
+
+    Both parts are validated (timestamp, UUID) since they end up inside a
+    PostgREST filter string.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        row_id = str(uuid.UUID(str(row_id)))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    return {"value": str(value), "id": row_id}
+
+
+def iter_pages(
+    make_query: Callable[[], Any],
+    page_size: int = DEFAULT_PAGE_SIZE,
+    after: Optional[Dict[str, str]] = None,
+    time_column: str = "created_at",
+    descending: bool = False
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield successive pages of rows in (created_at, id) order.
+
+    Args:
+        make_query: Returns a fresh filtered query builder, e.g.
+            lambda: supabase.table("transactions").select("id, created_at, nmbr_amount").gte(...)
+            The select must include time_column and id.
+        page_size: Rows per round trip (keep <= the PostgREST max-rows setting)
+        after: Resume after this row ({time_column: ..., "id": ...})
+        time_column: Timestamp column to order by
+        descending: Newest first
+    """
+    cursor = after
+    while True:
+        query = make_query()
+        if cursor:
+            query = after_keyset(query, cursor[time_column], cursor["id"], time_column, descending)
+        query = query.order(time_column, desc=descending).order("id", desc=descending)
+        rows = query.limit(page_size).execute().data or []
+        if not rows:
+            return
+        yield rows
+        if len(rows) < page_size:
+            return
+        cursor = {time_column: rows[-1][time_column], "id": rows[-1]["id"]}
+
+
+def iter_rows(
+    make_query: Callable[[], Any],
+    page_size: int = DEFAULT_PAGE_SIZE,
+    after: Optional[Dict[str, str]] = None,
+    time_column: str = "created_at",
+    descending: bool = False
+) -> Iterator[Dict[str, Any]]:
+    """Yield rows one at a time; see iter_pages."""
+    for page in iter_pages(make_query, page_size, after, time_column, descending):
+        yield from page
@@ -0,0 +1,180 @@
+"""
+Request Metrics Utility
+
+Per-request counters for outbound calls (Supabase round trips, YouTube API
+requests) and handler time.
+
+The counters live in a context variable, so every call made while serving
+a request - including from worker threads started with asyncio.to_thread,
+which copy the context - adds to the same totals. Calls made outside a
+request (scheduler jobs, scripts) are not counted.
+
+RequestMetricsMiddleware reports the totals in a Server-Timing header and
+one JSON log line per request. Requests slower than
+Settings.slow_request_ms also log each call. Latencies also feed the
+process-wide Prometheus histograms (utils/metrics.py).
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+
+from ..config import get_settings
+from .metrics import HTTP_REQUEST_DB_CALLS, HTTP_REQUEST_SECONDS, OUTBOUND_CALL_SECONDS
+from .tracing import span
+
+# Per-call detail kept for the slow-request log (totals are always exact)
+MAX_RECORDED_CALLS = 200
+
+
+@dataclass
+class RequestMetrics:
+    """Call counters for one request."""
+    method: str
+    path: str
+    started: float = field(default_factory=time.perf_counter)
+    cpu_started: float = field(default_factory=time.thread_time)
+    db_calls: int = 0
+    db_time_s: float = 0.0
+    db_read_time_s: float = 0.0   # selects and auth lookups
+    db_write_time_s: float = 0.0  # inserts, updates, deletes, RPCs
+    youtube_calls: int = 0
+    youtube_time_s: float = 0.0
+    calls: List[Tuple[str, str, float]] = field(default_factory=list)  # (kind, name, seconds)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, kind: str, name: str, duration_s: float) -> None:
+        with self._lock:
+            if kind == "db":
+                self.db_calls += 1
+                self.db_time_s += duration_s
+                if name.endswith(".select") or name.startswith("auth."):
+                    self.db_read_time_s += duration_s
+                else:
+                    self.db_write_time_s += duration_s
+            elif kind == "youtube":
+                self.youtube_calls += 1
+                self.youtube_time_s += duration_s
+            if len(self.calls) < MAX_RECORDED_CALLS:
+                self.calls.append((kind, name, duration_s))
+
+    def elapsed_s(self) -> float:
+        return time.perf_counter() - self.started
+
+    def cpu_s(self) -> float:
+        # CPU of the event loop thread since the request started; under
+        # concurrency this includes interleaved requests, so it's an upper bound
+        return time.thread_time() - self.cpu_started
+
+    def server_timing(self) -> str:
+        elapsed = self.elapsed_s()
+        app_s = max(elapsed - self.db_time_s - self.youtube_time_s, 0.0)
+        return ", ".join([
+            f'db;dur={self.db_time_s * 1000:.1f};desc="{self.db_calls} calls"',
+            f'youtube;dur={self.youtube_time_s * 1000:.1f};desc="{self.youtube_calls} calls"',
+            f"app;dur={app_s * 1000:.1f}",
+            f"cpu;dur={self.cpu_s() * 1000:.1f}",
+            f"total;dur={elapsed * 1000:.1f}",
+        ])
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    """Metrics of the request being served, if any."""
+    return _current.get()
+
+
+def record_call(kind: str, name: str, duration_s: float) -> None:
+    """Count one outbound call ("db" or "youtube") against the current request."""
+    OUTBOUND_CALL_SECONDS.observe(duration_s, kind=kind, name=name)
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.record(kind, name, duration_s)
+
+
+@contextmanager
+def timed_call(kind: str, name: str) -> Iterator[None]:
+    """Time the enclosed call (and trace it) and record it, whether it succeeds or raises."""
+    started = time.perf_counter()
+    try:
+        with span(f"{kind}:{name}"):
+            yield
+    finally:
+        record_call(kind, name, time.perf_counter() - started)
+
+
+def route_template(scope: dict) -> str:
+    """Matched route path (e.g. /api/v1/creators/{creator_id}), or "unmatched"."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware that sets up RequestMetrics and reports them."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics(scope["method"], scope["path"])
+        token = _current.set(metrics)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", metrics.server_timing())
+            await send(message)
+
+        try:
+            with span(f"http {metrics.method}", path=metrics.path) as request_span:
+                await self.app(scope, receive, send_with_timing)
+                request_span.set_attribute("route", route_template(scope))
+                request_span.set_attribute("status", status)
+        finally:
+            _current.reset(token)
+            route = route_template(scope)
+            HTTP_REQUEST_SECONDS.observe(metrics.elapsed_s(), method=metrics.method, route=route, status=status)
+            HTTP_REQUEST_DB_CALLS.observe(metrics.db_calls, route=route)
+            _log_request(metrics, route, status)
+
+
+def _log_request(metrics: RequestMetrics, route: str, status: int) -> None:
+    settings = get_settings()
+    elapsed_ms = metrics.elapsed_s() * 1000
+    slow = elapsed_ms >= settings.slow_request_ms
+    if not (settings.log_requests or slow):
+        return
+
+    entry = {
+        "event": "slow_request" if slow else "request",
+        "method": metrics.method,
+        "route": route,
+        "status": status,
+        "duration_ms": round(elapsed_ms, 1),
+        "db_calls": metrics.db_calls,
+        "db_ms": round(metrics.db_time_s * 1000, 1),
+        "youtube_calls": metrics.youtube_calls,
+        "youtube_ms": round(metrics.youtube_time_s * 1000, 1),
+        "cpu_ms": round(metrics.cpu_s() * 1000, 1),
+    }
+    if slow:
+        entry["path"] = metrics.path
+        entry["calls"] = [
+            {"kind": kind, "name": name, "ms": round(duration * 1000, 1)}
+            for kind, name, duration in metrics.calls
+        ]
+    print(json.dumps(entry))
@@ -0,0 +1,198 @@
+"""
+Tracing Utility
+
+Lightweight spans for the hot paths: every Supabase and YouTube call
+(via request_metrics.timed_call), TradingEngine computations, portfolio
+updates, and one root span per HTTP request.
+
+Tracing is off by default and then costs one global check per span.
+Settings.tracing_exporter turns it on:
+- "console": one line per finished span on stdout
+- "file":    JSON lines appended to Settings.tracing_file
+- "otel":    spans are handed to OpenTelemetry (needs opentelemetry-sdk;
+             OTLP export if opentelemetry-exporter-otlp is installed,
+             configured with the standard OTEL_* environment variables)
+
+Parent/child links follow the context, so spans opened in worker threads
+(asyncio.to_thread) nest under the request that started them.
+"""
+
+import functools
+import inspect
+import json
+import secrets
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, Optional
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # OpenTelemetry export is optional
+    otel_trace = None
+
+
+class Span:
+    """A finished or in-progress unit of work."""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "attributes", "start", "_started", "duration_ms", "error")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.attributes = attributes
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self.duration_ms = 0.0
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": datetime.fromtimestamp(self.start, timezone.utc).isoformat(),
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Stand-in yielded when tracing is off, so callers can set attributes unconditionally."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+_NOOP = nullcontext(_NOOP_SPAN)
+
+
+# ============ Exporters ============
+
+class ConsoleExporter:
+    def export(self, span: Span) -> None:
+        status = f" ERROR {span.error}" if span.error else ""
+        attrs = " ".join(f"{k}={v}" for k, v in span.attributes.items())
+        print(f"[trace {span.trace_id[:8]}] {span.name} {span.duration_ms:.2f}ms {attrs}{status}".rstrip())
+
+
+class FileExporter:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock, open(self.path, "a") as f:
+            f.write(line + "\n")
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_exporter = None
+_otel_tracer = None
+
+
+def configure_tracing(exporter: str = "", file_path: str = "traces.jsonl") -> None:
+    """Pick the exporter ("", "console", "file" or "otel"); "" turns tracing off."""
+    global _exporter, _otel_tracer
+    _exporter, _otel_tracer = None, None
+
+    if exporter == "console":
+        _exporter = ConsoleExporter()
+    elif exporter == "file":
+        _exporter = FileExporter(file_path)
+    elif exporter == "otel":
+        if otel_trace is None:
+            print("⚠️ TRACING_EXPORTER=otel but opentelemetry is not installed; tracing disabled")
+            return
+        _setup_otel_provider()
+        _otel_tracer = otel_trace.get_tracer("nombre")
+    elif exporter:
+        print(f"⚠️ Unknown TRACING_EXPORTER '{exporter}'; tracing disabled")
+
+
+def _setup_otel_provider() -> None:
+    """Install an SDK provider with OTLP export unless the app already has one."""
+    try:
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    except ImportError:
+        return  # API only: spans go to whatever provider is configured (or nowhere)
+    if isinstance(otel_trace.get_tracer_provider(), TracerProvider):
+        return
+    provider = TracerProvider()
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    otel_trace.set_tracer_provider(provider)
+
+
+def tracing_enabled() -> bool:
+    return _exporter is not None or _otel_tracer is not None
+
+
+@contextmanager
+def _local_span(name: str, attributes: Dict[str, Any]) -> Iterator[Span]:
+    current = Span(name, _current_span.get(), attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        current.duration_ms = (time.perf_counter() - current._started) * 1000
+        try:
+            _exporter.export(current)
+        except Exception as e:
+            print(f"⚠️ Span export failed: {e}")
+
+
+def span(name: str, **attributes):
+    """
+    Context manager timing the enclosed block as a child of the current span.
+
+    Usage:
+        with span("db.pools.select", table="pools") as s:
+            ...
+            s.set_attribute("rows", n)
+    """
+    if _otel_tracer is not None:
+        return _otel_tracer.start_as_current_span(name, attributes=attributes)
+    if _exporter is None:
+        return _NOOP
+    return _local_span(name, attributes)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorator form of span() for sync and async functions."""
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not tracing_enabled():
+                    return await func(*args, **kwargs)
+                with span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracing_enabled():
+                return func(*args, **kwargs)
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
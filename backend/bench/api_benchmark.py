@@ -0,0 +1,316 @@
+"""
+API Benchmark
+
+Runs the FastAPI app in-process (httpx ASGI transport, no network) against
+the in-memory Supabase fake (bench/fake_supabase.py) and reports, per
+scenario, throughput, p50/p99 latency and Supabase round trips per request.
+
+Round trips come from the Server-Timing header the app sets on every
+response (utils/request_metrics.py), so they are exact per request even
+under concurrency. They are the number to watch: with the fake answering
+in microseconds, a change that adds a query per row shows up here long
+before it shows up in latency. --baseline compares against a saved run and
+exits non-zero if any scenario now needs more round trips.
+
+Scenarios:
+- quote:       POST /trade/quote
+- buy, sell:   POST /trade/execute
+- portfolio:   GET /portfolio
+- leaderboard: GET /leaderboard (served from the ranked snapshot; the
+               first request builds it, at a cost that grows with --users)
+- creators:    GET /creators
+- creators_cached: GET /creators with the response LRU on, so repeats are
+               served from memory (utils/http_cache.py)
+- maintenance: run_all_maintenance(), called directly (it's a scheduler job)
+
+Each scenario gets a freshly seeded fake, so trades in one don't change
+the next. The response LRU is off (RESPONSE_CACHE_SIZE=0) except in the
+*_cached scenarios, so the others measure the route itself. Use --latency-ms to see what the round trips cost once each one
+is a real network hop.
+
+Usage:
+    cd backend
+    python -m bench.api_benchmark --scenario all --users 200 --latency-ms 2
+    python -m bench.api_benchmark --save-baseline bench/baselines/api_round_trips.json
+    python -m bench.api_benchmark --baseline bench/baselines/api_round_trips.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The app reads these when it is built; keep the benchmark quiet and self-contained
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+os.environ.setdefault("LOG_REQUESTS", "false")
+
+import httpx
+
+from app.config import get_settings
+from app.main import create_app
+from app.services.leaderboard_service import get_leaderboard_cache
+from app.services.maintenance_service import run_all_maintenance
+from app.services.rolling_stats import get_rolling_stats
+from app.utils.http_cache import mark_changed
+from bench.fake_supabase import FakeSupabase, Market, install, seed_market
+
+SERVER_TIMING_DB = re.compile(r'db;dur=[\d.]+;desc="(\d+) calls"')
+
+
+@dataclass
+class Context:
+    client: httpx.AsyncClient
+    fake: FakeSupabase
+    market: Market
+    rng: random.Random
+
+
+def _auth(ctx: Context, user_index: Optional[int] = None) -> Dict[str, str]:
+    users = ctx.market.users
+    user = users[user_index] if user_index is not None else ctx.rng.choice(users)
+    return {"Authorization": f"Bearer {user.token}"}
+
+
+async def _quote(ctx: Context) -> httpx.Response:
+    return await ctx.client.post("/api/v1/trade/quote", headers=_auth(ctx), json={
+        "creator_id": ctx.rng.choice(ctx.market.creator_ids),
+        "type": "buy",
+        "amount": 100.0,
+        "amount_type": "nmbr",
+    })
+
+
+async def _buy(ctx: Context) -> httpx.Response:
+    return await ctx.client.post("/api/v1/trade/execute", headers=_auth(ctx), json={
+        "creator_id": ctx.rng.choice(ctx.market.creator_ids),
+        "type": "buy",
+        "amount": 10.0,
+        "amount_type": "nmbr",
+        "max_slippage_pct": 5.0,
+    })
+
+
+async def _sell(ctx: Context) -> httpx.Response:
+    # Seeded holdings are 1k-50k tokens, so selling one at a time never runs out
+    user_index, creator_id = ctx.rng.choice(ctx.market.holdings)
+    return await ctx.client.post("/api/v1/trade/execute", headers=_auth(ctx, user_index), json={
+        "creator_id": creator_id,
+        "type": "sell",
+        "amount": 1.0,
+        "amount_type": "token",
+        "max_slippage_pct": 5.0,
+    })
+
+
+async def _portfolio(ctx: Context) -> httpx.Response:
+    return await ctx.client.get("/api/v1/portfolio", headers=_auth(ctx))
+
+
+async def _leaderboard(ctx: Context) -> httpx.Response:
+    return await ctx.client.get("/api/v1/leaderboard", headers=_auth(ctx), params={"limit": 100})
+
+
+async def _creators(ctx: Context) -> httpx.Response:
+    return await ctx.client.get("/api/v1/creators", params={"limit": 20, "sort_by": "volume_24h"})
+
+
+HTTP_SCENARIOS: Dict[str, Callable[[Context], Awaitable[httpx.Response]]] = {
+    "quote": _quote,
+    "buy": _buy,
+    "sell": _sell,
+    "portfolio": _portfolio,
+    "leaderboard": _leaderboard,
+    "creators": _creators,
+    "creators_cached": _creators,
+}
+# Scenarios run with the response LRU on, at this size
+CACHED_SCENARIOS = {"creators_cached": 256}
+SCENARIOS = list(HTTP_SCENARIOS) + ["maintenance"]
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _summary(name: str, requests: int, concurrency: int, elapsed: float,
+             latencies: List[float], round_trips: List[int], outcomes: Dict[str, int]) -> dict:
+    return {
+        "scenario": name,
+        "requests": requests,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "req_per_s": round(requests / elapsed, 1) if elapsed > 0 else 0.0,
+        "p50_ms": round(statistics.median(latencies) * 1000, 2) if latencies else 0.0,
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+        "db_calls_per_request": round(statistics.mean(round_trips), 2) if round_trips else 0.0,
+        "db_calls_max": max(round_trips) if round_trips else 0,
+        "outcomes": outcomes,
+    }
+
+
+async def run_http(ctx: Context, name: str, requests: int, concurrency: int, warmup: int) -> dict:
+    """Fire `requests` requests of one scenario, at most `concurrency` in flight."""
+    make_request = HTTP_SCENARIOS[name]
+    for _ in range(warmup):
+        await make_request(ctx)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    round_trips: List[int] = []
+    outcomes: Dict[str, int] = {}
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await make_request(ctx)
+            latencies.append(time.perf_counter() - start)
+            outcomes[str(response.status_code)] = outcomes.get(str(response.status_code), 0) + 1
+            match = SERVER_TIMING_DB.search(response.headers.get("server-timing", ""))
+            if match:
+                round_trips.append(int(match.group(1)))
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(requests)])
+    elapsed = time.perf_counter() - start
+    return _summary(name, requests, concurrency, elapsed, latencies, round_trips, outcomes)
+
+
+async def run_maintenance(ctx: Context, runs: int) -> dict:
+    """Run the daily maintenance DAG `runs` times, one after another."""
+    latencies: List[float] = []
+    round_trips: List[int] = []
+    outcomes: Dict[str, int] = {}
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        calls_before = ctx.fake.stats.total_calls
+        run_start = time.perf_counter()
+        try:
+            await run_all_maintenance()
+            outcomes["ok"] = outcomes.get("ok", 0) + 1
+        except RuntimeError:
+            outcomes["failed"] = outcomes.get("failed", 0) + 1
+        latencies.append(time.perf_counter() - run_start)
+        round_trips.append(ctx.fake.stats.total_calls - calls_before)
+    elapsed = time.perf_counter() - start
+    return _summary("maintenance", runs, 1, elapsed, latencies, round_trips, outcomes)
+
+
+async def run_scenario(name: str, args: argparse.Namespace) -> dict:
+    fake = FakeSupabase(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, seed=args.seed)
+    market = seed_market(
+        fake, users=args.users, creators=args.creators,
+        holdings_per_user=args.holdings, seed=args.seed
+    )
+    install(fake)
+    # Part of what startup warm-up does; ASGI transport doesn't run the lifespan.
+    # The leaderboard snapshot is left to build on first request (and not
+    # carried over from another scenario's data)
+    get_rolling_stats().hydrate()
+    get_leaderboard_cache().invalidate()
+    mark_changed()  # New dataset: no cached response from the previous one matches
+    get_settings().response_cache_size = CACHED_SCENARIOS.get(name, 0)
+
+    transport = httpx.ASGITransport(app=create_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        ctx = Context(client, fake, market, random.Random(args.seed))
+        if name == "maintenance":
+            report = await run_maintenance(ctx, max(1, args.requests // 20))
+        else:
+            report = await run_http(ctx, name, args.requests, args.concurrency, args.warmup)
+    report["round_trips_by_call"] = dict(sorted(fake.stats.calls.items()))
+    return report
+
+
+def _dataset(args: argparse.Namespace) -> dict:
+    return {"users": args.users, "creators": args.creators, "holdings": args.holdings}
+
+
+def check_baseline(path: str, reports: List[dict], args: argparse.Namespace) -> List[str]:
+    """Scenarios that need more round trips per request than the baseline."""
+    with open(path) as f:
+        baseline = json.load(f)
+    if baseline.get("dataset") != _dataset(args):
+        raise SystemExit(
+            f"Baseline {path} was recorded with {baseline.get('dataset')}; "
+            f"rerun with the same --users/--creators/--holdings"
+        )
+    expected = baseline.get("db_calls_per_request", {})
+    regressions = []
+    for report in reports:
+        allowed = expected.get(report["scenario"])
+        if allowed is not None and report["db_calls_per_request"] > allowed + 1e-9:
+            regressions.append(f"{report['scenario']}: {report['db_calls_per_request']} round trips/request (baseline {allowed})")
+    return regressions
+
+
+def save_baseline(path: str, reports: List[dict], args: argparse.Namespace) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({
+            "dataset": _dataset(args),
+            "db_calls_per_request": {r["scenario"]: r["db_calls_per_request"] for r in reports},
+        }, f, indent=2)
+        f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API endpoints against an in-memory Supabase")
+    parser.add_argument("--scenario", choices=SCENARIOS + ["all"], default="all")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario (maintenance runs requests/20 times)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--creators", type=int, default=50)
+    parser.add_argument("--holdings", type=int, default=3, help="Holdings per seeded user")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Injected latency per Supabase round trip")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", help="Fail if round trips/request exceed this saved run")
+    parser.add_argument("--save-baseline", help="Write round trips/request to this file")
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    args = parser.parse_args()
+
+    names = SCENARIOS if args.scenario == "all" else [args.scenario]
+    reports = [asyncio.run(run_scenario(name, args)) for name in names]
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        print(f"\n📊 {args.users} users, {args.creators} creators, {args.latency_ms}ms per round trip, concurrency {args.concurrency}")
+        print(f"   {'scenario':<16} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'db/req':>7}  outcomes")
+        for r in reports:
+            print(
+                f"   {r['scenario']:<16} {r['req_per_s']:>8} {r['p50_ms']:>8} {r['p99_ms']:>8} "
+                f"{r['db_calls_per_request']:>7}  {r['outcomes']}"
+            )
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, reports, args)
+        print(f"\n💾 Baseline written to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = check_baseline(args.baseline, reports, args)
+        if regressions:
+            print("\n❌ Round-trip regressions:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print(f"\n✅ Round trips within baseline ({args.baseline})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+CPI Benchmark
+
+Times a catalogue-wide CPI recalculation with the vectorized implementation
+against scoring creators one at a time through the scalar wrapper.
+
+Usage:
+    cd backend
+    python -m bench.cpi_benchmark --creators 100000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from app.utils.cpi import calculate_cpi, calculate_cpi_batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CPI recalculation")
+    parser.add_argument("--creators", type=int, default=100_000)
+    parser.add_argument("--scalar-sample", type=int, default=5_000, help="Creators to time through the scalar path")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    subs = (10 ** rng.uniform(3, 8.5, args.creators)).astype(np.int64)
+    views_30d = np.where(rng.random(args.creators) < 0.3, 0, subs * rng.uniform(0.1, 5, args.creators)).astype(np.int64)
+    lifetime = (subs * rng.uniform(50, 800, args.creators)).astype(np.int64)
+
+    start = time.perf_counter()
+    batch = calculate_cpi_batch(subs, views_30d, lifetime)
+    vector_s = time.perf_counter() - start
+
+    sample = min(args.scalar_sample, args.creators)
+    start = time.perf_counter()
+    for i in range(sample):
+        calculate_cpi(int(subs[i]), int(views_30d[i]), int(lifetime[i]))
+    scalar_s = (time.perf_counter() - start) * args.creators / sample
+
+    print(f"📊 CPI for {args.creators:,} creators")
+    print(f"   vectorized: {vector_s * 1000:8.1f} ms")
+    print(f"   scalar:     {scalar_s * 1000:8.1f} ms (extrapolated from {sample:,})")
+    tiers, counts = np.unique(batch.tiers, return_counts=True)
+    print(f"   tiers: {dict(zip(tiers.tolist(), counts.tolist()))}")
+
+
+if __name__ == "__main__":
+    main()
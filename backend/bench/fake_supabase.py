@@ -0,0 +1,989 @@
+"""
+Fake Supabase
+
+An in-memory stand-in for the part of the Supabase client the API uses:
+table().select()/insert()/update()/upsert()/delete() with the PostgREST
+filters we call (eq, neq, gt(e), lt(e), like, ilike, is_, in_, not_, or_),
+embedded resources ("*, creators(token_symbol)"), count, order, limit,
+range, single(), plus rpc() and auth.get_user().
+
+RPCs are Python re-implementations of the SQL functions in
+supabase/migrations, limited to the ones the benchmarks reach (maintenance
+steps, trade event consumer, job locks, faucet claim, rolling stats
+hydration, platform stats). An RPC that isn't implemented fails the way
+PostgREST does when a function is missing (PGRST202).
+
+The transaction/holding triggers that feed trade_events
+(010_trade_events.sql) and the unique constraints of the schema are
+emulated, so the trade paths and the maintenance consumer behave like
+they do against Postgres.
+
+Every execute() sleeps for the configured latency (plus jitter from one
+seeded RNG) before answering, the way a real round trip blocks the
+calling thread. Calls are counted per "table.verb" / "rpc:fn" label.
+
+Usage:
+    from bench.fake_supabase import FakeSupabase, install, seed_market
+
+    fake = FakeSupabase(latency_ms=5)
+    market = seed_market(fake, users=200, creators=50)
+    install(fake)   # get_supabase() now returns the fake (instrumented)
+"""
+
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from postgrest.exceptions import APIError
+
+# Pools start with 9M tokens in the curve (10M minted, 1M vests to the creator)
+INITIAL_TOKEN_SUPPLY = 9_000_000
+TOTAL_TOKEN_SUPPLY = 10_000_000
+
+# Embeds that follow a unique foreign key back to the parent return one object, not a list
+UNIQUE_BACKREFS = {("pools", "creator_id")}
+
+# UNIQUE constraints from the migrations (the primary key `id` is always unique)
+UNIQUE_CONSTRAINTS: Dict[str, List[Tuple[str, ...]]] = {
+    "users": [("auth_id",), ("device_fingerprint",)],
+    "creators": [("youtube_channel_id",), ("token_symbol",)],
+    "pools": [("creator_id",)],
+    "user_holdings": [("user_id", "creator_id")],
+    "job_checkpoints": [("job_name",)],
+}
+
+# Column defaults applied on insert (besides id and created_at)
+DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "users": {
+        "username": None, "display_name": None, "avatar_url": None, "device_fingerprint": None,
+        "nmbr_balance": 0.0, "total_invested": 0.0, "portfolio_value": 0.0,
+        "faucet_claimed": False, "is_admin": False,
+    },
+    "creators": {
+        "avatar_url": None, "banner_url": None, "subscriber_count": 0, "view_count_lifetime": 0,
+        "view_count_30d": 0, "video_count": 0, "cpi_score": 0.0, "is_verified": False,
+        "last_stats_update": None,
+    },
+    "pools": {
+        "token_supply": float(INITIAL_TOKEN_SUPPLY), "price_24h_ago": None, "price_change_24h": 0.0,
+        "volume_24h": 0.0, "volume_all_time": 0.0, "market_cap": None, "holder_count": 0,
+        "trade_count": 0, "fees_collected": 0.0,
+    },
+    "user_holdings": {"token_amount": 0.0, "avg_buy_price": None, "total_cost_basis": 0.0},
+    "transactions": {"fee_amount": 0.0, "slippage_pct": None, "price_impact_pct": 0.0},
+    "price_history": {"volume": 0.0},
+}
+
+# Tables whose insert time column isn't created_at
+TIME_COLUMNS = {"price_history": "timestamp"}
+
+# Tables with an updated_at trigger (001_initial_schema.sql)
+UPDATED_AT_TABLES = {"users", "creators", "pools", "user_holdings"}
+
+_TIMESTAMP_RE = re.compile(r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds")
+
+
+def _singular(table: str) -> str:
+    return table[:-1] if table.endswith("s") else table
+
+
+def _parse_ts(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _coerce(row_value: Any, value: Any) -> Tuple[Any, Any]:
+    """Bring a filter value to the row value's type, the way Postgres would cast it."""
+    if row_value is None or value is None:
+        return row_value, value
+    if isinstance(row_value, bool):
+        return row_value, value if isinstance(value, bool) else str(value).lower() == "true"
+    if isinstance(row_value, (int, float)):
+        return float(row_value), float(value)
+    if isinstance(row_value, str) and isinstance(value, str) and _TIMESTAMP_RE.match(row_value) and _TIMESTAMP_RE.match(value):
+        return _parse_ts(row_value), _parse_ts(value)
+    if isinstance(row_value, str) and not isinstance(value, str):
+        value = str(value)  # e.g. a UUID object
+    return row_value, value
+
+
+def _like_regex(pattern: str, case_insensitive: bool) -> "re.Pattern":
+    parts = []
+    for char in pattern:
+        if char in "%*":
+            parts.append(".*")
+        elif char == "_":
+            parts.append(".")
+        else:
+            parts.append(re.escape(char))
+    flags = re.DOTALL | (re.IGNORECASE if case_insensitive else 0)
+    return re.compile("^" + "".join(parts) + "$", flags)
+
+
+def _compare(op: str, row_value: Any, value: Any) -> bool:
+    if op == "is":
+        target = None if value in (None, "null") else str(value).lower() == "true"
+        return row_value is target if target is None else row_value == target
+    if op == "in":
+        return any(_compare("eq", row_value, v) for v in value)
+    if op in ("like", "ilike"):
+        return row_value is not None and bool(_like_regex(str(value), op == "ilike").match(str(row_value)))
+    if row_value is None or value is None:
+        return False  # NULL never matches a comparison
+    left, right = _coerce(row_value, value)
+    if op == "eq":
+        return left == right
+    if op == "neq":
+        return left != right
+    if op == "gt":
+        return left > right
+    if op == "gte":
+        return left >= right
+    if op == "lt":
+        return left < right
+    if op == "lte":
+        return left <= right
+    raise APIError({"message": f"unknown operator {op}", "code": "PGRST100", "hint": None, "details": None})
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Split on commas that aren't inside parentheses or double quotes."""
+    parts, depth, quoted, current = [], 0, False, []
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append("".join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    if current:
+        parts.append("".join(current).strip())
+    return [p for p in parts if p]
+
+
+def _unquote(value: str) -> str:
+    return value[1:-1] if len(value) >= 2 and value[0] == value[-1] == '"' else value
+
+
+# ============ Logic trees (or_ / and) ============
+
+def _parse_condition(term: str) -> Callable[[Dict[str, Any]], bool]:
+    """One PostgREST logic-tree term: col.op.value, col.not.op.value, and(...), or(...)."""
+    for combinator, reducer in (("and(", all), ("or(", any)):
+        if term.startswith(combinator) and term.endswith(")"):
+            children = [_parse_condition(t) for t in _split_top_level(term[len(combinator):-1])]
+            return lambda row, c=children, r=reducer: r(child(row) for child in c)
+
+    column, rest = term.split(".", 1)
+    negate = rest.startswith("not.")
+    if negate:
+        rest = rest[4:]
+    op, raw = rest.split(".", 1)
+    if op == "in":
+        value: Any = [_unquote(v) for v in _split_top_level(raw.strip("()"))]
+    else:
+        value = _unquote(raw)
+
+    def condition(row: Dict[str, Any]) -> bool:
+        return _compare(op, row.get(column), value) != negate
+    return condition
+
+
+def _parse_select(columns: str) -> Tuple[bool, List[str], List[Tuple[str, str, str]]]:
+    """"*, creators(token_symbol)" -> (star, plain columns, [(key, table, inner select)])."""
+    star, plain, embeds = False, [], []
+    for item in _split_top_level(columns):
+        if item == "*":
+            star = True
+        elif "(" in item:
+            head, inner = item.split("(", 1)
+            alias, _, name = head.rpartition(":")
+            name = name.split("!")[0].strip()
+            embeds.append((alias.strip() or name, name, inner[:-1]))
+        else:
+            plain.append(item.strip())
+    return star, plain, embeds
+
+
+# ============ Storage ============
+
+class _Table:
+    """Rows by id, plus hash indexes built on first use and kept up to date."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.rows: Dict[str, Dict[str, Any]] = {}
+        self.indexes: Dict[str, Dict[Any, Dict[str, Dict[str, Any]]]] = {}
+
+    def index(self, column: str) -> Dict[Any, Dict[str, Dict[str, Any]]]:
+        if column not in self.indexes:
+            built: Dict[Any, Dict[str, Dict[str, Any]]] = {}
+            for row_id, row in self.rows.items():
+                built.setdefault(row.get(column), {})[row_id] = row
+            self.indexes[column] = built
+        return self.indexes[column]
+
+    def lookup(self, column: str, value: Any) -> Iterable[Dict[str, Any]]:
+        if column == "id":
+            row = self.rows.get(value)
+            return [row] if row is not None else []
+        return list(self.index(column).get(value, {}).values())
+
+    def add(self, row: Dict[str, Any]) -> None:
+        self.rows[row["id"]] = row
+        for column, index in self.indexes.items():
+            index.setdefault(row.get(column), {})[row["id"]] = row
+
+    def remove(self, row: Dict[str, Any]) -> None:
+        self.rows.pop(row["id"], None)
+        for column, index in self.indexes.items():
+            index.get(row.get(column), {}).pop(row["id"], None)
+
+    def change(self, row: Dict[str, Any], values: Dict[str, Any]) -> None:
+        for column, index in self.indexes.items():
+            if column in values and values[column] != row.get(column):
+                index.get(row.get(column), {}).pop(row["id"], None)
+                index.setdefault(values[column], {})[row["id"]] = row
+        row.update(values)
+
+
+@dataclass
+class FakeSupabaseStats:
+    """Round trips by label ("users.select", "rpc:claim_faucet", "auth.get_user")."""
+    calls: Dict[str, int] = field(default_factory=dict)
+    rows_read: int = 0
+    rows_written: int = 0
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+
+@dataclass
+class FakeResponse:
+    data: Any
+    count: Optional[int] = None
+
+
+class FakeQuery:
+    """One PostgREST request, built fluently and answered by execute()."""
+
+    def __init__(self, db: "FakeSupabase", table: str):
+        self._db = db
+        self._table = table
+        self._verb = "select"
+        self._columns = "*"
+        self._count: Optional[str] = None
+        self._payload: Any = None
+        self._on_conflict = ""
+        self._filters: List[Tuple[str, str, Any, bool]] = []  # (column, op, value, negated)
+        self._conditions: List[Callable[[Dict[str, Any]], bool]] = []
+        self._order: List[Tuple[str, bool, Optional[bool]]] = []
+        self._limit: Optional[int] = None
+        self._offset = 0
+        self._single: Optional[str] = None  # "single" | "maybe"
+        self._negate_next = False
+
+    # ---- verbs ----
+
+    def select(self, *columns: str, count: Optional[str] = None) -> "FakeQuery":
+        self._columns = ",".join(columns) if columns else "*"
+        self._count = count
+        return self
+
+    def insert(self, json: Any, count: Optional[str] = None, returning: str = "representation", upsert: bool = False) -> "FakeQuery":
+        self._verb, self._payload = "insert", json
+        return self
+
+    def upsert(self, json: Any, count: Optional[str] = None, returning: str = "representation",
+               ignore_duplicates: bool = False, on_conflict: str = "") -> "FakeQuery":
+        self._verb, self._payload, self._on_conflict = "upsert", json, on_conflict
+        return self
+
+    def update(self, json: Dict[str, Any], count: Optional[str] = None) -> "FakeQuery":
+        self._verb, self._payload = "update", json
+        return self
+
+    def delete(self, count: Optional[str] = None) -> "FakeQuery":
+        self._verb = "delete"
+        return self
+
+    # ---- filters ----
+
+    def _filter(self, column: str, op: str, value: Any) -> "FakeQuery":
+        self._filters.append((column, op, value, self._negate_next))
+        self._negate_next = False
+        return self
+
+    @property
+    def not_(self) -> "FakeQuery":
+        self._negate_next = True
+        return self
+
+    def eq(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, "eq", value)
+
+    def neq(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, "neq", value)
+
+    def gt(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, "gt", value)
+
+    def gte(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, "gte", value)
+
+    def lt(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, "lt", value)
+
+    def lte(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, "lte", value)
+
+    def like(self, column: str, pattern: str) -> "FakeQuery":
+        return self._filter(column, "like", pattern)
+
+    def ilike(self, column: str, pattern: str) -> "FakeQuery":
+        return self._filter(column, "ilike", pattern)
+
+    def is_(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, "is", value)
+
+    def in_(self, column: str, values: Iterable[Any]) -> "FakeQuery":
+        return self._filter(column, "in", list(values))
+
+    def match(self, query: Dict[str, Any]) -> "FakeQuery":
+        for column, value in query.items():
+            self.eq(column, value)
+        return self
+
+    def filter(self, column: str, operator: str, criteria: str) -> "FakeQuery":
+        self._conditions.append(_parse_condition(f"{column}.{operator}.{criteria}"))
+        return self
+
+    def or_(self, filters: str, reference_table: Optional[str] = None) -> "FakeQuery":
+        self._conditions.append(_parse_condition(f"or({filters})"))
+        return self
+
+    # ---- modifiers ----
+
+    def order(self, column: str, desc: bool = False, nullsfirst: Optional[bool] = None, foreign_table: Optional[str] = None) -> "FakeQuery":
+        self._order.append((column, desc, nullsfirst))
+        return self
+
+    def limit(self, size: int, foreign_table: Optional[str] = None) -> "FakeQuery":
+        self._limit = size
+        return self
+
+    def offset(self, size: int) -> "FakeQuery":
+        self._offset = size
+        return self
+
+    def range(self, start: int, end: int, foreign_table: Optional[str] = None) -> "FakeQuery":
+        self._offset, self._limit = start, max(end - start + 1, 0)
+        return self
+
+    def single(self) -> "FakeQuery":
+        self._single = "single"
+        return self
+
+    def maybe_single(self) -> "FakeQuery":
+        self._single = "maybe"
+        return self
+
+    # ---- evaluation ----
+
+    def _matches(self, row: Dict[str, Any]) -> bool:
+        for column, op, value, negated in self._filters:
+            if _compare(op, row.get(column), value) == negated:
+                return False
+        return all(condition(row) for condition in self._conditions)
+
+    def _candidates(self, table: _Table) -> List[Dict[str, Any]]:
+        """Rows matching every filter; the first plain eq filter picks an index."""
+        for column, op, value, negated in self._filters:
+            if op == "eq" and not negated:
+                rows = table.lookup(column, value)
+                if not rows and (not isinstance(value, str) or value in ("true", "false")):
+                    rows = table.rows.values()  # Index keys are exact; let casts decide
+                break
+        else:
+            rows = table.rows.values()
+        return [row for row in rows if self._matches(row)]
+
+    def _sorted(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        for column, desc, nullsfirst in reversed(self._order):
+            nulls_first = desc if nullsfirst is None else nullsfirst
+
+            def key(row, column=column):
+                value = row.get(column)
+                if isinstance(value, str) and _TIMESTAMP_RE.match(value):
+                    value = _parse_ts(value)
+                return value
+            present = [r for r in rows if r.get(column) is not None]
+            missing = [r for r in rows if r.get(column) is None]
+            present.sort(key=key, reverse=desc)
+            rows = missing + present if nulls_first else present + missing
+        return rows
+
+    def execute(self) -> FakeResponse:
+        label = f"{self._table}.{self._verb}"
+        self._db._round_trip(label)
+        with self._db._lock:
+            return self._run()
+
+    def _run(self) -> FakeResponse:
+        db = self._db
+        table = db._table(self._table)
+
+        if self._verb in ("insert", "upsert"):
+            rows = self._payload if isinstance(self._payload, list) else [self._payload]
+            written = [db._write_row(self._table, dict(row), self._on_conflict if self._verb == "upsert" else None) for row in rows]
+            return FakeResponse([dict(row) for row in written])
+
+        rows = self._candidates(table)
+
+        if self._verb == "update":
+            for row in rows:
+                db._update_row(self._table, row, dict(self._payload))
+            db.stats.rows_written += len(rows)
+            return FakeResponse([dict(row) for row in rows])
+
+        if self._verb == "delete":
+            for row in rows:
+                db._delete_row(self._table, row)
+            db.stats.rows_written += len(rows)
+            return FakeResponse([dict(row) for row in rows])
+
+        count = len(rows) if self._count else None
+        rows = self._sorted(rows)
+        end = None if self._limit is None else self._offset + self._limit
+        rows = rows[self._offset:end]
+        data = [db._project(self._table, row, self._columns) for row in rows]
+        db.stats.rows_read += len(data)
+
+        if self._single:
+            if len(data) == 1:
+                return FakeResponse(data[0], count)
+            if self._single == "maybe" and not data:
+                return FakeResponse(None, count)
+            raise APIError({
+                "message": "JSON object requested, multiple (or no) rows returned",
+                "code": "PGRST116",
+                "hint": None,
+                "details": f"The result contains {len(data)} rows",
+            })
+        return FakeResponse(data, count)
+
+
+class FakeRpc(FakeQuery):
+    """A function call; filters, order and limit apply to the rows it returns."""
+
+    def __init__(self, db: "FakeSupabase", fn: str, params: Optional[Dict[str, Any]]):
+        super().__init__(db, f"rpc:{fn}")
+        self._fn = fn
+        self._params = params or {}
+
+    def execute(self) -> FakeResponse:
+        self._db._round_trip(f"rpc:{self._fn}")
+        implementation = RPCS.get(self._fn)
+        if implementation is None:
+            raise APIError({
+                "message": f"Could not find the function public.{self._fn} in the schema cache",
+                "code": "PGRST202",
+                "hint": None,
+                "details": None,
+            })
+        with self._db._lock:
+            result = implementation(self._db, **self._params)
+        if not isinstance(result, list):
+            return FakeResponse(result)
+        rows = self._sorted([row for row in result if self._matches(row)])
+        end = None if self._limit is None else self._offset + self._limit
+        return FakeResponse(rows[self._offset:end])
+
+
+class FakeAuth:
+    """auth.get_user(token): tokens are registered per user by add_auth_user()."""
+
+    def __init__(self, db: "FakeSupabase"):
+        self._db = db
+        self.users: Dict[str, SimpleNamespace] = {}
+
+    def get_user(self, jwt: Optional[str] = None) -> SimpleNamespace:
+        self._db._round_trip("auth.get_user")
+        user = self.users.get(jwt or "")
+        if user is None:
+            raise APIError({"message": "invalid JWT", "code": "bad_jwt", "hint": None, "details": None})
+        return SimpleNamespace(user=user)
+
+
+# ============ Client ============
+
+class FakeSupabase:
+    """The client surface of supabase.Client, backed by in-memory tables."""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = 42):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.stats = FakeSupabaseStats()
+        self.tables: Dict[str, _Table] = {}
+        self.auth = FakeAuth(self)
+        self.trade_events: List[Dict[str, Any]] = []
+        self.job_locks: Dict[str, Tuple[str, float]] = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+        self._stats_lock = threading.Lock()
+
+    # ---- client surface ----
+
+    def table(self, table_name: str) -> FakeQuery:
+        return FakeQuery(self, table_name)
+
+    from_ = table
+
+    def rpc(self, fn: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> FakeRpc:
+        return FakeRpc(self, fn, params)
+
+    # ---- helpers for seeding and checks ----
+
+    def rows(self, table: str) -> List[Dict[str, Any]]:
+        """Current rows of a table (live dicts - copy before mutating)."""
+        return list(self._table(table).rows.values())
+
+    def get(self, table: str, row_id: str) -> Optional[Dict[str, Any]]:
+        return self._table(table).rows.get(row_id)
+
+    def insert(self, table: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert without a round trip (no latency, not counted)."""
+        with self._lock:
+            return self._write_row(table, dict(row), None)
+
+    def add_auth_user(self, token: str, auth_id: str, email: str = "", metadata: Optional[Dict[str, Any]] = None) -> None:
+        self.auth.users[token] = SimpleNamespace(id=auth_id, email=email, user_metadata=metadata or {})
+
+    def reset_stats(self) -> None:
+        with self._stats_lock:
+            self.stats = FakeSupabaseStats()
+
+    # ---- internals ----
+
+    def _round_trip(self, label: str) -> None:
+        with self._stats_lock:
+            self.stats.calls[label] = self.stats.calls.get(label, 0) + 1
+            delay = self.latency_ms + (self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def _table(self, name: str) -> _Table:
+        if name not in self.tables:
+            self.tables[name] = _Table(name)
+        return self.tables[name]
+
+    def _conflict(self, table: str, row: Dict[str, Any], columns: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+        if any(row.get(c) is None for c in columns):
+            return None  # NULLs never conflict
+        for existing in self._table(table).lookup(columns[0], row[columns[0]]):
+            if existing is not row and all(existing.get(c) == row.get(c) for c in columns):
+                return existing
+        return None
+
+    def _write_row(self, table: str, row: Dict[str, Any], on_conflict: Optional[str]) -> Dict[str, Any]:
+        if on_conflict is not None:
+            columns = tuple(c.strip() for c in on_conflict.split(",")) if on_conflict else ("id",)
+            existing = self._conflict(table, row, columns) if columns != ("id",) else self.get(table, row.get("id"))
+            if existing is not None:
+                self._update_row(table, existing, row)
+                self.stats.rows_written += 1
+                return existing
+
+        now = _now()
+        stored = {"id": str(uuid.uuid4()), **DEFAULTS.get(table, {}), **row}
+        stored.setdefault(TIME_COLUMNS.get(table, "created_at"), now)
+        if table in UPDATED_AT_TABLES:
+            stored.setdefault("updated_at", now)
+
+        if stored["id"] in self._table(table).rows:
+            self._unique_violation(table, ("id",))
+        for columns in UNIQUE_CONSTRAINTS.get(table, []):
+            if self._conflict(table, stored, columns) is not None:
+                self._unique_violation(table, columns)
+
+        self._table(table).add(stored)
+        self.stats.rows_written += 1
+        self._after_insert(table, stored)
+        return stored
+
+    def _update_row(self, table: str, row: Dict[str, Any], values: Dict[str, Any]) -> None:
+        values.pop("id", None)
+        if table in UPDATED_AT_TABLES:
+            values.setdefault("updated_at", _now())
+        for columns in UNIQUE_CONSTRAINTS.get(table, []):
+            if any(c in values for c in columns) and self._conflict(table, {**row, **values}, columns) not in (None, row):
+                self._unique_violation(table, columns)
+        self._table(table).change(row, values)
+
+    def _delete_row(self, table: str, row: Dict[str, Any]) -> None:
+        self._table(table).remove(row)
+        self._after_delete(table, row)
+
+    def _unique_violation(self, table: str, columns: Tuple[str, ...]) -> None:
+        raise APIError({
+            "message": f'duplicate key value violates unique constraint "{table}_{"_".join(columns)}_key"',
+            "code": "23505",
+            "hint": None,
+            "details": f"Key ({', '.join(columns)}) already exists.",
+        })
+
+    # Triggers from 010_trade_events.sql
+    def _after_insert(self, table: str, row: Dict[str, Any]) -> None:
+        if table == "transactions":
+            self._emit_event(row["pool_id"], "trade", float(row.get("nmbr_amount") or 0), float(row.get("fee_amount") or 0), 0)
+        elif table == "user_holdings":
+            pool = self._pool_of_creator(row["creator_id"])
+            if pool:
+                self._emit_event(pool["id"], "holder", 0.0, 0.0, 1)
+
+    def _after_delete(self, table: str, row: Dict[str, Any]) -> None:
+        if table == "user_holdings":
+            pool = self._pool_of_creator(row["creator_id"])
+            if pool:
+                self._emit_event(pool["id"], "holder", 0.0, 0.0, -1)
+
+    def _emit_event(self, pool_id: str, kind: str, volume: float, fee: float, holder_delta: int) -> None:
+        self.trade_events.append({
+            "event_id": len(self.trade_events) + 1,
+            "pool_id": pool_id,
+            "kind": kind,
+            "nmbr_amount": volume,
+            "fee_amount": fee,
+            "holder_delta": holder_delta,
+            "created_at": _now(),
+        })
+
+    def _pool_of_creator(self, creator_id: str) -> Optional[Dict[str, Any]]:
+        pools = self._table("pools").lookup("creator_id", creator_id)
+        return pools[0] if pools else None
+
+    def _project(self, table: str, row: Dict[str, Any], columns: str) -> Dict[str, Any]:
+        star, plain, embeds = _parse_select(columns)
+        result = dict(row) if star else {}
+        for column in plain:
+            alias, _, name = column.rpartition(":")
+            name = name.split("::")[0].strip()
+            result[alias.strip() or name] = row.get(name)
+        for key, name, inner in embeds:
+            result[key] = self._embed(table, row, name, inner)
+        return result
+
+    def _embed(self, table: str, row: Dict[str, Any], target: str, inner: str) -> Any:
+        foreign_key = f"{_singular(target)}_id"
+        if foreign_key in row:
+            # Many-to-one, e.g. transactions.user_id -> users
+            parent = self.get(target, row[foreign_key]) if row[foreign_key] else None
+            return self._project(target, parent, inner) if parent else None
+
+        # One-to-many, e.g. creators -> pools.creator_id
+        back_key = f"{_singular(table)}_id"
+        children = [self._project(target, child, inner) for child in self._table(target).lookup(back_key, row["id"])]
+        if (target, back_key) in UNIQUE_BACKREFS:
+            return children[0] if children else None
+        return children
+
+
+def install(fake: FakeSupabase) -> FakeSupabase:
+    """Make get_supabase() return the fake, wrapped like the real client (counted and timed)."""
+    from app import database
+
+    database._supabase_client = database.InstrumentedClient(fake)
+    return fake
+
+
+# ============ RPCs ============
+
+RPCS: Dict[str, Callable[..., Any]] = {}
+
+
+def rpc(name: str):
+    def register(func):
+        RPCS[name] = func
+        return func
+    return register
+
+
+def _set_changed(db: FakeSupabase, table: str, row: Dict[str, Any], column: str, value: Any) -> int:
+    """UPDATE ... WHERE column IS DISTINCT FROM value; returns 1 if the row changed."""
+    if row.get(column) == value:
+        return 0
+    db._update_row(table, row, {column: value})
+    return 1
+
+
+def _price_at(db: FakeSupabase, pool: Dict[str, Any], at: datetime) -> float:
+    latest, latest_at = None, None
+    for point in db._table("price_history").lookup("pool_id", pool["id"]):
+        point_at = _parse_ts(point["timestamp"])
+        if point_at <= at and (latest_at is None or point_at > latest_at):
+            latest, latest_at = point, point_at
+    return float(latest["price"]) if latest else float(pool.get("initial_price") or 0)
+
+
+@rpc("get_pool_prices_at")
+def _get_pool_prices_at(db: FakeSupabase, at: str) -> List[Dict[str, Any]]:
+    moment = _parse_ts(at)
+    return [{"pool_id": pool["id"], "price": _price_at(db, pool, moment)} for pool in db.rows("pools")]
+
+
+@rpc("maintenance_update_price_snapshots")
+def _update_price_snapshots(db: FakeSupabase) -> int:
+    return sum(_set_changed(db, "pools", p, "price_24h_ago", p["current_price"]) for p in db.rows("pools"))
+
+
+@rpc("maintenance_calculate_volume_24h")
+def _calculate_volume_24h(db: FakeSupabase, since: str) -> int:
+    cutoff = _parse_ts(since)
+    volumes: Dict[str, float] = {}
+    for tx in db.rows("transactions"):
+        if _parse_ts(tx["created_at"]) >= cutoff:
+            volumes[tx["pool_id"]] = volumes.get(tx["pool_id"], 0.0) + float(tx["nmbr_amount"])
+    return sum(_set_changed(db, "pools", p, "volume_24h", volumes.get(p["id"], 0.0)) for p in db.rows("pools"))
+
+
+@rpc("maintenance_calculate_price_changes")
+def _calculate_price_changes(db: FakeSupabase) -> int:
+    day_ago = datetime.now(timezone.utc) - timedelta(hours=24)
+    changed = 0
+    for pool in db.rows("pools"):
+        base = _price_at(db, pool, day_ago)
+        change = round((float(pool["current_price"]) - base) / base * 100, 4) if base > 0 else 0.0
+        changed += _set_changed(db, "pools", pool, "price_change_24h", change)
+    return changed
+
+
+@rpc("maintenance_update_market_caps")
+def _update_market_caps(db: FakeSupabase, total_supply: float = TOTAL_TOKEN_SUPPLY) -> int:
+    return sum(
+        _set_changed(db, "pools", p, "market_cap", float(total_supply) * float(p["current_price"]))
+        for p in db.rows("pools")
+    )
+
+
+@rpc("maintenance_update_portfolio_values")
+def _update_portfolio_values(db: FakeSupabase) -> int:
+    prices = {p["creator_id"]: float(p["current_price"]) for p in db.rows("pools")}
+    values: Dict[str, float] = {}
+    for holding in db.rows("user_holdings"):
+        if float(holding["token_amount"]) > 0:
+            value = float(holding["token_amount"]) * prices.get(holding["creator_id"], 0.0)
+            values[holding["user_id"]] = values.get(holding["user_id"], 0.0) + value
+    return sum(_set_changed(db, "users", u, "portfolio_value", values.get(u["id"], 0.0)) for u in db.rows("users"))
+
+
+@rpc("maintenance_prune_platform_buckets")
+def _prune_platform_buckets(db: FakeSupabase) -> int:
+    return 0  # Platform counters aren't emulated; get_platform_stats computes from the tables
+
+
+@rpc("consume_trade_events")
+def _consume_trade_events(db: FakeSupabase, max_events: int = 50_000, **_) -> Dict[str, Any]:
+    checkpoint = db._conflict("job_checkpoints", {"job_name": "trade_events"}, ("job_name",))
+    if checkpoint is None:
+        checkpoint = db._write_row("job_checkpoints", {"job_name": "trade_events", "cursor": "0", "state": {}}, None)
+    from_offset = int(checkpoint.get("cursor") or 0)
+    batch = [e for e in db.trade_events if e["event_id"] > from_offset][:max_events]
+    if not batch:
+        return {"consumed": 0, "pools_updated": 0, "from_offset": from_offset, "to_offset": from_offset}
+
+    totals: Dict[str, Dict[str, float]] = {}
+    for event in batch:
+        agg = totals.setdefault(event["pool_id"], {"volume": 0.0, "trades": 0, "fees": 0.0, "holders": 0})
+        if event["kind"] == "trade":
+            agg["volume"] += event["nmbr_amount"]
+            agg["trades"] += 1
+            agg["fees"] += event["fee_amount"]
+        agg["holders"] += event["holder_delta"]
+
+    updated = 0
+    for pool_id, agg in totals.items():
+        pool = db.get("pools", pool_id)
+        if pool is None:
+            continue
+        db._update_row("pools", pool, {
+            "volume_all_time": float(pool.get("volume_all_time") or 0) + agg["volume"],
+            "trade_count": int(pool.get("trade_count") or 0) + agg["trades"],
+            "fees_collected": float(pool.get("fees_collected") or 0) + agg["fees"],
+            "holder_count": max(int(pool.get("holder_count") or 0) + agg["holders"], 0),
+        })
+        updated += 1
+
+    to_offset = batch[-1]["event_id"]
+    db._update_row("job_checkpoints", checkpoint, {"cursor": str(to_offset), "state": {"last_consumed": len(batch)}})
+    return {"consumed": len(batch), "pools_updated": updated, "from_offset": from_offset, "to_offset": to_offset}
+
+
+@rpc("try_acquire_job_lock")
+def _try_acquire_job_lock(db: FakeSupabase, lock_name: str, lock_holder: str, ttl_seconds: int = 300) -> bool:
+    held = db.job_locks.get(lock_name)
+    if held and held[0] != lock_holder and held[1] > time.time():
+        return False
+    db.job_locks[lock_name] = (lock_holder, time.time() + ttl_seconds)
+    return True
+
+
+@rpc("release_job_lock")
+def _release_job_lock(db: FakeSupabase, lock_name: str, lock_holder: str) -> bool:
+    held = db.job_locks.get(lock_name)
+    if held and held[0] == lock_holder:
+        del db.job_locks[lock_name]
+        return True
+    return False
+
+
+@rpc("claim_faucet")
+def _claim_faucet(db: FakeSupabase, target_user_id: str, fingerprint: str, amount: float) -> Dict[str, Any]:
+    user = db.get("users", target_user_id)
+    if user is None:
+        return {"status": "USER_NOT_FOUND"}
+    if user.get("faucet_claimed"):
+        return {"status": "ALREADY_CLAIMED"}
+    owner = db._conflict("users", {"device_fingerprint": fingerprint}, ("device_fingerprint",))
+    if owner is not None and owner["id"] != target_user_id:
+        return {"status": "DEVICE_BLOCKED", "owner_id": owner["id"]}
+    balance = float(user.get("nmbr_balance") or 0) + float(amount)
+    db._update_row("users", user, {"nmbr_balance": balance, "faucet_claimed": True, "device_fingerprint": fingerprint})
+    return {"status": "OK", "new_balance": balance}
+
+
+@rpc("get_platform_stats")
+def _get_platform_stats(db: FakeSupabase) -> Dict[str, Any]:
+    day_ago = datetime.now(timezone.utc) - timedelta(hours=24)
+    users = db.rows("users")
+    return {
+        "total_users": len(users),
+        "nmbr_circulating": sum(float(u.get("nmbr_balance") or 0) for u in users),
+        "new_users_24h": sum(1 for u in users if _parse_ts(u["created_at"]) >= day_ago),
+        "volume_24h": sum(
+            float(tx["nmbr_amount"]) for tx in db.rows("transactions") if _parse_ts(tx["created_at"]) >= day_ago
+        ),
+    }
+
+
+@rpc("bulk_update_rows")
+def _bulk_update_rows(db: FakeSupabase, target_table: str, key_column: str, rows: List[Dict[str, Any]]) -> int:
+    changed = 0
+    for values in rows:
+        for row in db._table(target_table).lookup(key_column, values[key_column]):
+            updates = {k: v for k, v in values.items() if k != key_column and row.get(k) != v}
+            if updates:
+                db._update_row(target_table, row, updates)
+                changed += 1
+    return changed
+
+
+# ============ Seed data ============
+
+@dataclass
+class SeededUser:
+    id: str
+    token: str  # Bearer token accepted by auth.get_user
+
+
+@dataclass
+class Market:
+    """What seed_market() created, for scenarios to pick from."""
+    users: List[SeededUser]
+    creator_ids: List[str]
+    pool_ids: List[str]
+    holdings: List[Tuple[int, str]]  # (user index, creator id)
+
+
+def seed_market(
+    fake: FakeSupabase,
+    users: int = 100,
+    creators: int = 50,
+    holdings_per_user: int = 3,
+    history_points: int = 24,
+    balance: float = 1_000_000.0,
+    seed: int = 42
+) -> Market:
+    """
+    Fill the fake with users, creators with pools, holdings and a day of
+    price history. Inserts don't count as round trips.
+    """
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+
+    creator_ids, pool_ids = [], []
+    for n in range(creators):
+        price = round(rng.uniform(0.001, 0.05), 8)
+        creator = fake.insert("creators", {
+            "youtube_channel_id": f"UC{n:022d}",
+            "username": f"@creator{n}",
+            "display_name": f"Creator {n}",
+            "avatar_url": f"https://example.com/avatars/{n}.jpg",
+            "subscriber_count": int(10 ** rng.uniform(4, 8)),
+            "view_count_lifetime": int(10 ** rng.uniform(6, 10)),
+            "token_symbol": f"TKN{n}",
+        })
+        pool = fake.insert("pools", {
+            "creator_id": creator["id"],
+            "nmbr_reserve": price * INITIAL_TOKEN_SUPPLY,
+            "initial_price": price,
+            "current_price": price,
+            "price_24h_ago": price,
+            "market_cap": price * TOTAL_TOKEN_SUPPLY,
+        })
+        for h in range(history_points, 0, -1):
+            fake.insert("price_history", {
+                "pool_id": pool["id"],
+                "price": price,
+                "volume": 0.0,
+                "timestamp": (now - timedelta(hours=h)).isoformat(timespec="microseconds"),
+            })
+        creator_ids.append(creator["id"])
+        pool_ids.append(pool["id"])
+
+    seeded_users, holdings = [], []
+    for n in range(users):
+        auth_id = str(uuid.uuid4())
+        user = fake.insert("users", {
+            "auth_id": auth_id,
+            "email": f"user{n}@example.com",
+            "username": f"user{n}",
+            "display_name": f"User {n}",
+            "nmbr_balance": balance,
+            "faucet_claimed": True,
+        })
+        token = f"token-{n}"
+        fake.add_auth_user(token, auth_id, user["email"])
+        seeded_users.append(SeededUser(user["id"], token))
+
+        invested = 0.0
+        for creator_index in rng.sample(range(creators), min(holdings_per_user, creators)):
+            pool = fake.get("pools", pool_ids[creator_index])
+            amount = round(rng.uniform(1_000, 50_000), 4)
+            fake.insert("user_holdings", {
+                "user_id": user["id"],
+                "creator_id": creator_ids[creator_index],
+                "token_amount": amount,
+                "avg_buy_price": pool["current_price"],
+                "total_cost_basis": amount * pool["current_price"],
+            })
+            invested += amount * pool["current_price"]
+            holdings.append((n, creator_ids[creator_index]))
+        fake._update_row("users", user, {"total_invested": invested, "portfolio_value": invested})
+
+    return Market(seeded_users, creator_ids, pool_ids, holdings)
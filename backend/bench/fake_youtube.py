@@ -0,0 +1,336 @@
+"""
+Fake YouTube Data API v3
+
+A local, deterministic stand-in for the subset of the YouTube Data API we
+use (channels, search, playlistItems, videos). Responses come from the
+recorded fixtures in bench/fixtures/youtube/; channel IDs that aren't in
+the fixtures are synthesized from a hash of the ID, so scripts like
+add_top_youtubers.py work against the full channel list.
+
+Latency, errors (429 / 500 / 403 quotaExceeded) and a quota budget can be
+injected. All randomness comes from one seeded RNG, so the same request
+sequence always produces the same faults.
+
+Usage:
+    cd backend
+    python -m bench.fake_youtube --port 8765 --latency-ms 80 --error-rate 0.02
+
+    # then, in another shell
+    export YOUTUBE_API_BASE=http://127.0.0.1:8765/youtube/v3
+    export YOUTUBE_API_KEY=fake
+    python scripts/add_top_youtubers.py
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import JSONResponse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "youtube")
+
+# Quota cost per call, from the YouTube Data API documentation
+QUOTA_COSTS = {"channels": 1, "search": 100, "playlistItems": 1, "videos": 1}
+
+# Parts that are always returned, whatever `part` asks for
+ALWAYS_PRESENT = ("kind", "etag", "id")
+
+
+@dataclass
+class FaultConfig:
+    """What to inject into responses."""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0            # Probability of an injected 429/500
+    quota_error_rate: float = 0.0      # Probability of an injected 403 quotaExceeded
+    quota_limit: Optional[int] = None  # Units before every call returns quotaExceeded
+    seed: int = 42
+
+
+@dataclass
+class FakeYouTubeStats:
+    """Counters exposed at /_stats for assertions and reports."""
+    requests: Dict[str, int] = field(default_factory=dict)
+    errors: Dict[str, int] = field(default_factory=dict)
+    quota_used: int = 0
+
+
+def _error(status: int, reason: str, message: str) -> JSONResponse:
+    """Build an error body in the same shape as the real API."""
+    return JSONResponse(status_code=status, content={
+        "error": {
+            "code": status,
+            "message": message,
+            "errors": [{"message": message, "domain": "youtube.quota" if status == 403 else "global", "reason": reason}],
+        }
+    })
+
+
+def _hash_unit(*parts: str) -> float:
+    """Deterministic float in [0, 1) derived from the given strings."""
+    digest = hashlib.sha256("|".join(parts).encode()).hexdigest()
+    return int(digest[:12], 16) / float(1 << 48)
+
+
+class FixtureStore:
+    """Recorded responses, indexed the way the endpoints look them up."""
+
+    def __init__(self, fixtures_dir: str = FIXTURES_DIR, now: Optional[datetime] = None):
+        self.now = now or datetime.now(timezone.utc)
+        self.channels: Dict[str, Dict[str, Any]] = {}
+        self.handles: Dict[str, str] = {}
+        self.playlist_items: Dict[str, List[Dict[str, Any]]] = {}
+        self.videos: Dict[str, Dict[str, Any]] = {}
+        self.searches: Dict[str, List[Dict[str, Any]]] = {}
+        self._load(fixtures_dir)
+
+    def _load(self, fixtures_dir: str) -> None:
+        def read(name: str) -> Any:
+            path = os.path.join(fixtures_dir, name)
+            if not os.path.exists(path):
+                return None
+            with open(path) as f:
+                return json.load(f)
+
+        meta = read("meta.json") or {}
+        # Recorded publish dates are shifted so they are as old relative to
+        # "now" as they were when recorded - 30-day view estimates stay stable.
+        recorded_at = meta.get("recorded_at")
+        shift = self.now - _parse_ts(recorded_at) if recorded_at else timedelta(0)
+
+        for item in read("channels.json") or []:
+            self.channels[item["id"]] = item
+            custom_url = item.get("snippet", {}).get("customUrl", "")
+            if custom_url:
+                self.handles[custom_url.lstrip("@").lower()] = item["id"]
+
+        for playlist_id, items in (read("playlistItems.json") or {}).items():
+            self.playlist_items[playlist_id] = [_shift_dates(i, shift) for i in items]
+
+        for item in read("videos.json") or []:
+            self.videos[item["id"]] = _shift_dates(item, shift)
+
+        for query, items in (read("search.json") or {}).items():
+            self.searches[query.lower()] = items
+
+    def channel(self, channel_id: str) -> Optional[Dict[str, Any]]:
+        """Get a recorded channel, or synthesize a stable one for unknown well-formed IDs."""
+        if channel_id not in self.channels:
+            if not (channel_id.startswith("UC") and len(channel_id) == 24):
+                return None
+            self._synthesize_channel(channel_id)
+        return self.channels[channel_id]
+
+    def _synthesize_channel(self, channel_id: str) -> None:
+        u = _hash_unit(channel_id, "subs")
+        subscribers = int(10 ** (3 + 5.5 * u))
+        lifetime_views = int(subscribers * (50 + 750 * _hash_unit(channel_id, "views")))
+        video_count = 20 + int(2000 * _hash_unit(channel_id, "videos"))
+        title = f"Channel {channel_id[2:8]}"
+        uploads = "UU" + channel_id[2:]
+
+        self.channels[channel_id] = {
+            "kind": "youtube#channel",
+            "etag": hashlib.md5(channel_id.encode()).hexdigest(),
+            "id": channel_id,
+            "snippet": {
+                "title": title,
+                "description": f"Synthetic channel for {channel_id}",
+                "customUrl": f"@{title.replace(' ', '').lower()}",
+                "publishedAt": "2015-01-01T00:00:00Z",
+                "thumbnails": {"high": {"url": f"https://yt3.example.invalid/{channel_id}=s800"}},
+                "country": "US",
+            },
+            "statistics": {
+                "subscriberCount": str(subscribers),
+                "viewCount": str(lifetime_views),
+                "videoCount": str(video_count),
+            },
+            "brandingSettings": {"channel": {"title": title}, "image": {}},
+            "contentDetails": {"relatedPlaylists": {"uploads": uploads}},
+        }
+
+        # 20 uploads, one every 3 days, with views scaled to the channel size
+        items = []
+        for n in range(20):
+            video_id = hashlib.sha1(f"{channel_id}:{n}".encode()).hexdigest()[:11]
+            published = (self.now - timedelta(days=3 * n + 1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+            views = int(subscribers * 0.05 * (0.2 + _hash_unit(video_id)))
+            items.append({
+                "kind": "youtube#playlistItem",
+                "id": f"{uploads}.{n}",
+                "snippet": {"title": f"Video {n}", "publishedAt": published},
+                "contentDetails": {"videoId": video_id, "videoPublishedAt": published},
+            })
+            self.videos[video_id] = {
+                "kind": "youtube#video",
+                "id": video_id,
+                "snippet": {"title": f"Video {n}", "publishedAt": published},
+                "statistics": {
+                    "viewCount": str(views),
+                    "likeCount": str(views // 25),
+                    "commentCount": str(views // 400),
+                },
+            }
+        self.playlist_items[uploads] = items
+
+
+def _parse_ts(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _shift_dates(item: Dict[str, Any], shift: timedelta) -> Dict[str, Any]:
+    """Move publishedAt fields forward by `shift`."""
+    if not shift:
+        return item
+    item = json.loads(json.dumps(item))
+    for section in ("snippet", "contentDetails"):
+        for key in ("publishedAt", "videoPublishedAt"):
+            value = item.get(section, {}).get(key)
+            if value:
+                item[section][key] = (_parse_ts(value) + shift).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return item
+
+
+def _select_parts(resource: Dict[str, Any], part: str) -> Dict[str, Any]:
+    """Return only the requested parts, like the real API."""
+    wanted = {p.strip() for p in part.split(",") if p.strip()}
+    return {k: v for k, v in resource.items() if k in ALWAYS_PRESENT or k in wanted}
+
+
+def create_fake_youtube_app(
+    faults: Optional[FaultConfig] = None,
+    fixtures_dir: str = FIXTURES_DIR
+) -> FastAPI:
+    """Build the fake API. Mount point is /youtube/v3 to mirror the real base URL."""
+    faults = faults or FaultConfig()
+    store = FixtureStore(fixtures_dir)
+    stats = FakeYouTubeStats()
+    rng = random.Random(faults.seed)
+
+    app = FastAPI(title="Fake YouTube Data API")
+    app.state.store = store
+    app.state.stats = stats
+    app.state.faults = faults
+
+    @app.middleware("http")
+    async def inject_faults(request: Request, call_next):
+        endpoint = request.url.path.rsplit("/", 1)[-1]
+        if endpoint not in QUOTA_COSTS:
+            return await call_next(request)
+
+        stats.requests[endpoint] = stats.requests.get(endpoint, 0) + 1
+
+        delay = faults.latency_ms + (rng.uniform(-1, 1) * faults.jitter_ms if faults.jitter_ms else 0)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        if faults.quota_limit is not None and stats.quota_used + QUOTA_COSTS[endpoint] > faults.quota_limit:
+            return _record_error(stats, "quotaExceeded", _error(403, "quotaExceeded", "The request cannot be completed because you have exceeded your quota."))
+
+        roll = rng.random()
+        if roll < faults.quota_error_rate:
+            return _record_error(stats, "quotaExceeded", _error(403, "quotaExceeded", "The request cannot be completed because you have exceeded your quota."))
+        if roll < faults.quota_error_rate + faults.error_rate:
+            if rng.random() < 0.5:
+                return _record_error(stats, "rateLimitExceeded", _error(429, "rateLimitExceeded", "Too many requests."))
+            return _record_error(stats, "backendError", _error(500, "backendError", "Backend Error"))
+
+        stats.quota_used += QUOTA_COSTS[endpoint]
+        return await call_next(request)
+
+    @app.get("/youtube/v3/channels")
+    async def channels(
+        part: str = Query(...),
+        id: Optional[str] = None,
+        forHandle: Optional[str] = None,
+        maxResults: int = 5,
+    ):
+        if forHandle:
+            channel_id = store.handles.get(forHandle.lstrip("@").lower())
+            ids = [channel_id] if channel_id else []
+        else:
+            ids = [i for i in (id or "").split(",") if i][:50]
+
+        items = [_select_parts(c, part) for c in map(store.channel, ids) if c]
+        return {"kind": "youtube#channelListResponse", "pageInfo": {"totalResults": len(items)}, "items": items}
+
+    @app.get("/youtube/v3/search")
+    async def search(part: str = Query(...), q: str = "", type: str = "channel", maxResults: int = 5):
+        items = store.searches.get(q.lower())
+        if items is None:
+            # Unrecorded query: match recorded channel titles
+            items = [
+                {
+                    "kind": "youtube#searchResult",
+                    "id": {"kind": "youtube#channel", "channelId": c["id"]},
+                    "snippet": {
+                        "channelTitle": c["snippet"]["title"],
+                        "description": c["snippet"].get("description", ""),
+                        "thumbnails": c["snippet"].get("thumbnails", {}),
+                    },
+                }
+                for c in store.channels.values()
+                if q.lower() in c["snippet"]["title"].lower()
+            ]
+        return {"kind": "youtube#searchListResponse", "items": items[:maxResults]}
+
+    @app.get("/youtube/v3/playlistItems")
+    async def playlist_items(part: str = Query(...), playlistId: str = "", maxResults: int = 5):
+        if playlistId not in store.playlist_items and playlistId.startswith("UU"):
+            store.channel("UC" + playlistId[2:])
+        items = store.playlist_items.get(playlistId, [])[:maxResults]
+        return {"kind": "youtube#playlistItemListResponse", "items": [_select_parts(i, part) for i in items]}
+
+    @app.get("/youtube/v3/videos")
+    async def videos(part: str = Query(...), id: str = ""):
+        items = [_select_parts(store.videos[v], part) for v in id.split(",") if v in store.videos]
+        return {"kind": "youtube#videoListResponse", "items": items}
+
+    @app.get("/_stats")
+    async def get_stats():
+        return {"requests": stats.requests, "errors": stats.errors, "quota_used": stats.quota_used}
+
+    return app
+
+
+def _record_error(stats: FakeYouTubeStats, reason: str, response: JSONResponse) -> JSONResponse:
+    stats.errors[reason] = stats.errors.get(reason, 0) + 1
+    return response
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a local fake YouTube Data API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of a 429/500 response")
+    parser.add_argument("--quota-error-rate", type=float, default=0.0, help="Probability of a 403 quotaExceeded")
+    parser.add_argument("--quota", type=int, default=None, help="Quota units available before every call fails")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    faults = FaultConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        quota_error_rate=args.quota_error_rate,
+        quota_limit=args.quota,
+        seed=args.seed,
+    )
+    print(f"Fake YouTube API on http://{args.host}:{args.port}/youtube/v3")
+    uvicorn.run(create_fake_youtube_app(faults), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,506 @@
+"""
+Load Generator
+
+Simulates a population of traders against a local API instance backed by
+the in-memory Supabase fake (bench/fake_supabase.py), and reports
+throughput, latency percentiles and consistency violations.
+
+Each simulated user:
+1. signs up through /auth/callback with a device fingerprint, which claims
+   the faucet (a small share reuse a device; only one user per device may
+   be credited)
+2. loops until the run ends: quote, buy, sell, check the portfolio, browse
+   creators, poll the leaderboard - with exponential think time between
+   actions. Creators are picked from a Zipf (power-law) popularity
+   distribution, so a few pools take most of the trades.
+
+The population grows in stages (--stages 50,200,1000): every stage signs
+up more users and keeps the earlier ones trading. Throughput per stage
+shows where the API saturates - the first stage where more users no
+longer buy more throughput.
+
+After the run the fake's tables are checked against the ledger:
+- no negative reserves, token supplies, balances or holdings
+- pool reserves and token supplies equal their seed values plus the net
+  effect of every recorded transaction
+- each device was credited by the faucet exactly once
+- every balance equals the faucet credit plus sells minus buys, and every
+  holding equals tokens bought minus tokens sold
+- the balance in every trade response matches the client's running total
+- the number of recorded trades equals the number the clients saw succeed
+
+The API runs under uvicorn in a background thread on a free port, so
+requests go through real HTTP.
+
+Usage:
+    cd backend
+    python -m bench.loadgen --stages 50,200,1000 --stage-seconds 10 --latency-ms 2
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import random
+import socket
+import statistics
+import sys
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The app reads these when it is built; keep the run quiet and self-contained
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+os.environ.setdefault("LOG_REQUESTS", "false")
+
+import httpx
+import uvicorn
+
+from app.config import get_settings
+from app.main import create_app
+from bench.fake_supabase import FakeSupabase, install, seed_market
+
+# Relative weight of each action in a session
+ACTION_WEIGHTS = {
+    "quote": 30,
+    "buy": 20,
+    "sell": 15,
+    "portfolio": 15,
+    "creators": 15,
+    "leaderboard": 5,
+}
+
+# Floating-point slack for the ledger checks
+TOLERANCE = 1e-6
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class AppServer:
+    """Runs the API under uvicorn in a daemon thread for the duration of a `with` block."""
+
+    def __init__(self):
+        self.port = _free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self._server = uvicorn.Server(uvicorn.Config(
+            create_app(), host="127.0.0.1", port=self.port, log_level="warning", access_log=False
+        ))
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def __enter__(self) -> "AppServer":
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
+
+
+# ============ Recording ============
+
+@dataclass
+class StageStats:
+    """Requests completed while one stage was running."""
+    users: int
+    started: float = field(default_factory=time.perf_counter)
+    ended: Optional[float] = None
+    latencies: Dict[str, List[float]] = field(default_factory=dict)
+    rejected: Dict[str, int] = field(default_factory=dict)  # 4xx
+    errors: Dict[str, int] = field(default_factory=dict)    # 5xx, timeouts, connection errors
+
+    def record(self, action: str, seconds: float, status: Optional[int]) -> None:
+        self.latencies.setdefault(action, []).append(seconds)
+        if status is None or status >= 500:
+            self.errors[action] = self.errors.get(action, 0) + 1
+        elif status >= 400:
+            self.rejected[action] = self.rejected.get(action, 0) + 1
+
+    @property
+    def requests(self) -> int:
+        return sum(len(v) for v in self.latencies.values())
+
+    def throughput(self) -> float:
+        elapsed = (self.ended or time.perf_counter()) - self.started
+        return self.requests / elapsed if elapsed > 0 else 0.0
+
+
+@dataclass
+class Violations:
+    counts: Dict[str, int] = field(default_factory=dict)
+    examples: List[str] = field(default_factory=list)
+
+    def add(self, kind: str, detail: str) -> None:
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+        if len(self.examples) < 10:
+            self.examples.append(f"{kind}: {detail}")
+
+
+class Run:
+    """Shared state of one load run: the stage being recorded and client-side checks."""
+
+    def __init__(self):
+        self.stage: Optional[StageStats] = None
+        self.stages: List[StageStats] = []
+        self.stopping = asyncio.Event()
+        self.violations = Violations()
+        self.trades_ok = 0
+
+    def record(self, action: str, seconds: float, status: Optional[int]) -> None:
+        if self.stage is not None:
+            self.stage.record(action, seconds, status)
+
+
+# ============ Simulated users ============
+
+class ZipfPicker:
+    """Creator ids with popularity proportional to 1 / rank^s."""
+
+    def __init__(self, creator_ids: List[str], s: float):
+        self.creator_ids = creator_ids
+        weights = [1.0 / (rank ** s) for rank in range(1, len(creator_ids) + 1)]
+        total = 0.0
+        self.cumulative = []
+        for w in weights:
+            total += w
+            self.cumulative.append(total)
+
+    def pick(self, rng: random.Random) -> str:
+        return rng.choices(self.creator_ids, cum_weights=self.cumulative)[0]
+
+
+@dataclass
+class Trader:
+    index: int
+    token: str
+    fingerprint: str
+    rng: random.Random
+    user_id: Optional[str] = None
+    credited: bool = False  # Got the faucet at sign-up
+    balance: float = 0.0
+    holdings: Dict[str, float] = field(default_factory=dict)  # creator id -> tokens
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+async def _request(run: Run, client: httpx.AsyncClient, action: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except httpx.HTTPError:
+        run.record(action, time.perf_counter() - start, None)
+        return None
+    run.record(action, time.perf_counter() - start, response.status_code)
+    return response
+
+
+async def sign_up(run: Run, client: httpx.AsyncClient, fake: FakeSupabase, trader: Trader, faucet_amount: float) -> bool:
+    """OAuth callback with a device fingerprint; the first user on a device gets the faucet."""
+    auth_id = str(uuid.uuid4())
+    fake.add_auth_user(trader.token, auth_id, f"trader{trader.index}@example.com", {"full_name": f"Trader {trader.index}"})
+
+    response = await _request(run, client, "signup", "POST", "/api/v1/auth/callback", json={
+        "access_token": trader.token,
+        "device_fingerprint": trader.fingerprint,
+    })
+    if response is None or response.status_code != 200:
+        return False
+
+    user = response.json()["user"]
+    trader.user_id = user["id"]
+    trader.balance = float(user.get("nmbr_balance") or 0)
+    trader.credited = trader.balance > 0
+    if trader.credited and abs(trader.balance - faucet_amount) > TOLERANCE:
+        run.violations.add("faucet_credit", f"trader {trader.index} got {trader.balance}, expected {faucet_amount}")
+    return True
+
+
+async def _trade(run: Run, client: httpx.AsyncClient, trader: Trader, creator_id: str, side: str, amount: float) -> None:
+    response = await _request(run, client, side, "POST", "/api/v1/trade/execute", headers=trader.headers, json={
+        "creator_id": creator_id,
+        "type": side,
+        "amount": amount,
+        "amount_type": "nmbr" if side == "buy" else "token",
+        "max_slippage_pct": 50.0,
+    })
+    if response is None or response.status_code != 200:
+        return
+
+    body = response.json()
+    tx = body["transaction"]
+    run.trades_ok += 1
+    if side == "buy":
+        expected_balance = trader.balance - amount
+        trader.holdings[creator_id] = trader.holdings.get(creator_id, 0.0) + float(tx["token_amount"])
+    else:
+        expected_balance = trader.balance + float(tx["nmbr_amount"])
+        remaining = trader.holdings.get(creator_id, 0.0) - amount
+        if remaining > TOLERANCE:
+            trader.holdings[creator_id] = remaining
+        else:
+            trader.holdings.pop(creator_id, None)
+
+    new_balance = float(body["new_balance"])
+    if abs(new_balance - expected_balance) > TOLERANCE * max(1.0, abs(expected_balance)):
+        run.violations.add("response_balance", f"trader {trader.index}: {new_balance} != expected {expected_balance}")
+    trader.balance = new_balance
+
+
+async def act(run: Run, client: httpx.AsyncClient, trader: Trader, creators: ZipfPicker) -> None:
+    """One randomly chosen action."""
+    rng = trader.rng
+    action = rng.choices(list(ACTION_WEIGHTS), weights=list(ACTION_WEIGHTS.values()))[0]
+
+    if action == "sell" and not trader.holdings:
+        action = "buy"
+    if action == "buy" and trader.balance < 1:
+        action = "quote"
+
+    if action == "quote":
+        await _request(run, client, "quote", "POST", "/api/v1/trade/quote", headers=trader.headers, json={
+            "creator_id": creators.pick(rng),
+            "type": "buy",
+            "amount": round(rng.uniform(1, 500), 2),
+            "amount_type": "nmbr",
+        })
+    elif action == "buy":
+        amount = round(max(1.0, trader.balance * rng.uniform(0.01, 0.1)), 4)
+        await _trade(run, client, trader, creators.pick(rng), "buy", min(amount, trader.balance))
+    elif action == "sell":
+        creator_id = rng.choice(list(trader.holdings))
+        held = trader.holdings[creator_id]
+        amount = held if rng.random() < 0.25 else round(held * rng.uniform(0.1, 0.9), 8)
+        await _trade(run, client, trader, creator_id, "sell", amount)
+    elif action == "portfolio":
+        await _request(run, client, "portfolio", "GET", "/api/v1/portfolio", headers=trader.headers)
+    elif action == "creators":
+        await _request(run, client, "creators", "GET", "/api/v1/creators", params={
+            "limit": 20, "sort_by": rng.choice(["volume_24h", "market_cap", "price_change_24h"]),
+        })
+    else:
+        await _request(run, client, "leaderboard", "GET", "/api/v1/leaderboard", headers=trader.headers, params={"limit": 50})
+
+
+async def session(run: Run, client: httpx.AsyncClient, fake: FakeSupabase, trader: Trader,
+                  creators: ZipfPicker, think_ms: float, faucet_amount: float) -> None:
+    if not await sign_up(run, client, fake, trader, faucet_amount):
+        return
+    while not run.stopping.is_set():
+        await act(run, client, trader, creators)
+        if think_ms > 0:
+            try:
+                await asyncio.wait_for(run.stopping.wait(), timeout=trader.rng.expovariate(1000 / think_ms))
+            except asyncio.TimeoutError:
+                pass
+
+
+# ============ Consistency ============
+
+def check_consistency(fake: FakeSupabase, traders: List[Trader], initial_pools: Dict[str, Tuple[float, float]],
+                      faucet_amount: float, run: Run) -> Violations:
+    """Compare the fake's tables with the ledger of recorded transactions."""
+    violations = run.violations
+    transactions = fake.rows("transactions")
+
+    if len(transactions) != run.trades_ok:
+        violations.add("trade_count", f"{len(transactions)} recorded vs {run.trades_ok} acknowledged")
+
+    reserve_delta: Dict[str, float] = {}
+    supply_delta: Dict[str, float] = {}
+    balance_delta: Dict[str, float] = {}
+    token_delta: Dict[Tuple[str, str], float] = {}
+    pool_creator = {p["id"]: p["creator_id"] for p in fake.rows("pools")}
+
+    for tx in transactions:
+        nmbr, fee, tokens = float(tx["nmbr_amount"]), float(tx["fee_amount"] or 0), float(tx["token_amount"])
+        key = (tx["user_id"], pool_creator.get(tx["pool_id"]))
+        if tx["type"] == "buy":
+            reserve_delta[tx["pool_id"]] = reserve_delta.get(tx["pool_id"], 0.0) + nmbr - fee
+            supply_delta[tx["pool_id"]] = supply_delta.get(tx["pool_id"], 0.0) - tokens
+            balance_delta[tx["user_id"]] = balance_delta.get(tx["user_id"], 0.0) - nmbr
+            token_delta[key] = token_delta.get(key, 0.0) + tokens
+        else:
+            reserve_delta[tx["pool_id"]] = reserve_delta.get(tx["pool_id"], 0.0) - nmbr - fee
+            supply_delta[tx["pool_id"]] = supply_delta.get(tx["pool_id"], 0.0) + tokens
+            balance_delta[tx["user_id"]] = balance_delta.get(tx["user_id"], 0.0) + nmbr
+            token_delta[key] = token_delta.get(key, 0.0) - tokens
+
+    def close(a: float, b: float) -> bool:
+        return math.isclose(a, b, rel_tol=TOLERANCE, abs_tol=TOLERANCE)
+
+    for pool in fake.rows("pools"):
+        reserve, supply = float(pool["nmbr_reserve"]), float(pool["token_supply"])
+        if reserve <= 0 or supply <= 0:
+            violations.add("negative_reserve", f"pool {pool['id']}: reserve {reserve}, supply {supply}")
+        start_reserve, start_supply = initial_pools[pool["id"]]
+        if not close(reserve, start_reserve + reserve_delta.get(pool["id"], 0.0)):
+            violations.add("reserve_mismatch", f"pool {pool['id']}: {reserve} != {start_reserve + reserve_delta.get(pool['id'], 0.0)}")
+        if not close(supply, start_supply + supply_delta.get(pool["id"], 0.0)):
+            violations.add("supply_mismatch", f"pool {pool['id']}: {supply} != {start_supply + supply_delta.get(pool['id'], 0.0)}")
+
+    holdings = {(h["user_id"], h["creator_id"]): float(h["token_amount"]) for h in fake.rows("user_holdings")}
+    for (user_id, creator_id), amount in holdings.items():
+        if amount < -TOLERANCE:
+            violations.add("negative_holding", f"user {user_id} creator {creator_id}: {amount}")
+    for key in set(holdings) | set(token_delta):
+        if not close(holdings.get(key, 0.0), token_delta.get(key, 0.0)):
+            violations.add("holding_mismatch", f"user {key[0]} creator {key[1]}: {holdings.get(key, 0.0)} != {token_delta.get(key, 0.0)}")
+
+    # Whichever user signed up first on a device gets the faucet - exactly one per device
+    credits_per_device: Dict[str, int] = {}
+    for trader in traders:
+        if trader.user_id is not None:
+            credits_per_device[trader.fingerprint] = credits_per_device.get(trader.fingerprint, 0) + trader.credited
+    for fingerprint, credits in credits_per_device.items():
+        if credits != 1:
+            violations.add("faucet_credit", f"device {fingerprint} credited {credits} times")
+
+    for trader in traders:
+        if trader.user_id is None:
+            continue
+        user = fake.get("users", trader.user_id)
+        balance = float(user["nmbr_balance"])
+        if balance < -TOLERANCE:
+            violations.add("negative_balance", f"user {trader.user_id}: {balance}")
+        credited = faucet_amount if trader.credited else 0.0
+        expected = credited + balance_delta.get(trader.user_id, 0.0)
+        if not close(balance, expected):
+            violations.add("balance_mismatch", f"user {trader.user_id}: {balance} != {expected}")
+    return violations
+
+
+# ============ Driver ============
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_load(args: argparse.Namespace) -> dict:
+    fake = FakeSupabase(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, seed=args.seed)
+    market = seed_market(fake, users=0, creators=args.creators, seed=args.seed)
+    install(fake)
+    initial_pools = {
+        p["id"]: (float(p["nmbr_reserve"]), float(p["token_supply"])) for p in fake.rows("pools")
+    }
+    faucet_amount = get_settings().faucet_amount
+    creators = ZipfPicker(market.creator_ids, args.zipf)
+    stages = [int(s) for s in args.stages.split(",")]
+
+    run = Run()
+    traders: List[Trader] = []
+    tasks: List[asyncio.Task] = []
+    shared_devices: List[str] = []
+    rng = random.Random(args.seed)
+
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    with AppServer() as server:
+        async with httpx.AsyncClient(base_url=server.base_url, limits=limits, timeout=args.timeout_s) as client:
+            for users in stages:
+                previous = run.stage
+                run.stage = StageStats(users)
+                if previous is not None:
+                    previous.ended = run.stage.started
+                run.stages.append(run.stage)
+
+                while len(traders) < users:
+                    index = len(traders)
+                    reuse = shared_devices and rng.random() < args.shared_device_rate
+                    fingerprint = rng.choice(shared_devices) if reuse else f"device-{uuid.uuid4().hex}"
+                    if not reuse:
+                        shared_devices.append(fingerprint)
+                    trader = Trader(index, f"trader-token-{index}", fingerprint, random.Random(args.seed + index))
+                    traders.append(trader)
+                    tasks.append(asyncio.create_task(
+                        session(run, client, fake, trader, creators, args.think_ms, faucet_amount)
+                    ))
+                await asyncio.sleep(args.stage_seconds)
+
+            run.stage.ended = time.perf_counter()
+            run.stage = None
+            run.stopping.set()
+            await asyncio.gather(*tasks)
+
+    violations = check_consistency(fake, traders, initial_pools, faucet_amount, run)
+    return {"stages": run.stages, "violations": violations, "fake": fake}
+
+
+def _saturation(stages: List[StageStats]) -> StageStats:
+    """First stage after which adding users raised throughput by less than 5%."""
+    best = stages[0]
+    for stage in stages[1:]:
+        if stage.throughput() < best.throughput() * 1.05:
+            return best
+        best = stage
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate trader populations against a local API")
+    parser.add_argument("--stages", default="50,200,1000", help="Comma-separated active user counts")
+    parser.add_argument("--stage-seconds", type=float, default=10.0)
+    parser.add_argument("--creators", type=int, default=100)
+    parser.add_argument("--zipf", type=float, default=1.1, help="Creator popularity exponent")
+    parser.add_argument("--think-ms", type=float, default=500.0, help="Mean pause between a user's actions")
+    parser.add_argument("--shared-device-rate", type=float, default=0.02, help="Share of sign-ups reusing a device")
+    parser.add_argument("--connections", type=int, default=100, help="Client connection pool size")
+    parser.add_argument("--timeout-s", type=float, default=30.0)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Injected latency per Supabase round trip")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    result = asyncio.run(run_load(args))
+    stages: List[StageStats] = result["stages"]
+
+    print(f"\n📈 {args.creators} creators (zipf {args.zipf}), think {args.think_ms}ms, {args.latency_ms}ms per round trip")
+    print(f"   {'users':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'4xx':>6} {'errors':>7}")
+    for stage in stages:
+        latencies = [l for values in stage.latencies.values() for l in values]
+        print(
+            f"   {stage.users:>6} {stage.throughput():>8.1f} "
+            f"{(statistics.median(latencies) if latencies else 0) * 1000:>8.1f} "
+            f"{_percentile(latencies, 95) * 1000:>8.1f} {_percentile(latencies, 99) * 1000:>8.1f} "
+            f"{sum(stage.rejected.values()):>6} {sum(stage.errors.values()):>7}"
+        )
+
+    print("\n   per action (all stages):")
+    actions: Dict[str, List[float]] = {}
+    for stage in stages:
+        for action, values in stage.latencies.items():
+            actions.setdefault(action, []).extend(values)
+    for action, values in sorted(actions.items()):
+        print(
+            f"   {action:<12} n={len(values):<7} p50 {statistics.median(values) * 1000:.1f}ms  "
+            f"p99 {_percentile(values, 99) * 1000:.1f}ms"
+        )
+
+    peak = _saturation(stages)
+    print(f"\n🏁 Saturation: ~{peak.throughput():.1f} req/s at {peak.users} users")
+    print(f"   Supabase round trips: {result['fake'].stats.total_calls}")
+
+    violations = result["violations"]
+    if violations.counts:
+        print(f"\n❌ Consistency violations: {violations.counts}")
+        for example in violations.examples:
+            print(f"   {example}")
+        sys.exit(1)
+    print("\n✅ No consistency violations")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Record YouTube Fixtures
+
+Calls the real YouTube Data API once and saves the responses in the
+format bench/fake_youtube.py replays. Needs YOUTUBE_API_KEY; costs about
+3 quota units per channel (+100 per search query).
+
+Usage:
+    cd backend
+    python -m bench.record_youtube_fixtures UCX6OQ3DkcsbYNE6H8uQQuVA UC-lHJZR3Gqxm24_Vd_AJ5Yw --search mrbeast
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
+
+from app.services.youtube_service import YouTubeService
+from bench.fake_youtube import FIXTURES_DIR
+
+
+async def record(channel_ids, queries, videos_per_channel: int, out_dir: str) -> None:
+    youtube = YouTubeService()
+
+    channels = (await youtube._make_request("channels", {
+        "part": "snippet,statistics,brandingSettings,contentDetails",
+        "id": ",".join(channel_ids),
+    })).get("items", [])
+
+    playlist_items = {}
+    videos = []
+    for channel in channels:
+        uploads = channel["contentDetails"]["relatedPlaylists"]["uploads"]
+        items = (await youtube._make_request("playlistItems", {
+            "part": "snippet,contentDetails",
+            "playlistId": uploads,
+            "maxResults": videos_per_channel,
+        })).get("items", [])
+        playlist_items[uploads] = items
+
+        video_ids = [i["contentDetails"]["videoId"] for i in items]
+        if video_ids:
+            videos.extend((await youtube._make_request("videos", {
+                "part": "statistics,snippet",
+                "id": ",".join(video_ids),
+            })).get("items", []))
+
+    searches = {}
+    for query in queries:
+        searches[query] = (await youtube._make_request("search", {
+            "part": "snippet", "type": "channel", "q": query, "maxResults": 10,
+        })).get("items", [])
+
+    os.makedirs(out_dir, exist_ok=True)
+    files = {
+        "meta.json": {
+            "recorded_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "source": "YouTube Data API v3",
+        },
+        "channels.json": channels,
+        "playlistItems.json": playlist_items,
+        "videos.json": videos,
+        "search.json": searches,
+    }
+    for name, content in files.items():
+        with open(os.path.join(out_dir, name), "w") as f:
+            json.dump(content, f, indent=2)
+            f.write("\n")
+
+    print(f"✅ Recorded {len(channels)} channels, {len(videos)} videos, {len(searches)} searches to {out_dir}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record YouTube API responses as fake-server fixtures")
+    parser.add_argument("channel_ids", nargs="+")
+    parser.add_argument("--search", action="append", default=[], help="Search query to record (repeatable)")
+    parser.add_argument("--videos", type=int, default=20, help="Uploads to record per channel")
+    parser.add_argument("--out", default=FIXTURES_DIR)
+    args = parser.parse_args()
+
+    asyncio.run(record(args.channel_ids, args.search, args.videos, args.out))
@@ -0,0 +1,240 @@
+"""
+Serialization Benchmark
+
+Times turning already-fetched rows into a response body for the largest
+list endpoints, the old way against the current one:
+
+- model:  a Pydantic model per row, re-validated against the route's
+          response_model and run through jsonable_encoder by FastAPI, then
+          rendered by the stdlib JSONResponse
+- fast:   the routers' row -> dict builders, rendered by ORJSONResponse
+
+Endpoints: leaderboard (--leaderboard entries, max page 500), creators list
+(--creators rows, max page 100) and price history (--points rows). Both
+paths must produce the same JSON; the benchmark exits non-zero if they
+don't (timestamps are compared as instants, since the fast path passes
+them through as stored).
+
+Usage:
+    cd backend
+    python -m bench.serialization --leaderboard 500 --points 8640
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.models.schemas import (
+    CreatorListItem, LeaderboardEntry, LeaderboardResponse, PriceHistoryResponse, PricePoint
+)
+from app.routers.creators import creator_list_item, price_point
+from app.routers.leaderboard import leaderboard_entry
+from app.services.rolling_stats import RollingStats
+
+
+# ============ Data ============
+
+def _leaderboard_rows(n: int, rng: random.Random) -> List[Dict]:
+    rows = []
+    for i in range(n):
+        invested = rng.uniform(0, 20_000)
+        value = invested * rng.uniform(0.5, 2.0)
+        balance = rng.uniform(0, 10_000)
+        rows.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "username": f"trader{i}",
+            "display_name": f"Trader {i}",
+            "avatar_url": f"https://example.com/avatars/{i}.png",
+            "nmbr_balance": balance,
+            "total_valuation": value + balance,
+            "portfolio_value": value,
+            "total_invested": invested,
+            "roi_pct": (value - invested) / invested * 100 if invested else 0.0,
+        })
+    rows.sort(key=lambda r: r["total_valuation"], reverse=True)
+    return rows
+
+
+def _creator_rows(n: int, rng: random.Random) -> List[Dict]:
+    return [{
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "username": f"creator{i}",
+        "display_name": f"Creator {i}",
+        "avatar_url": f"https://example.com/creators/{i}.jpg",
+        "subscriber_count": rng.randint(1_000, 50_000_000),
+        "token_symbol": f"CR{i}",
+        "pools": {
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "current_price": rng.uniform(0.001, 5),
+            "price_change_24h": rng.uniform(-30, 30),
+            "market_cap": rng.uniform(1_000, 5_000_000),
+            "volume_24h": rng.uniform(0, 100_000),
+        },
+    } for i in range(n)]
+
+
+def _price_rows(n: int, rng: random.Random) -> List[Dict]:
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [{
+        # As PostgREST returns timestamptz
+        "timestamp": (start + timedelta(minutes=5 * i)).isoformat(),
+        "price": rng.uniform(0.01, 2),
+        "volume": rng.uniform(0, 5_000),
+    } for i in range(n)]
+
+
+# ============ Paths ============
+
+def _model_path(response_model: Any, build: Callable[[], Any]) -> Callable[[], bytes]:
+    """Build models, then what FastAPI does with a response_model and JSONResponse."""
+    field = create_response_field(name="bench_response", type_=response_model)
+    loop = asyncio.new_event_loop()
+
+    def render() -> bytes:
+        content = loop.run_until_complete(serialize_response(field=field, response_content=build()))
+        return JSONResponse(content).body
+    return render
+
+
+def endpoints(args: argparse.Namespace) -> Dict[str, Dict[str, Callable[[], bytes]]]:
+    rng = random.Random(args.seed)
+    ranked = _leaderboard_rows(args.leaderboard, rng)
+    creators = _creator_rows(args.creators, rng)
+    prices = _price_rows(args.points, rng)
+    rolling = RollingStats()  # Not hydrated, so overlay leaves the pools as they are
+
+    def leaderboard_models():
+        return LeaderboardResponse(
+            leaderboard=[LeaderboardEntry(
+                rank=i + 1,
+                user_id=user["id"],
+                username=user.get("username"),
+                display_name=user.get("display_name", "Anonymous"),
+                avatar_url=user.get("avatar_url"),
+                total_valuation=user["total_valuation"],
+                portfolio_value=user["portfolio_value"],
+                nmbr_balance=user["nmbr_balance"],
+                roi_pct=user["roi_pct"],
+                total_invested=user["total_invested"]
+            ) for i, user in enumerate(ranked)],
+            my_rank=1,
+            total_users=len(ranked)
+        )
+
+    def leaderboard_fast():
+        return ORJSONResponse({
+            "leaderboard": [leaderboard_entry(i + 1, user) for i, user in enumerate(ranked)],
+            "my_rank": 1,
+            "total_users": len(ranked)
+        }).body
+
+    def creators_models():
+        items = []
+        for row in creators:
+            pool = row["pools"]
+            items.append(CreatorListItem(
+                id=row["id"],
+                username=row["username"],
+                display_name=row["display_name"],
+                avatar_url=row.get("avatar_url"),
+                subscriber_count=row.get("subscriber_count", 0),
+                token_symbol=row["token_symbol"],
+                current_price=float(pool.get("current_price", 0)),
+                price_change_24h=float(pool.get("price_change_24h", 0)),
+                market_cap=float(pool.get("market_cap", 0)),
+                volume_24h=float(pool.get("volume_24h", 0))
+            ))
+        return {"creators": items, "total": len(items), "limit": len(items), "offset": 0}
+
+    def creators_fast():
+        items = [creator_list_item(row, rolling) for row in creators]
+        return ORJSONResponse({"creators": items, "total": len(items), "limit": len(items), "offset": 0}).body
+
+    def prices_models():
+        return PriceHistoryResponse(prices=[
+            PricePoint(timestamp=row["timestamp"], price=float(row["price"]), volume=float(row.get("volume", 0)))
+            for row in prices
+        ])
+
+    def prices_fast():
+        return ORJSONResponse({"prices": [price_point(row) for row in prices]}).body
+
+    return {
+        f"leaderboard ({args.leaderboard})": {
+            "model": _model_path(LeaderboardResponse, leaderboard_models), "fast": leaderboard_fast
+        },
+        f"creators ({args.creators})": {
+            "model": _model_path(dict, creators_models), "fast": creators_fast
+        },
+        f"price history ({args.points})": {
+            "model": _model_path(PriceHistoryResponse, prices_models), "fast": prices_fast
+        },
+    }
+
+
+# ============ Run ============
+
+def _normalized(body: bytes) -> Any:
+    """Parsed JSON with every "timestamp" turned into a comparable instant."""
+    def hook(obj: dict) -> dict:
+        if isinstance(obj.get("timestamp"), str):
+            obj["timestamp"] = datetime.fromisoformat(obj["timestamp"].replace("Z", "+00:00"))
+        return obj
+    return json.loads(body, object_hook=hook)
+
+
+def _time(render: Callable[[], bytes], repeat: int) -> List[float]:
+    render()  # Warm up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response serialization")
+    parser.add_argument("--leaderboard", type=int, default=500, help="Leaderboard entries on the page")
+    parser.add_argument("--creators", type=int, default=100, help="Creators on the page")
+    parser.add_argument("--points", type=int, default=8640, help="Price history points (30d of 5-minute points)")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    mismatches = []
+    print(f"\n🧮 Serialization, median of {args.repeat} runs")
+    print(f"   {'endpoint':<22} {'model ms':>9} {'fast ms':>9} {'speedup':>8} {'KB':>7}")
+    for name, paths in endpoints(args).items():
+        model_body, fast_body = paths["model"](), paths["fast"]()
+        if _normalized(model_body) != _normalized(fast_body):
+            mismatches.append(name)
+        model_ms = statistics.median(_time(paths["model"], args.repeat)) * 1000
+        fast_ms = statistics.median(_time(paths["fast"], args.repeat)) * 1000
+        print(
+            f"   {name:<22} {model_ms:>9.2f} {fast_ms:>9.2f} {model_ms / fast_ms:>7.1f}x "
+            f"{len(fast_body) / 1024:>7.1f}"
+        )
+
+    if mismatches:
+        print(f"\n❌ Payloads differ between paths: {', '.join(mismatches)}")
+        sys.exit(1)
+    print("\n✅ Both paths produce the same payloads")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Startup Benchmark
+
+Measures how long a cold API process takes to become useful, which is
+what a Render free-tier instance pays on every wake-up:
+
+- import:  `import app.main` and create_app() in a fresh interpreter,
+           timed separately
+- ready:   process spawn -> first 200 from GET /health, started the way
+           it is deployed (`uvicorn --factory app.main:create_app`)
+
+Each run is a new process. With --no-bytecode-cache every run also
+compiles from source (fresh deploy, no __pycache__). --breakdown lists the
+modules with the largest cumulative import time (python -X importtime).
+
+The app is started with the scheduler off and no Supabase credentials, so
+nothing external is contacted; background warm-up fails fast and logs.
+
+Usage:
+    cd backend
+    python -m bench.startup --runs 5 --breakdown
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import app.main; "
+    "built = time.perf_counter(); app.main.create_app(); "
+    "print(built - start, time.perf_counter() - built)"
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _env(no_bytecode_cache: bool) -> Dict[str, str]:
+    env = {
+        **os.environ,
+        "SCHEDULER_ENABLED": "false",
+        "LOG_REQUESTS": "false",
+        "SUPABASE_URL": "",
+        "SUPABASE_SERVICE_KEY": "",
+    }
+    if no_bytecode_cache:
+        # A fresh cache directory per run: every module is compiled from source
+        env["PYTHONPYCACHEPREFIX"] = tempfile.mkdtemp(prefix="nombre-pycache-")
+    return env
+
+
+def time_import(no_bytecode_cache: bool) -> Tuple[float, float]:
+    """Seconds spent in `import app.main` and then in create_app(), in a fresh interpreter."""
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=BACKEND_DIR, env=_env(no_bytecode_cache), capture_output=True, text=True, check=True
+    ).stdout
+    imported, created = output.strip().splitlines()[-1].split()
+    return float(imported), float(created)
+
+
+def time_ready(no_bytecode_cache: bool, timeout_s: float = 60.0) -> float:
+    """Seconds from spawning uvicorn to the first 200 from /health."""
+    port = _free_port()
+    # Built up front: creating a client per poll costs more than the polling interval
+    client = httpx.Client(timeout=1.0)
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "--factory", "app.main:create_app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=_env(no_bytecode_cache), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout_s:
+            try:
+                if client.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.HTTPError:
+                pass
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+            time.sleep(0.005)
+        raise TimeoutError(f"/health not ready after {timeout_s}s")
+    finally:
+        client.close()
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def import_breakdown(top: int) -> List[Tuple[str, float]]:
+    """(module, cumulative seconds) for the slowest top-level imports."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main; app.main.create_app()"],
+        cwd=BACKEND_DIR, env=_env(False), capture_output=True, text=True, check=True
+    ).stderr
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            modules.append((name.rstrip(), int(cumulative) / 1e6))
+        except ValueError:
+            continue  # Header line
+    # Indentation encodes nesting; keep only packages (no dots in the stripped name) and app modules
+    roots = [(n.strip(), s) for n, s in modules if "." not in n.strip() or n.strip().startswith("app.")]
+    return sorted(roots, key=lambda item: item[1], reverse=True)[:top]
+
+
+def _stats(values: List[float]) -> str:
+    return (
+        f"median {statistics.median(values) * 1000:7.1f}ms  "
+        f"min {min(values) * 1000:7.1f}ms  max {max(values) * 1000:7.1f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API cold start")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--no-bytecode-cache", action="store_true", help="Compile every module from source on each run")
+    parser.add_argument("--breakdown", action="store_true", help="Show the slowest imports")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    # One throwaway run so __pycache__ is populated (unless we're measuring without it)
+    time_import(args.no_bytecode_cache)
+
+    imports, creates = zip(*[time_import(args.no_bytecode_cache) for _ in range(args.runs)])
+    ready = [time_ready(args.no_bytecode_cache) for _ in range(args.runs)]
+
+    cache = "no bytecode cache" if args.no_bytecode_cache else "warm bytecode cache"
+    print(f"\n🚀 Cold start over {args.runs} runs ({cache})")
+    print(f"   import app.main   {_stats(imports)}")
+    print(f"   create_app()      {_stats(creates)}")
+    print(f"   spawn -> /health  {_stats(ready)}")
+
+    if args.breakdown:
+        print("\n   slowest imports (cumulative):")
+        for name, seconds in import_breakdown(args.top):
+            print(f"   {seconds * 1000:8.1f}ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
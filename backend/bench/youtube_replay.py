@@ -0,0 +1,209 @@
+"""
+YouTube Ingest Replay
+
+Drives YouTubeService against the fake YouTube API (bench/fake_youtube.py)
+so the ingest paths can be load-tested offline and reproducibly:
+
+- ingest:  get_channel_by_id + calculate_30d_views per channel
+           (what add_top_youtubers.py and /creators/youtube/add do)
+- refresh: get_channels_stats in batches of 50 + calculate_30d_views
+           (what the bulk creator stats refresh job does)
+
+The fake server runs in a background thread on a free port. With the same
+seed and flags, two runs see exactly the same injected faults.
+
+Usage:
+    cd backend
+    python -m bench.youtube_replay --scenario refresh --channels 250 --concurrency 8 --latency-ms 50
+"""
+
+import argparse
+import asyncio
+import socket
+import statistics
+import sys
+import os
+import threading
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import uvicorn
+
+from app.services.youtube_service import YouTubeService, QuotaExceededError
+from bench.fake_youtube import FaultConfig, create_fake_youtube_app
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class FakeYouTubeServer:
+    """Runs the fake API in a daemon thread for the duration of a `with` block."""
+
+    def __init__(self, faults: FaultConfig):
+        self.app = create_fake_youtube_app(faults)
+        self.port = _free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}/youtube/v3"
+        self._server = uvicorn.Server(uvicorn.Config(self.app, host="127.0.0.1", port=self.port, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def __enter__(self) -> "FakeYouTubeServer":
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+    @property
+    def stats(self):
+        return self.app.state.stats
+
+
+def synthetic_channel_ids(count: int) -> List[str]:
+    """Stable, well-formed channel IDs (the fake synthesizes data for them)."""
+    return [f"UC{n:022d}" for n in range(count)]
+
+
+async def _timed(latencies: List[float], coro):
+    start = time.perf_counter()
+    try:
+        return await coro
+    finally:
+        latencies.append(time.perf_counter() - start)
+
+
+async def run_ingest(youtube: YouTubeService, channel_ids: List[str], concurrency: int) -> dict:
+    """Fetch full channel data plus 30-day views for each channel."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    outcome = {"ok": 0, "missing": 0, "errors": 0, "quota_exhausted": 0}
+
+    async def ingest_one(channel_id: str):
+        async with semaphore:
+            try:
+                channel = await _timed(latencies, youtube.get_channel_by_id(channel_id))
+                if not channel:
+                    outcome["missing"] += 1
+                    return
+                await _timed(latencies, youtube.calculate_30d_views(channel_id))
+                outcome["ok"] += 1
+            except QuotaExceededError:
+                outcome["quota_exhausted"] += 1
+            except Exception:
+                outcome["errors"] += 1
+
+    await asyncio.gather(*[ingest_one(c) for c in channel_ids])
+    return {"outcome": outcome, "latencies": latencies}
+
+
+async def run_refresh(youtube: YouTubeService, channel_ids: List[str], concurrency: int) -> dict:
+    """Batch-fetch statistics, then 30-day views with bounded concurrency."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    outcome = {"ok": 0, "missing": 0, "errors": 0, "quota_exhausted": 0}
+
+    try:
+        stats = await _timed(latencies, youtube.get_channels_stats(channel_ids))
+    except QuotaExceededError:
+        outcome["quota_exhausted"] += len(channel_ids)
+        return {"outcome": outcome, "latencies": latencies}
+    except httpx.HTTPStatusError:
+        outcome["errors"] += len(channel_ids)
+        return {"outcome": outcome, "latencies": latencies}
+
+    outcome["missing"] = len(channel_ids) - len(stats)
+
+    async def views_one(channel_id: str):
+        async with semaphore:
+            try:
+                await _timed(latencies, youtube.calculate_30d_views(channel_id))
+                outcome["ok"] += 1
+            except QuotaExceededError:
+                outcome["quota_exhausted"] += 1
+            except Exception:
+                outcome["errors"] += 1
+
+    await asyncio.gather(*[views_one(c) for c in stats])
+    return {"outcome": outcome, "latencies": latencies}
+
+
+SCENARIOS = {"ingest": run_ingest, "refresh": run_refresh}
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def replay(scenario: str, channels: int, concurrency: int, faults: FaultConfig) -> dict:
+    """Run one scenario against a fresh fake server and summarize it."""
+    with FakeYouTubeServer(faults) as server:
+        youtube = YouTubeService(api_key="fake", api_base=server.base_url)
+        channel_ids = synthetic_channel_ids(channels)
+
+        start = time.perf_counter()
+        result = await SCENARIOS[scenario](youtube, channel_ids, concurrency)
+        elapsed = time.perf_counter() - start
+
+        latencies = result["latencies"]
+        return {
+            "scenario": scenario,
+            "channels": channels,
+            "concurrency": concurrency,
+            "elapsed_s": round(elapsed, 3),
+            "channels_per_s": round(channels / elapsed, 2) if elapsed > 0 else 0.0,
+            "calls": len(latencies),
+            "p50_ms": round(statistics.median(latencies) * 1000, 2) if latencies else 0.0,
+            "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+            "outcome": result["outcome"],
+            "server": {
+                "requests": dict(server.stats.requests),
+                "errors": dict(server.stats.errors),
+                "quota_used": server.stats.quota_used,
+            },
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay YouTube ingest against the fake API")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="refresh")
+    parser.add_argument("--channels", type=int, default=250)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--quota-error-rate", type=float, default=0.0)
+    parser.add_argument("--quota", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    faults = FaultConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        quota_error_rate=args.quota_error_rate,
+        quota_limit=args.quota,
+        seed=args.seed,
+    )
+    report = asyncio.run(replay(args.scenario, args.channels, args.concurrency, faults))
+
+    print(f"\n📺 {report['scenario']}: {report['channels']} channels, concurrency {report['concurrency']}")
+    print(f"⏱️  {report['elapsed_s']}s ({report['channels_per_s']} channels/s), {report['calls']} service calls")
+    print(f"   p50 {report['p50_ms']}ms  p99 {report['p99_ms']}ms")
+    print(f"   outcome: {report['outcome']}")
+    print(f"   server:  {report['server']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,9 +5,10 @@ Run this once to clean up existing data.
 Usage:
     cd backend
     source venv/bin/activate
-    python scripts/cleanup_token_symbols.py
+    python scripts/cleanup_token_symbols.py [--dry-run] [--chunk-size 500]
 """
 
+import argparse
 import sys
 import os
 
@@ -15,9 +16,10 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.database import get_supabase
+from app.utils.bulk_write import bulk_update, DEFAULT_CHUNK_SIZE
 
 
-def cleanup_token_symbols():
+def cleanup_token_symbols(dry_run: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE):
     """Remove $ prefix from all token symbols."""
     supabase = get_supabase()
     
@@ -28,21 +30,30 @@ def cleanup_token_symbols():
         print("No creators found")
         return
     
-    updated_count = 0
+    rows = []
     for creator in result.data:
         token_symbol = creator.get("token_symbol", "")
         if token_symbol.startswith("$"):
             new_symbol = token_symbol[1:]  # Remove $ prefix
-            supabase.table("creators").update({
-                "token_symbol": new_symbol
-            }).eq("id", creator["id"]).execute()
-            print(f"  ✅ Updated: {token_symbol} → {new_symbol}")
-            updated_count += 1
+            rows.append({"id": creator["id"], "token_symbol": new_symbol})
+            print(f"  {'🔍 Would update' if dry_run else '✅ Updating'}: {token_symbol} → {new_symbol}")
     
-    print(f"\n✅ Updated {updated_count} token symbols")
-
+    write = bulk_update("creators", rows, chunk_size=chunk_size, dry_run=dry_run)
+    
+    if dry_run:
+        print(f"\n🔍 Dry run: {len(write.changes)} token symbols would change")
+        return
+    if write.failed_chunks:
+        print(f"\n❌ {write.failed_chunks} chunks failed: {write.errors[-1]}")
+    
+    print(f"\n✅ Updated {write.written} token symbols")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Remove the $ prefix from token symbols")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would change without writing")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per bulk write")
+    args = parser.parse_args()
+    
     print("🧹 Cleaning up token symbols (removing $ prefix)...\n")
-    cleanup_token_symbols()
+    cleanup_token_symbols(args.dry_run, args.chunk_size)
     print("\n✅ Done!")
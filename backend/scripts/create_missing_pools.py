@@ -1,53 +1,85 @@
 """
 Create pools for creators that are missing them.
 Pool price = CPI / 90000 (matches the pricing formula)
+
+Usage:
+    cd backend
+    source venv/bin/activate
+    python scripts/create_missing_pools.py [--dry-run] [--chunk-size 500]
 """
+
+import argparse
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
+
 from app.database import get_supabase
+from app.utils.bulk_write import bulk_insert, DEFAULT_CHUNK_SIZE
+
+
+def create_missing_pools(dry_run: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Insert a pool for every creator that doesn't have one."""
+    supabase = get_supabase()
+
+    # Get all creator IDs
+    creators_result = supabase.table("creators").select("id, display_name, cpi_score, token_symbol").execute()
+
+    # Get all creator IDs that have pools
+    pools_result = supabase.table("pools").select("creator_id").execute()
+    pool_creator_ids = {p["creator_id"] for p in pools_result.data}
+
+    # Find creators missing pools
+    missing_creators = [c for c in creators_result.data if c["id"] not in pool_creator_ids]
+
+    print(f"Found {len(missing_creators)} creators missing pools:\n")
+
+    rows = []
+    for creator in missing_creators:
+        cpi = creator["cpi_score"] or 500  # Default if somehow null
+
+        # Calculate price: CPI / 90000 (standard formula)
+        price = cpi / 90000
+
+        # Initial supply and market cap
+        initial_supply = 1_000_000
+        market_cap = price * initial_supply
+
+        rows.append({
+            "creator_id": creator["id"],
+            "token_supply": initial_supply,
+            "nmbr_reserve": 10000,  # Default reserve
+            "initial_price": price,
+            "current_price": price,
+            "price_24h_ago": price,
+            "price_change_24h": 0,
+            "volume_24h": 0,
+            "volume_all_time": 0,
+            "market_cap": market_cap,
+            "holder_count": 0,
+        })
+        print(f"  {creator['display_name']:<30} CPI={cpi:>7.1f}  Price={price:.8f}")
+
+    # One multi-row insert per chunk instead of one insert per pool
+    write = bulk_insert("pools", rows, chunk_size=chunk_size, dry_run=dry_run)
+
+    if dry_run:
+        print(f"\n🔍 Dry run: {len(write.changes)} pools would be created")
+        return
+    if write.failed_chunks:
+        print(f"\n✗ {write.failed_chunks} chunks failed: {write.errors[-1]}")
+
+    print(f"\nDone! Created {write.written} pools.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create pools for creators that are missing them")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would be created without writing")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per bulk insert")
+    args = parser.parse_args()
 
-supabase = get_supabase()
-
-# Get all creator IDs
-creators_result = supabase.table("creators").select("id, display_name, cpi_score, token_symbol").execute()
-creator_map = {c["id"]: c for c in creators_result.data}
-
-# Get all creator IDs that have pools
-pools_result = supabase.table("pools").select("creator_id").execute()
-pool_creator_ids = {p["creator_id"] for p in pools_result.data}
-
-# Find creators missing pools
-missing_creators = [c for c in creators_result.data if c["id"] not in pool_creator_ids]
-
-print(f"Found {len(missing_creators)} creators missing pools:\n")
-
-for creator in missing_creators:
-    cpi = creator["cpi_score"] or 500  # Default if somehow null
-    
-    # Calculate price: CPI / 90000 (standard formula)
-    price = cpi / 90000
-    
-    # Initial supply and market cap
-    initial_supply = 1_000_000
-    market_cap = price * initial_supply
-    
-    pool_data = {
-        "creator_id": creator["id"],
-        "token_supply": initial_supply,
-        "nmbr_reserve": 10000,  # Default reserve
-        "initial_price": price,
-        "current_price": price,
-        "price_24h_ago": price,
-        "price_change_24h": 0,
-        "volume_24h": 0,
-        "volume_all_time": 0,
-        "market_cap": market_cap,
-        "holder_count": 0,
-    }
-    
-    result = supabase.table("pools").insert(pool_data).execute()
-    
-    if result.data:
-        print(f"✓ Created pool for {creator['display_name']:<30} CPI={cpi:>7.1f}  Price={price:.8f}")
-    else:
-        print(f"✗ FAILED for {creator['display_name']}")
-
-print(f"\nDone! Created {len(missing_creators)} pools.")
+    create_missing_pools(args.dry_run, args.chunk_size)
@@ -5,9 +5,10 @@ This uses the improved CPI v2 formula that handles missing 30-day view data.
 Usage:
     cd backend
     source venv/bin/activate
-    python scripts/recalculate_cpi.py
+    python scripts/recalculate_cpi.py [--dry-run] [--chunk-size 500]
 """
 
+import argparse
 import asyncio
 import sys
 import os
@@ -15,14 +16,14 @@ import os
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.services.youtube_service import YouTubeService
 from app.database import get_supabase
+from app.utils.bulk_write import bulk_update, DEFAULT_CHUNK_SIZE
+from app.utils.cpi import calculate_cpi_batch, MARKET_CAP_PER_CPI
 
 
-async def recalculate_all_creators():
+async def recalculate_all_creators(dry_run: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE):
     """Recalculate CPI and prices for all creators."""
     supabase = get_supabase()
-    youtube = YouTubeService()
     
     # Get all creators with their pool data
     result = supabase.table("creators").select(
@@ -35,45 +36,58 @@ async def recalculate_all_creators():
     
     print(f"Found {len(result.data)} creators to update\n")
     
-    updated_count = 0
-    for creator in result.data:
-        old_cpi = creator.get("cpi_score", 0)
-        
-        # Calculate new CPI with improved formula
-        new_cpi = youtube.calculate_cpi_score(
-            subscriber_count=creator.get("subscriber_count", 0),
-            view_count_30d=creator.get("view_count_30d", 0),
-            view_count_lifetime=creator.get("view_count_lifetime", 0)
-        )
-        
-        # Calculate new market cap and price
-        new_market_cap = youtube.calculate_initial_market_cap(new_cpi)
-        token_supply = 9_000_000
-        new_price = new_market_cap / token_supply
-        
-        # Update creator CPI
-        supabase.table("creators").update({
-            "cpi_score": new_cpi
-        }).eq("id", creator["id"]).execute()
+    # Score the whole catalogue in one vectorized pass
+    creators = result.data
+    cpi = calculate_cpi_batch(
+        [c.get("subscriber_count") or 0 for c in creators],
+        [c.get("view_count_30d") or 0 for c in creators],
+        [c.get("view_count_lifetime") or 0 for c in creators]
+    )
+    
+    creator_rows = []
+    pool_rows = []
+    for creator, new_cpi, new_price in zip(creators, cpi.cpi_scores, cpi.initial_prices):
+        old_cpi = float(creator.get("cpi_score") or 0)
+        new_cpi = float(new_cpi)
+        new_price = float(new_price)
+        new_market_cap = new_cpi * MARKET_CAP_PER_CPI
         
-        # Update pool with new price and market cap
-        supabase.table("pools").update({
+        creator_rows.append({"id": creator["id"], "cpi_score": new_cpi})
+        pool_rows.append({
+            "creator_id": creator["id"],
             "current_price": new_price,
             "initial_price": new_price,
             "market_cap": new_market_cap,
             "nmbr_reserve": new_market_cap
-        }).eq("creator_id", creator["id"]).execute()
+        })
         
         change = new_cpi - old_cpi
         change_str = f"+{change:.1f}" if change >= 0 else f"{change:.1f}"
         
         print(f"  {creator['display_name'][:30]:<30} CPI: {old_cpi:>6.1f} → {new_cpi:>6.1f} ({change_str}) | Price: {new_price:.6f}")
-        updated_count += 1
     
-    print(f"\n✅ Updated {updated_count} creators with new CPI scores")
+    # Two bulk writes instead of two UPDATEs per creator
+    creators_result = bulk_update("creators", creator_rows, chunk_size=chunk_size, dry_run=dry_run)
+    pools_result = bulk_update("pools", pool_rows, key="creator_id", chunk_size=chunk_size, dry_run=dry_run)
+    
+    if dry_run:
+        print(f"\n🔍 Dry run: {len(creators_result.changes)} creators and {len(pools_result.changes)} pools would change")
+        return
+    
+    for result in (creators_result, pools_result):
+        print(f"\n  {result.table}: {result.written}/{result.rows} rows in {result.chunks} chunks, {result.elapsed_s:.2f}s")
+        if result.failed_chunks:
+            print(f"  ❌ {result.failed_chunks} chunks failed: {result.errors[-1]}")
+    
+    print(f"\n✅ Updated {creators_result.written} creators with new CPI scores")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recalculate CPI and pool prices for all creators")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would change without writing")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per bulk write")
+    args = parser.parse_args()
+    
     print("🔄 Recalculating CPI scores with improved formula v2...\n")
-    asyncio.run(recalculate_all_creators())
+    asyncio.run(recalculate_all_creators(args.dry_run, args.chunk_size))
     print("\n✅ Done!")
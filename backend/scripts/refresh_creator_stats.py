@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Refresh Creator Stats Script
+
+Re-fetches YouTube stats for every creator and recalculates CPI.
+Progress is checkpointed, so if the YouTube quota runs out (or the
+script crashes) running it again continues where it stopped.
+
+Usage:
+    cd backend
+    source venv/bin/activate
+    python scripts/refresh_creator_stats.py [--restart] [--concurrency 8]
+"""
+
+import sys
+import os
+import asyncio
+import argparse
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load environment variables from .env file
+from dotenv import load_dotenv
+load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
+
+from app.services.maintenance_service import refresh_all_creator_stats
+
+
+async def main(restart: bool, concurrency: int, batch_size: int):
+    print("🔄 Refreshing creator stats from YouTube...\n")
+    
+    results = await refresh_all_creator_stats(
+        batch_size=batch_size,
+        concurrency=concurrency,
+        resume=not restart
+    )
+    
+    if results["resumed_from"]:
+        print(f"↪️  Resumed after creator {results['resumed_from']}")
+    
+    print(f"✅ Refreshed: {results['creators_refreshed']} creators in {results['batches']} batches")
+    print(f"❌ Failed: {results['creators_failed']} creators")
+    if results["batches_failed"]:
+        print(f"   {results['batches_failed']} batches skipped after retries, last error: {results['last_error']}")
+    print(f"⏱️  {results['elapsed_s']}s total, {results['creators_per_s']} creators/s")
+    for stage, seconds in results["stage_timings_s"].items():
+        print(f"   {stage:<12} {seconds:>8.3f}s")
+    
+    if results["status"] == "quota_exhausted":
+        print("\n⚠️  YouTube quota exhausted - run again later to resume")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh YouTube stats and CPI for all creators")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start from the first creator")
+    parser.add_argument("--concurrency", type=int, default=8, help="Channels fetched in parallel")
+    parser.add_argument("--batch-size", type=int, default=50, help="Creators per batch (max 50 per YouTube call)")
+    args = parser.parse_args()
+    
+    asyncio.run(main(args.restart, args.concurrency, args.batch_size))
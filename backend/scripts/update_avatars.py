@@ -4,8 +4,17 @@ Update Avatars Script
 
 This script fetches and updates avatar URLs for ALL creators from YouTube.
 Run this periodically to ensure avatar URLs stay fresh (YouTube may rotate CDN URLs).
+
+Wrapper around maintenance_service.refresh_all_avatars, which the API
+scheduler also runs weekly.
+
+Usage:
+    cd backend
+    source venv/bin/activate
+    python scripts/update_avatars.py [--dry-run] [--chunk-size 500]
 """
 
+import argparse
 import sys
 import os
 import asyncio
@@ -17,67 +26,35 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from dotenv import load_dotenv
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
 
-from app.database import get_supabase
-from app.services.youtube_service import youtube_service
+from app.services.maintenance_service import refresh_all_avatars
+from app.utils.bulk_write import DEFAULT_CHUNK_SIZE
 
 
-async def update_all_avatars():
+async def update_all_avatars(dry_run: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE):
     """Refresh avatar URLs for ALL creators from YouTube."""
-    supabase = get_supabase()
-    
-    # Get all creators
-    response = supabase.table("creators").select(
-        "id, username, display_name, youtube_channel_id, avatar_url"
-    ).execute()
-    
-    creators = response.data
-    updated = 0
-    failed = 0
-    skipped = 0
-    
-    print(f"Found {len(creators)} creators to update\n")
-    
-    for creator in creators:
-        channel_id = creator.get("youtube_channel_id")
-        
-        if not channel_id:
-            print(f"⚠️  {creator['display_name']}: No YouTube channel ID, skipping")
-            skipped += 1
-            continue
-            
-        print(f"🔍 Fetching avatar for {creator['display_name']}...", end=" ")
-        
-        try:
-            # Fetch channel data from YouTube
-            channel_data = await youtube_service.get_channel_by_id(channel_id)
-            
-            if channel_data and channel_data.get("avatar_url"):
-                new_avatar = channel_data["avatar_url"]
-                
-                # Update in database
-                supabase.table("creators").update({
-                    "avatar_url": new_avatar
-                }).eq("id", creator["id"]).execute()
-                
-                print(f"✅ Updated")
-                updated += 1
-            else:
-                print(f"❌ No avatar found")
-                failed += 1
-                
-        except Exception as e:
-            print(f"❌ Error: {str(e)}")
-            failed += 1
-        
-        # Small delay to avoid rate limiting
-        await asyncio.sleep(0.2)
-    
+    print("🔍 Fetching avatars from YouTube...\n")
+    result = await refresh_all_avatars(dry_run, chunk_size)
+
+    for name in result["missing"]:
+        print(f"❌ {name}: No avatar found")
+    if result["failed_chunks"]:
+        print(f"❌ {result['failed_chunks']} chunks failed: {result['errors'][-1]}")
+
     print(f"\n{'='*50}")
-    print(f"✅ Updated: {updated} creators")
-    print(f"❌ Failed: {failed} creators")
-    print(f"⚠️  Skipped: {skipped} creators (no channel ID)")
+    if dry_run:
+        print(f"🔍 Dry run: {result['updated']} avatars would change")
+    else:
+        print(f"✅ Updated: {result['updated']} creators")
+    print(f"➖ Unchanged: {result['unchanged']} creators")
+    print(f"❌ Failed: {result['failed']} creators")
+    print(f"⚠️  Skipped: {result['skipped']} creators (no channel ID)")
     print(f"{'='*50}\n")
 
 
 if __name__ == "__main__":
-    asyncio.run(update_all_avatars())
+    parser = argparse.ArgumentParser(description="Refresh creator avatar URLs from YouTube")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would change without writing")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per bulk write")
+    args = parser.parse_args()
+
+    asyncio.run(update_all_avatars(args.dry_run, args.chunk_size))
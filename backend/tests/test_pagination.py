@@ -0,0 +1,53 @@
+"""Keyset pagination filters (app/utils/pagination.py)."""
+
+from app.utils.pagination import after_keyset, keyset_filter
+
+TS = "2026-01-02T03:04:05.678+00:00"
+ROW_ID = "0b7c6c0e-7a53-4f4a-9d5e-2f1d3c4b5a69"
+
+
+class RecordingQuery:
+    """Stands in for a PostgREST builder and records the filters applied."""
+
+    def __init__(self):
+        self.filters = []
+
+    def lte(self, column, value):
+        self.filters.append(("lte", column, value))
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(("gte", column, value))
+        return self
+
+    def or_(self, filters):
+        self.filters.append(("or", filters))
+        return self
+
+
+def test_keyset_filter_descending():
+    assert keyset_filter(TS, ROW_ID, descending=True) == (
+        f'created_at.lt."{TS}",and(created_at.eq."{TS}",id.lt.{ROW_ID})'
+    )
+
+
+def test_keyset_filter_ascending_custom_column():
+    assert keyset_filter(TS, ROW_ID, time_column="timestamp") == (
+        f'timestamp.gt."{TS}",and(timestamp.eq."{TS}",id.gt.{ROW_ID})'
+    )
+
+
+def test_after_keyset_bounds_time_column_descending():
+    query = after_keyset(RecordingQuery(), TS, ROW_ID, descending=True)
+    assert query.filters == [
+        ("lte", "created_at", TS),
+        ("or", keyset_filter(TS, ROW_ID, descending=True)),
+    ]
+
+
+def test_after_keyset_bounds_time_column_ascending():
+    query = after_keyset(RecordingQuery(), TS, ROW_ID, time_column="timestamp")
+    assert query.filters == [
+        ("gte", "timestamp", TS),
+        ("or", keyset_filter(TS, ROW_ID, time_column="timestamp")),
+    ]
@@ -48,7 +48,7 @@ export const TransactionExplorer: React.FC = () => {
                 max_amount: maxAmount ? parseFloat(maxAmount) : undefined
             });
             setTransactions(data.transactions);
-            setTotal(data.total);
+            setTotal(data.total ?? 0);
             setError(null);
         } catch (err) {
             setError(err instanceof Error ? err.message : 'Failed to load transactions');
@@ -217,6 +217,8 @@ class ApiClient {
         if (params.type) searchParams.set('type', params.type);
         if (params.min_amount !== undefined) searchParams.set('min_amount', params.min_amount.toString());
         if (params.max_amount !== undefined) searchParams.set('max_amount', params.max_amount.toString());
+        if (params.cursor) searchParams.set('cursor', params.cursor);
+        if (params.count) searchParams.set('count', params.count);
 
         const query = searchParams.toString() ? `?${searchParams.toString()}` : '';
         return this.request<AdminTransactionListResponse>(`/api/v1/admin/transactions${query}`);
@@ -514,9 +516,10 @@ export interface AdminTransactionItem {
 
 export interface AdminTransactionListResponse {
     transactions: AdminTransactionItem[];
-    total: number;
+    total: number | null;  // null when count is 'none'
     limit: number;
     offset: number;
+    next_cursor: string | null;
 }
 
 export interface AdminTransactionParams {
@@ -529,6 +532,8 @@ export interface AdminTransactionParams {
     type?: 'buy' | 'sell';
     min_amount?: number;
     max_amount?: number;
+    cursor?: string;  // next_cursor from the previous page; takes precedence over offset
+    count?: 'exact' | 'planned' | 'estimated' | 'none';
 }
 
 // Singleton instance
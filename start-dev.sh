@@ -15,7 +15,7 @@ echo "Starting Backend on http://localhost:8000..."
 cd backend
 source venv/bin/activate 2>/dev/null || python3 -m venv venv && source venv/bin/activate
 pip install -r requirements.txt -q
-uvicorn app.main:app --reload --host 0.0.0.0 --port 8000 &
+uvicorn --factory app.main:create_app --reload --host 0.0.0.0 --port 8000 &
 BACKEND_PID=$!
 cd ..
 
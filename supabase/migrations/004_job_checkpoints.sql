@@ -0,0 +1,22 @@
+-- Job Checkpoints
+-- Lets long-running maintenance jobs (e.g. the bulk creator stats refresh)
+-- record how far they got, so a crash or YouTube quota exhaustion resumes
+-- from the last completed batch instead of starting over.
+
+CREATE TABLE IF NOT EXISTS job_checkpoints (
+    job_name TEXT PRIMARY KEY,
+    cursor TEXT,                       -- Last processed key (NULL = start from the beginning)
+    state JSONB DEFAULT '{}'::jsonb,   -- Job-specific progress counters
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE TRIGGER update_job_checkpoints_updated_at
+    BEFORE UPDATE ON job_checkpoints
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+ALTER TABLE job_checkpoints ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role has full access to job_checkpoints"
+    ON job_checkpoints FOR ALL
+    USING (auth.role() = 'service_role');
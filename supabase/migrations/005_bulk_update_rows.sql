@@ -0,0 +1,51 @@
+-- Bulk Update Function
+-- Applies a batch of partial row updates in one statement:
+--   UPDATE <table> SET <cols> FROM jsonb_populate_recordset(...) WHERE <key> matches
+-- Used by app/utils/bulk_write.py so catalogue-wide rewrites (CPI recalculation,
+-- avatar refresh, symbol cleanup) cost one round trip per chunk instead of one per row.
+--
+-- Only the columns present in the JSON objects are updated, which avoids the
+-- NOT NULL problem of partial-row upserts. Every object in a call must have the
+-- same keys (the Python helper groups rows by key set before calling).
+
+CREATE OR REPLACE FUNCTION bulk_update_rows(
+    target_table TEXT,
+    key_column TEXT,
+    rows JSONB
+)
+RETURNS INTEGER AS $$
+DECLARE
+    set_clause TEXT;
+    affected INTEGER;
+BEGIN
+    -- Only tables that catalogue-wide jobs rewrite
+    IF target_table NOT IN ('creators', 'pools') THEN
+        RAISE EXCEPTION 'bulk_update_rows: table % is not allowed', target_table;
+    END IF;
+
+    IF jsonb_array_length(rows) = 0 THEN
+        RETURN 0;
+    END IF;
+
+    SELECT string_agg(format('%I = r.%I', col, col), ', ')
+    INTO set_clause
+    FROM jsonb_object_keys(rows -> 0) AS col
+    WHERE col <> key_column;
+
+    IF set_clause IS NULL THEN
+        RETURN 0;
+    END IF;
+
+    EXECUTE format(
+        'UPDATE %I AS t SET %s FROM jsonb_populate_recordset(NULL::%I, $1) AS r WHERE t.%I = r.%I',
+        target_table, set_clause, target_table, key_column, key_column
+    ) USING rows;
+
+    GET DIAGNOSTICS affected = ROW_COUNT;
+    RETURN affected;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Service role only - never callable with a user JWT
+REVOKE EXECUTE ON FUNCTION bulk_update_rows(TEXT, TEXT, JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION bulk_update_rows(TEXT, TEXT, JSONB) TO service_role;
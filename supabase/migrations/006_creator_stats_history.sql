@@ -0,0 +1,82 @@
+-- Creator Stats History
+-- Append-only record of each creator's YouTube fundamentals and CPI at every
+-- stats refresh. The creators table only keeps the latest values, so this is
+-- what CPI charts and growth signals (e.g. 7-day subscriber velocity) read.
+--
+-- Rows are written in batches by the bulk refresh job and never updated.
+-- Compact on purpose: no surrogate id, the (creator_id, recorded_at) key is
+-- also the only index the queries need.
+
+CREATE TABLE IF NOT EXISTS creator_stats_history (
+    creator_id UUID NOT NULL REFERENCES creators(id) ON DELETE CASCADE,
+    recorded_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    subscriber_count BIGINT NOT NULL DEFAULT 0,
+    view_count_30d BIGINT NOT NULL DEFAULT 0,
+    view_count_lifetime BIGINT NOT NULL DEFAULT 0,
+    video_count INTEGER NOT NULL DEFAULT 0,
+    cpi_score DECIMAL(10,2) NOT NULL,
+    PRIMARY KEY (creator_id, recorded_at)
+);
+
+-- Catalogue-wide "latest N days" scans
+CREATE INDEX IF NOT EXISTS idx_creator_stats_history_recorded_at
+    ON creator_stats_history(recorded_at);
+
+ALTER TABLE creator_stats_history ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Creator stats history is publicly readable"
+    ON creator_stats_history FOR SELECT
+    TO authenticated
+    USING (true);
+
+CREATE POLICY "Service role has full access to creator_stats_history"
+    ON creator_stats_history FOR ALL
+    USING (auth.role() = 'service_role');
+
+-- Subscriber / CPI growth over the last `window_days` for every creator,
+-- comparing the latest snapshot with the newest one at or before the window
+-- start (or the oldest one inside the window if history is shorter).
+-- Both lookups only read the last 2 x window_days (idx_creator_stats_history_recorded_at):
+-- a creator with no snapshot there has no baseline and is left out anyway.
+CREATE OR REPLACE FUNCTION get_creator_velocity(window_days INTEGER DEFAULT 7)
+RETURNS TABLE (
+    creator_id UUID,
+    subscriber_count BIGINT,
+    subscriber_delta BIGINT,
+    subscribers_per_day DECIMAL,
+    cpi_score DECIMAL,
+    cpi_delta DECIMAL,
+    days_covered DECIMAL
+) AS $$
+    WITH latest AS (
+        SELECT DISTINCT ON (h.creator_id) h.*
+        FROM creator_stats_history h
+        WHERE h.recorded_at >= NOW() - make_interval(days => window_days * 2)
+        ORDER BY h.creator_id, h.recorded_at DESC
+    ),
+    baseline AS (
+        SELECT DISTINCT ON (h.creator_id) h.*
+        FROM creator_stats_history h
+        WHERE h.recorded_at >= NOW() - make_interval(days => window_days * 2)
+        ORDER BY h.creator_id,
+            -- Prefer the newest snapshot at/before the window start, then the oldest inside it
+            (h.recorded_at <= NOW() - make_interval(days => window_days)) DESC,
+            CASE WHEN h.recorded_at <= NOW() - make_interval(days => window_days)
+                 THEN EXTRACT(EPOCH FROM h.recorded_at) ELSE -EXTRACT(EPOCH FROM h.recorded_at) END DESC
+    )
+    SELECT
+        l.creator_id,
+        l.subscriber_count,
+        l.subscriber_count - b.subscriber_count,
+        ROUND(
+            (l.subscriber_count - b.subscriber_count)
+            / GREATEST(EXTRACT(EPOCH FROM l.recorded_at - b.recorded_at) / 86400, 1)::DECIMAL,
+            2
+        ),
+        l.cpi_score,
+        l.cpi_score - b.cpi_score,
+        ROUND((EXTRACT(EPOCH FROM l.recorded_at - b.recorded_at) / 86400)::DECIMAL, 2)
+    FROM latest l
+    JOIN baseline b ON b.creator_id = l.creator_id
+    WHERE l.recorded_at > b.recorded_at;
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,161 @@
+-- Set-based Daily Maintenance
+-- One statement per maintenance step, so the daily job makes the same small
+-- number of round trips however many pools and users there are.
+-- Called via RPC from app/services/maintenance_service.py.
+--
+-- Each function returns the number of rows it changed. Rows whose value is
+-- already correct are skipped (IS DISTINCT FROM), which keeps the updated_at
+-- triggers and table bloat down on quiet days.
+
+-- 1. Snapshot current prices for tomorrow's 24h change
+CREATE OR REPLACE FUNCTION maintenance_update_price_snapshots()
+RETURNS INTEGER AS $$
+DECLARE
+    affected INTEGER;
+BEGIN
+    UPDATE pools
+    SET price_24h_ago = current_price
+    WHERE price_24h_ago IS DISTINCT FROM current_price;
+
+    GET DIAGNOSTICS affected = ROW_COUNT;
+    RETURN affected;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 2. 24h volume from transactions, one GROUP BY over the window
+CREATE OR REPLACE FUNCTION maintenance_calculate_volume_24h(
+    since TIMESTAMPTZ DEFAULT NOW() - INTERVAL '24 hours'
+)
+RETURNS INTEGER AS $$
+DECLARE
+    affected INTEGER;
+BEGIN
+    UPDATE pools p
+    SET volume_24h = COALESCE(v.volume, 0)
+    FROM pools p2
+    LEFT JOIN (
+        SELECT pool_id, SUM(nmbr_amount) AS volume
+        FROM transactions
+        WHERE created_at >= since
+        GROUP BY pool_id
+    ) v ON v.pool_id = p2.id
+    WHERE p.id = p2.id
+      AND p.volume_24h IS DISTINCT FROM COALESCE(v.volume, 0);
+
+    GET DIAGNOSTICS affected = ROW_COUNT;
+    RETURN affected;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 3. price_change_24h = (current - 24h ago) / 24h ago * 100
+--    (no snapshot yet counts as no change)
+CREATE OR REPLACE FUNCTION maintenance_calculate_price_changes()
+RETURNS INTEGER AS $$
+DECLARE
+    affected INTEGER;
+BEGIN
+    WITH changes AS (
+        SELECT
+            id,
+            CASE
+                WHEN COALESCE(price_24h_ago, current_price) > 0
+                THEN ROUND(
+                    (current_price - COALESCE(price_24h_ago, current_price))
+                    / COALESCE(price_24h_ago, current_price) * 100,
+                    4
+                )
+                ELSE 0
+            END AS change_pct
+        FROM pools
+    )
+    UPDATE pools p
+    SET price_change_24h = c.change_pct
+    FROM changes c
+    WHERE p.id = c.id
+      AND p.price_change_24h IS DISTINCT FROM c.change_pct;
+
+    GET DIAGNOSTICS affected = ROW_COUNT;
+    RETURN affected;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 4. Market cap = total token supply × current price
+CREATE OR REPLACE FUNCTION maintenance_update_market_caps(
+    total_supply DECIMAL DEFAULT 10000000
+)
+RETURNS INTEGER AS $$
+DECLARE
+    affected INTEGER;
+BEGIN
+    UPDATE pools
+    SET market_cap = total_supply * current_price
+    WHERE market_cap IS DISTINCT FROM total_supply * current_price;
+
+    GET DIAGNOSTICS affected = ROW_COUNT;
+    RETURN affected;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 5. All-time volume from transactions
+CREATE OR REPLACE FUNCTION maintenance_update_volume_all_time()
+RETURNS INTEGER AS $$
+DECLARE
+    affected INTEGER;
+BEGIN
+    UPDATE pools p
+    SET volume_all_time = COALESCE(v.volume, 0)
+    FROM pools p2
+    LEFT JOIN (
+        SELECT pool_id, SUM(nmbr_amount) AS volume
+        FROM transactions
+        GROUP BY pool_id
+    ) v ON v.pool_id = p2.id
+    WHERE p.id = p2.id
+      AND p.volume_all_time IS DISTINCT FROM COALESCE(v.volume, 0);
+
+    GET DIAGNOSTICS affected = ROW_COUNT;
+    RETURN affected;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 6. Portfolio value = Σ holdings × current price, for every user
+CREATE OR REPLACE FUNCTION maintenance_update_portfolio_values()
+RETURNS INTEGER AS $$
+DECLARE
+    affected INTEGER;
+BEGIN
+    UPDATE users u
+    SET portfolio_value = COALESCE(v.value, 0)
+    FROM users u2
+    LEFT JOIN (
+        SELECT h.user_id, SUM(h.token_amount * p.current_price) AS value
+        FROM user_holdings h
+        JOIN pools p ON p.creator_id = h.creator_id
+        WHERE h.token_amount > 0
+        GROUP BY h.user_id
+    ) v ON v.user_id = u2.id
+    WHERE u.id = u2.id
+      AND u.portfolio_value IS DISTINCT FROM COALESCE(v.value, 0);
+
+    GET DIAGNOSTICS affected = ROW_COUNT;
+    RETURN affected;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Service role only
+REVOKE EXECUTE ON FUNCTION maintenance_update_price_snapshots() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION maintenance_calculate_volume_24h(TIMESTAMPTZ) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION maintenance_calculate_price_changes() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION maintenance_update_market_caps(DECIMAL) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION maintenance_update_volume_all_time() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION maintenance_update_portfolio_values() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION maintenance_update_price_snapshots() TO service_role;
+GRANT EXECUTE ON FUNCTION maintenance_calculate_volume_24h(TIMESTAMPTZ) TO service_role;
+GRANT EXECUTE ON FUNCTION maintenance_calculate_price_changes() TO service_role;
+GRANT EXECUTE ON FUNCTION maintenance_update_market_caps(DECIMAL) TO service_role;
+GRANT EXECUTE ON FUNCTION maintenance_update_volume_all_time() TO service_role;
+GRANT EXECUTE ON FUNCTION maintenance_update_portfolio_values() TO service_role;
+
+-- Covering index for the 24h volume window
+CREATE INDEX IF NOT EXISTS idx_tx_created_pool_amount
+    ON transactions(created_at, pool_id) INCLUDE (nmbr_amount);
@@ -0,0 +1,91 @@
+-- Incremental All-time Volume
+-- The nightly all-time volume pass used to re-sum every transaction ever
+-- made. Now each pool carries volume_all_time_settled: the volume of all
+-- transactions up to a watermark kept in job_checkpoints. A run only reads
+-- transactions newer than the previous watermark, so it costs O(new rows).
+--
+-- volume_all_time (which trades also bump live) is then reconciled to
+-- settled + transactions after the new watermark.
+
+ALTER TABLE pools ADD COLUMN IF NOT EXISTS volume_all_time_settled DECIMAL(20,8) NOT NULL DEFAULT 0;
+
+-- Per-pool time-range scans (volume windows, pool activity)
+CREATE INDEX IF NOT EXISTS idx_tx_pool_created ON transactions(pool_id, created_at);
+
+-- Replaces the full-history version from 007_maintenance_functions.sql.
+--
+-- The watermark trails NOW() by `settle_lag` so a trade whose transaction
+-- started before the watermark but committed after it is still counted in
+-- a later run. The first run (or full_rebuild => TRUE) sums everything.
+CREATE OR REPLACE FUNCTION maintenance_update_volume_all_time(
+    full_rebuild BOOLEAN DEFAULT FALSE,
+    settle_lag INTERVAL DEFAULT INTERVAL '5 minutes'
+)
+RETURNS INTEGER AS $$
+DECLARE
+    previous_mark TIMESTAMPTZ;
+    new_mark TIMESTAMPTZ := NOW() - settle_lag;
+    affected INTEGER;
+BEGIN
+    -- Serialize concurrent runs on the checkpoint row
+    INSERT INTO job_checkpoints (job_name, cursor)
+    VALUES ('volume_all_time', NULL)
+    ON CONFLICT (job_name) DO NOTHING;
+
+    SELECT cursor::TIMESTAMPTZ INTO previous_mark
+    FROM job_checkpoints
+    WHERE job_name = 'volume_all_time'
+    FOR UPDATE;
+
+    IF full_rebuild OR previous_mark IS NULL THEN
+        UPDATE pools p
+        SET volume_all_time_settled = COALESCE(v.volume, 0)
+        FROM pools p2
+        LEFT JOIN (
+            SELECT pool_id, SUM(nmbr_amount) AS volume
+            FROM transactions
+            WHERE created_at <= new_mark
+            GROUP BY pool_id
+        ) v ON v.pool_id = p2.id
+        WHERE p.id = p2.id;
+    ELSIF new_mark > previous_mark THEN
+        UPDATE pools p
+        SET volume_all_time_settled = p.volume_all_time_settled + v.volume
+        FROM (
+            SELECT pool_id, SUM(nmbr_amount) AS volume
+            FROM transactions
+            WHERE created_at > previous_mark AND created_at <= new_mark
+            GROUP BY pool_id
+        ) v
+        WHERE p.id = v.pool_id;
+    ELSE
+        new_mark := previous_mark;
+    END IF;
+
+    UPDATE job_checkpoints
+    SET cursor = new_mark::TEXT,
+        state = jsonb_build_object('previous_mark', previous_mark, 'full_rebuild', full_rebuild OR previous_mark IS NULL)
+    WHERE job_name = 'volume_all_time';
+
+    -- Reconcile the live column: settled + the unsettled tail
+    UPDATE pools p
+    SET volume_all_time = p2.volume_all_time_settled + COALESCE(v.volume, 0)
+    FROM pools p2
+    LEFT JOIN (
+        SELECT pool_id, SUM(nmbr_amount) AS volume
+        FROM transactions
+        WHERE created_at > new_mark
+        GROUP BY pool_id
+    ) v ON v.pool_id = p2.id
+    WHERE p.id = p2.id
+      AND p.volume_all_time IS DISTINCT FROM p2.volume_all_time_settled + COALESCE(v.volume, 0);
+
+    GET DIAGNOSTICS affected = ROW_COUNT;
+    RETURN affected;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP FUNCTION IF EXISTS maintenance_update_volume_all_time();
+
+REVOKE EXECUTE ON FUNCTION maintenance_update_volume_all_time(BOOLEAN, INTERVAL) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION maintenance_update_volume_all_time(BOOLEAN, INTERVAL) TO service_role;
@@ -0,0 +1,51 @@
+-- Trailing 24h Price Change
+-- price_change_24h used to be measured against a snapshot taken at cron time,
+-- so it was really "change since last midnight". These functions measure it
+-- against the actual price 24 hours ago, taken from price_history.
+--
+-- get_pool_prices_at() is also used by the API's in-process rolling 24h
+-- windows (app/services/rolling_stats.py) to seed each pool's baseline.
+
+-- Each pool's price as of `at`: the last recorded trade price at or before it,
+-- or the initial price for pools that hadn't traded yet
+CREATE OR REPLACE FUNCTION get_pool_prices_at(at TIMESTAMPTZ)
+RETURNS TABLE (pool_id UUID, price DECIMAL) AS $$
+    SELECT p.id, COALESCE(h.price, p.initial_price)
+    FROM pools p
+    LEFT JOIN LATERAL (
+        SELECT ph.price
+        FROM price_history ph
+        WHERE ph.pool_id = p.id AND ph.timestamp <= at
+        ORDER BY ph.timestamp DESC
+        LIMIT 1
+    ) h ON TRUE;
+$$ LANGUAGE sql STABLE;
+
+-- Replaces the snapshot-based version from 007_maintenance_functions.sql.
+-- Now a reconciliation of the live values the API keeps current.
+CREATE OR REPLACE FUNCTION maintenance_calculate_price_changes()
+RETURNS INTEGER AS $$
+DECLARE
+    affected INTEGER;
+BEGIN
+    WITH changes AS (
+        SELECT
+            p.id,
+            CASE
+                WHEN b.price > 0
+                THEN ROUND((p.current_price - b.price) / b.price * 100, 4)
+                ELSE 0
+            END AS change_pct
+        FROM pools p
+        JOIN get_pool_prices_at(NOW() - INTERVAL '24 hours') b ON b.pool_id = p.id
+    )
+    UPDATE pools p
+    SET price_change_24h = c.change_pct
+    FROM changes c
+    WHERE p.id = c.id
+      AND p.price_change_24h IS DISTINCT FROM c.change_pct;
+
+    GET DIAGNOSTICS affected = ROW_COUNT;
+    RETURN affected;
+END;
+$$ LANGUAGE plpgsql;
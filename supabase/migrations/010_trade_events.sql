@@ -0,0 +1,219 @@
+-- Trade Events Outbox
+-- Per-pool trade aggregates (all-time volume, trade count, fees collected,
+-- holder count) are maintained incrementally from an append-only event log
+-- instead of being patched in the API or re-summed from all transactions.
+--
+-- * Triggers append an event for every transaction and for every holding
+--   that crosses zero (a user becoming / ceasing to be a holder).
+-- * consume_trade_events() folds events after the last checkpointed offset
+--   into pools and advances the offset, so its cost is proportional to new
+--   trades. The API runs it in the background and the daily job runs it too.
+-- * rebuild_pool_trade_aggregates() recomputes everything from scratch for
+--   reconciliation.
+--
+-- Supersedes the watermark-based all-time volume from 008_incremental_volume.sql.
+
+-- ============ Columns ============
+
+ALTER TABLE pools ADD COLUMN IF NOT EXISTS trade_count BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE pools ADD COLUMN IF NOT EXISTS fees_collected DECIMAL(20,8) NOT NULL DEFAULT 0;
+
+-- ============ Event Log ============
+
+CREATE TABLE IF NOT EXISTS trade_events (
+    event_id BIGSERIAL PRIMARY KEY,              -- Consumer offset
+    kind TEXT NOT NULL CHECK (kind IN ('trade', 'holder')),
+    pool_id UUID NOT NULL REFERENCES pools(id) ON DELETE CASCADE,
+    user_id UUID,
+    nmbr_amount DECIMAL(20,8) NOT NULL DEFAULT 0,
+    fee_amount DECIMAL(20,8) NOT NULL DEFAULT 0,
+    holder_delta SMALLINT NOT NULL DEFAULT 0,    -- +1 new holder, -1 holder left
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_trade_events_created ON trade_events(created_at);
+
+ALTER TABLE trade_events ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role has full access to trade_events"
+    ON trade_events FOR ALL
+    USING (auth.role() = 'service_role');
+
+-- ============ Producers ============
+
+CREATE OR REPLACE FUNCTION emit_trade_event()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO trade_events (kind, pool_id, user_id, nmbr_amount, fee_amount)
+    VALUES ('trade', NEW.pool_id, NEW.user_id, NEW.nmbr_amount, COALESCE(NEW.fee_amount, 0));
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER transactions_emit_trade_event
+    AFTER INSERT ON transactions
+    FOR EACH ROW
+    EXECUTE FUNCTION emit_trade_event();
+
+CREATE OR REPLACE FUNCTION emit_holder_event()
+RETURNS TRIGGER AS $$
+DECLARE
+    was_holder BOOLEAN := TG_OP <> 'INSERT' AND OLD.token_amount > 0;
+    is_holder BOOLEAN := TG_OP <> 'DELETE' AND NEW.token_amount > 0;
+    holding_creator UUID := CASE WHEN TG_OP = 'DELETE' THEN OLD.creator_id ELSE NEW.creator_id END;
+    holding_user UUID := CASE WHEN TG_OP = 'DELETE' THEN OLD.user_id ELSE NEW.user_id END;
+BEGIN
+    IF was_holder IS DISTINCT FROM is_holder THEN
+        INSERT INTO trade_events (kind, pool_id, user_id, holder_delta)
+        SELECT 'holder', p.id, holding_user, CASE WHEN is_holder THEN 1 ELSE -1 END
+        FROM pools p
+        WHERE p.creator_id = holding_creator;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER user_holdings_emit_holder_event
+    AFTER INSERT OR UPDATE OF token_amount OR DELETE ON user_holdings
+    FOR EACH ROW
+    EXECUTE FUNCTION emit_holder_event();
+
+-- ============ Consumer ============
+
+-- Fold new events into pools. Only events older than `settle_lag` are taken,
+-- so an event whose transaction committed after a later event_id was
+-- consumed is still picked up (trades are short; the lag is generous).
+CREATE OR REPLACE FUNCTION consume_trade_events(
+    max_events INTEGER DEFAULT 50000,
+    settle_lag INTERVAL DEFAULT INTERVAL '10 seconds',
+    retention INTERVAL DEFAULT INTERVAL '7 days'
+)
+RETURNS JSONB AS $$
+DECLARE
+    from_offset BIGINT;
+    to_offset BIGINT;
+    consumed INTEGER;
+    pools_updated INTEGER;
+BEGIN
+    INSERT INTO job_checkpoints (job_name, cursor)
+    VALUES ('trade_events', '0')
+    ON CONFLICT (job_name) DO NOTHING;
+
+    -- Row lock serializes concurrent consumers
+    SELECT COALESCE(cursor, '0')::BIGINT INTO from_offset
+    FROM job_checkpoints
+    WHERE job_name = 'trade_events'
+    FOR UPDATE;
+
+    SELECT MAX(event_id), COUNT(*) INTO to_offset, consumed
+    FROM (
+        SELECT event_id
+        FROM trade_events
+        WHERE event_id > from_offset
+          AND created_at <= NOW() - settle_lag
+        ORDER BY event_id
+        LIMIT max_events
+    ) batch;
+
+    IF consumed = 0 THEN
+        RETURN jsonb_build_object('consumed', 0, 'pools_updated', 0, 'from_offset', from_offset, 'to_offset', from_offset);
+    END IF;
+
+    UPDATE pools p
+    SET volume_all_time = COALESCE(p.volume_all_time, 0) + e.volume,
+        trade_count = p.trade_count + e.trades,
+        fees_collected = p.fees_collected + e.fees,
+        holder_count = GREATEST(COALESCE(p.holder_count, 0) + e.holders, 0)
+    FROM (
+        SELECT
+            pool_id,
+            SUM(nmbr_amount) FILTER (WHERE kind = 'trade') AS volume,
+            COUNT(*) FILTER (WHERE kind = 'trade') AS trades,
+            SUM(fee_amount) FILTER (WHERE kind = 'trade') AS fees,
+            SUM(holder_delta) AS holders
+        FROM trade_events
+        WHERE event_id > from_offset AND event_id <= to_offset
+        GROUP BY pool_id
+    ) e
+    WHERE p.id = e.pool_id;
+
+    GET DIAGNOSTICS pools_updated = ROW_COUNT;
+
+    UPDATE job_checkpoints
+    SET cursor = to_offset::TEXT,
+        state = jsonb_build_object('last_consumed', consumed)
+    WHERE job_name = 'trade_events';
+
+    -- Consumed events are kept for a while for debugging, then pruned
+    DELETE FROM trade_events
+    WHERE event_id <= to_offset AND created_at < NOW() - retention;
+
+    RETURN jsonb_build_object(
+        'consumed', consumed,
+        'pools_updated', pools_updated,
+        'from_offset', from_offset,
+        'to_offset', to_offset
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recompute every aggregate from transactions / holdings and skip the
+-- offset past all existing events. Used for reconciliation and at install.
+CREATE OR REPLACE FUNCTION rebuild_pool_trade_aggregates()
+RETURNS INTEGER AS $$
+DECLARE
+    affected INTEGER;
+BEGIN
+    -- Take the consumer lock so no batch is folded in twice
+    INSERT INTO job_checkpoints (job_name, cursor)
+    VALUES ('trade_events', '0')
+    ON CONFLICT (job_name) DO NOTHING;
+
+    PERFORM 1 FROM job_checkpoints WHERE job_name = 'trade_events' FOR UPDATE;
+
+    -- Block new trades/holdings while recounting so the offset matches the totals
+    LOCK TABLE transactions, user_holdings IN SHARE MODE;
+
+    UPDATE pools p
+    SET volume_all_time = COALESCE(t.volume, 0),
+        trade_count = COALESCE(t.trades, 0),
+        fees_collected = COALESCE(t.fees, 0),
+        holder_count = COALESCE(h.holders, 0)
+    FROM pools p2
+    LEFT JOIN (
+        SELECT pool_id, SUM(nmbr_amount) AS volume, COUNT(*) AS trades, SUM(COALESCE(fee_amount, 0)) AS fees
+        FROM transactions
+        GROUP BY pool_id
+    ) t ON t.pool_id = p2.id
+    LEFT JOIN (
+        SELECT creator_id, COUNT(*) AS holders
+        FROM user_holdings
+        WHERE token_amount > 0
+        GROUP BY creator_id
+    ) h ON h.creator_id = p2.creator_id
+    WHERE p.id = p2.id;
+
+    GET DIAGNOSTICS affected = ROW_COUNT;
+
+    UPDATE job_checkpoints
+    SET cursor = COALESCE((SELECT MAX(event_id) FROM trade_events), 0)::TEXT,
+        state = jsonb_build_object('rebuilt_at', NOW())
+    WHERE job_name = 'trade_events';
+
+    RETURN affected;
+END;
+$$ LANGUAGE plpgsql;
+
+REVOKE EXECUTE ON FUNCTION consume_trade_events(INTEGER, INTERVAL, INTERVAL) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION rebuild_pool_trade_aggregates() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION consume_trade_events(INTEGER, INTERVAL, INTERVAL) TO service_role;
+GRANT EXECUTE ON FUNCTION rebuild_pool_trade_aggregates() TO service_role;
+
+-- ============ Retire the watermark approach ============
+
+DROP FUNCTION IF EXISTS maintenance_update_volume_all_time(BOOLEAN, INTERVAL);
+ALTER TABLE pools DROP COLUMN IF EXISTS volume_all_time_settled;
+DELETE FROM job_checkpoints WHERE job_name = 'volume_all_time';
+
+-- Start from exact totals
+SELECT rebuild_pool_trade_aggregates();
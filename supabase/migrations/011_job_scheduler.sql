@@ -0,0 +1,83 @@
+-- Job Scheduler
+-- Backing tables for the in-process scheduler (app/services/scheduler.py):
+-- * job_locks: lease-based single-run locks, safe across workers/instances
+-- * job_runs:  run history with status and duration, one row per run
+
+-- ============ Locks ============
+
+CREATE TABLE IF NOT EXISTS job_locks (
+    job_name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,                -- host:pid:nonce of the owning process
+    acquired_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    locked_until TIMESTAMPTZ NOT NULL    -- Lease expiry; renewed by heartbeats
+);
+
+ALTER TABLE job_locks ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role has full access to job_locks"
+    ON job_locks FOR ALL
+    USING (auth.role() = 'service_role');
+
+-- Take the lock if it is free, expired, or already ours (which renews it).
+CREATE OR REPLACE FUNCTION try_acquire_job_lock(
+    lock_name TEXT,
+    lock_holder TEXT,
+    ttl_seconds INTEGER
+)
+RETURNS BOOLEAN AS $$
+DECLARE
+    acquired TEXT;
+BEGIN
+    INSERT INTO job_locks AS l (job_name, holder, acquired_at, locked_until)
+    VALUES (lock_name, lock_holder, NOW(), NOW() + make_interval(secs => ttl_seconds))
+    ON CONFLICT (job_name) DO UPDATE
+        SET holder = EXCLUDED.holder,
+            acquired_at = CASE WHEN l.holder = EXCLUDED.holder THEN l.acquired_at ELSE NOW() END,
+            locked_until = EXCLUDED.locked_until
+        WHERE l.locked_until < NOW() OR l.holder = EXCLUDED.holder
+    RETURNING holder INTO acquired;
+
+    RETURN acquired IS NOT NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION release_job_lock(lock_name TEXT, lock_holder TEXT)
+RETURNS BOOLEAN AS $$
+    WITH released AS (
+        DELETE FROM job_locks
+        WHERE job_name = lock_name AND holder = lock_holder
+        RETURNING 1
+    )
+    SELECT EXISTS (SELECT 1 FROM released);
+$$ LANGUAGE sql;
+
+REVOKE EXECUTE ON FUNCTION try_acquire_job_lock(TEXT, TEXT, INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION release_job_lock(TEXT, TEXT) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION try_acquire_job_lock(TEXT, TEXT, INTEGER) TO service_role;
+GRANT EXECUTE ON FUNCTION release_job_lock(TEXT, TEXT) TO service_role;
+
+-- ============ Run History ============
+
+CREATE TABLE IF NOT EXISTS job_runs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    job_name TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued'
+        CHECK (status IN ('queued', 'running', 'succeeded', 'failed', 'skipped')),
+    trigger TEXT NOT NULL DEFAULT 'schedule' CHECK (trigger IN ('schedule', 'manual')),
+    holder TEXT,
+    params JSONB DEFAULT '{}'::jsonb,
+    result JSONB,
+    error TEXT,
+    started_at TIMESTAMPTZ,
+    finished_at TIMESTAMPTZ,
+    duration_ms INTEGER,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_job_runs_job_created ON job_runs(job_name, created_at DESC);
+
+ALTER TABLE job_runs ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role has full access to job_runs"
+    ON job_runs FOR ALL
+    USING (auth.role() = 'service_role');
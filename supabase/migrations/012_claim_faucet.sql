@@ -0,0 +1,59 @@
+-- Atomic Faucet Claim
+-- Checks and claims the faucet in one conditional UPDATE instead of
+-- select/scan/select/update from the API, so two concurrent claims can't
+-- both pass the checks.
+--
+-- * Same user twice: the second UPDATE waits on the row lock, re-checks
+--   faucet_claimed and matches nothing.
+-- * Same device, two users: the NOT EXISTS probe uses the unique index on
+--   users.device_fingerprint; if both pass it concurrently, the unique
+--   index rejects the second write.
+
+CREATE OR REPLACE FUNCTION claim_faucet(
+    target_user_id UUID,
+    fingerprint TEXT,
+    amount DECIMAL
+)
+RETURNS JSONB AS $$
+DECLARE
+    new_balance DECIMAL;
+    owner_id UUID;
+BEGIN
+    UPDATE users u
+    SET nmbr_balance = COALESCE(u.nmbr_balance, 0) + amount,
+        faucet_claimed = TRUE,
+        device_fingerprint = fingerprint,
+        updated_at = NOW()
+    WHERE u.id = target_user_id
+      AND NOT COALESCE(u.faucet_claimed, FALSE)
+      AND NOT EXISTS (
+          SELECT 1 FROM users other
+          WHERE other.device_fingerprint = fingerprint
+            AND other.id <> target_user_id
+      )
+    RETURNING u.nmbr_balance INTO new_balance;
+
+    IF FOUND THEN
+        RETURN jsonb_build_object('status', 'OK', 'new_balance', new_balance);
+    END IF;
+
+    -- Nothing matched: report why (no race here, the outcome is already decided)
+    IF NOT EXISTS (SELECT 1 FROM users WHERE id = target_user_id) THEN
+        RETURN jsonb_build_object('status', 'USER_NOT_FOUND');
+    END IF;
+
+    IF EXISTS (SELECT 1 FROM users WHERE id = target_user_id AND faucet_claimed) THEN
+        RETURN jsonb_build_object('status', 'ALREADY_CLAIMED');
+    END IF;
+
+    SELECT id INTO owner_id FROM users WHERE device_fingerprint = fingerprint;
+    RETURN jsonb_build_object('status', 'DEVICE_BLOCKED', 'owner_id', owner_id);
+EXCEPTION
+    WHEN unique_violation THEN
+        SELECT id INTO owner_id FROM users WHERE device_fingerprint = fingerprint;
+        RETURN jsonb_build_object('status', 'DEVICE_BLOCKED', 'owner_id', owner_id);
+END;
+$$ LANGUAGE plpgsql;
+
+REVOKE EXECUTE ON FUNCTION claim_faucet(UUID, TEXT, DECIMAL) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION claim_faucet(UUID, TEXT, DECIMAL) TO service_role;
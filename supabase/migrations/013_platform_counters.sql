@@ -0,0 +1,189 @@
+-- Platform Counters
+-- Maintained totals behind /admin/stats, so the dashboard no longer sums
+-- every user balance and every 24h transaction on each refresh.
+--
+-- * platform_counters: running totals (total_users, nmbr_circulating),
+--   kept current by triggers on users. Each total is split over a few
+--   shard rows picked at random, so concurrent trades don't all queue on
+--   one hot row; readers add the shards up.
+-- * platform_activity_buckets: new users and traded volume per 5-minute
+--   bucket (also sharded). The 24h figures are the sum of the buckets that
+--   started within the last 24 hours (up to 5 minutes of the oldest edge
+--   is left out).
+--
+-- Triggers cover every write path (trades, faucet, signup, admin edits),
+-- so nothing in the API has to remember to bump them.
+-- rebuild_platform_counters() recomputes everything for reconciliation.
+
+-- ============ Tables ============
+
+CREATE TABLE IF NOT EXISTS platform_counters (
+    name TEXT NOT NULL,
+    shard SMALLINT NOT NULL,
+    value DECIMAL(24,8) NOT NULL DEFAULT 0,
+    PRIMARY KEY (name, shard)
+);
+
+CREATE TABLE IF NOT EXISTS platform_activity_buckets (
+    bucket_start TIMESTAMPTZ NOT NULL,
+    shard SMALLINT NOT NULL,
+    new_users INTEGER NOT NULL DEFAULT 0,
+    volume DECIMAL(24,8) NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket_start, shard)
+);
+
+ALTER TABLE platform_counters ENABLE ROW LEVEL SECURITY;
+ALTER TABLE platform_activity_buckets ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role has full access to platform_counters"
+    ON platform_counters FOR ALL
+    USING (auth.role() = 'service_role');
+
+CREATE POLICY "Service role has full access to platform_activity_buckets"
+    ON platform_activity_buckets FOR ALL
+    USING (auth.role() = 'service_role');
+
+-- ============ Helpers ============
+
+CREATE OR REPLACE FUNCTION platform_counter_shard()
+RETURNS SMALLINT AS $$
+    SELECT floor(random() * 16)::SMALLINT;
+$$ LANGUAGE sql VOLATILE;
+
+CREATE OR REPLACE FUNCTION platform_bucket(ts TIMESTAMPTZ)
+RETURNS TIMESTAMPTZ AS $$
+    SELECT to_timestamp(floor(extract(epoch FROM ts) / 300) * 300);
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION bump_platform_counter(counter_name TEXT, delta DECIMAL)
+RETURNS VOID AS $$
+    INSERT INTO platform_counters AS c (name, shard, value)
+    VALUES (counter_name, platform_counter_shard(), delta)
+    ON CONFLICT (name, shard) DO UPDATE
+        SET value = c.value + EXCLUDED.value;
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION bump_platform_activity(ts TIMESTAMPTZ, users_delta INTEGER, volume_delta DECIMAL)
+RETURNS VOID AS $$
+    INSERT INTO platform_activity_buckets AS b (bucket_start, shard, new_users, volume)
+    VALUES (platform_bucket(ts), platform_counter_shard(), users_delta, volume_delta)
+    ON CONFLICT (bucket_start, shard) DO UPDATE
+        SET new_users = b.new_users + EXCLUDED.new_users,
+            volume = b.volume + EXCLUDED.volume;
+$$ LANGUAGE sql;
+
+-- ============ Producers ============
+
+CREATE OR REPLACE FUNCTION track_user_counters()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM bump_platform_counter('total_users', 1);
+        PERFORM bump_platform_counter('nmbr_circulating', COALESCE(NEW.nmbr_balance, 0));
+        PERFORM bump_platform_activity(COALESCE(NEW.created_at, NOW()), 1, 0);
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM bump_platform_counter('total_users', -1);
+        PERFORM bump_platform_counter('nmbr_circulating', -COALESCE(OLD.nmbr_balance, 0));
+        IF OLD.created_at >= NOW() - INTERVAL '24 hours' THEN
+            PERFORM bump_platform_activity(OLD.created_at, -1, 0);
+        END IF;
+    ELSIF COALESCE(NEW.nmbr_balance, 0) <> COALESCE(OLD.nmbr_balance, 0) THEN
+        PERFORM bump_platform_counter(
+            'nmbr_circulating', COALESCE(NEW.nmbr_balance, 0) - COALESCE(OLD.nmbr_balance, 0)
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER users_track_platform_counters
+    AFTER INSERT OR UPDATE OF nmbr_balance OR DELETE ON users
+    FOR EACH ROW
+    EXECUTE FUNCTION track_user_counters();
+
+CREATE OR REPLACE FUNCTION track_trade_volume()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM bump_platform_activity(COALESCE(NEW.created_at, NOW()), 0, ABS(COALESCE(NEW.nmbr_amount, 0)));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER transactions_track_trade_volume
+    AFTER INSERT ON transactions
+    FOR EACH ROW
+    EXECUTE FUNCTION track_trade_volume();
+
+-- ============ Readers ============
+
+CREATE OR REPLACE FUNCTION get_platform_stats()
+RETURNS JSONB AS $$
+    SELECT jsonb_build_object(
+        'total_users', COALESCE((SELECT SUM(value) FROM platform_counters WHERE name = 'total_users'), 0)::BIGINT,
+        'nmbr_circulating', COALESCE((SELECT SUM(value) FROM platform_counters WHERE name = 'nmbr_circulating'), 0),
+        'new_users_24h', COALESCE(a.new_users, 0)::BIGINT,
+        'volume_24h', COALESCE(a.volume, 0)
+    )
+    FROM (
+        SELECT SUM(new_users) AS new_users, SUM(volume) AS volume
+        FROM platform_activity_buckets
+        WHERE bucket_start >= NOW() - INTERVAL '24 hours'
+    ) a;
+$$ LANGUAGE sql STABLE;
+
+-- ============ Reconciliation ============
+
+-- Recompute every counter from users / transactions.
+CREATE OR REPLACE FUNCTION rebuild_platform_counters()
+RETURNS JSONB AS $$
+BEGIN
+    -- Block writers while recounting so totals and triggers agree
+    LOCK TABLE users, transactions IN SHARE MODE;
+
+    DELETE FROM platform_counters WHERE TRUE;
+    DELETE FROM platform_activity_buckets WHERE TRUE;
+
+    INSERT INTO platform_counters (name, shard, value)
+    SELECT 'total_users', 0, COUNT(*) FROM users
+    UNION ALL
+    SELECT 'nmbr_circulating', 0, COALESCE(SUM(nmbr_balance), 0) FROM users;
+
+    INSERT INTO platform_activity_buckets (bucket_start, shard, new_users, volume)
+    SELECT bucket_start, 0, SUM(new_users), SUM(volume)
+    FROM (
+        SELECT platform_bucket(created_at) AS bucket_start, 1 AS new_users, 0 AS volume
+        FROM users
+        WHERE created_at >= NOW() - INTERVAL '48 hours'
+        UNION ALL
+        SELECT platform_bucket(created_at), 0, ABS(nmbr_amount)
+        FROM transactions
+        WHERE created_at >= NOW() - INTERVAL '48 hours'
+    ) activity
+    GROUP BY bucket_start;
+
+    RETURN get_platform_stats();
+END;
+$$ LANGUAGE plpgsql;
+
+-- Drop buckets that can no longer fall inside the 24h window.
+CREATE OR REPLACE FUNCTION maintenance_prune_platform_buckets()
+RETURNS INTEGER AS $$
+DECLARE
+    deleted INTEGER;
+BEGIN
+    DELETE FROM platform_activity_buckets
+    WHERE bucket_start < NOW() - INTERVAL '48 hours';
+    GET DIAGNOSTICS deleted = ROW_COUNT;
+    RETURN deleted;
+END;
+$$ LANGUAGE plpgsql;
+
+REVOKE EXECUTE ON FUNCTION get_platform_stats() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION rebuild_platform_counters() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION maintenance_prune_platform_buckets() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION get_platform_stats() TO service_role;
+GRANT EXECUTE ON FUNCTION rebuild_platform_counters() TO service_role;
+GRANT EXECUTE ON FUNCTION maintenance_prune_platform_buckets() TO service_role;
+
+-- Start from exact totals
+SELECT rebuild_platform_counters();
@@ -0,0 +1,33 @@
+-- Ledger Indexes
+-- Composite indexes for the admin global ledger (/admin/transactions),
+-- which pages by keyset on (created_at DESC, id DESC). Each index has the
+-- equality filter first and the sort key after it, so a page for any
+-- supported filter is a bounded index range scan instead of a sort over
+-- every matching row. Btree indexes scan backwards, so ascending order
+-- serves the descending sort too.
+--
+-- * no filter / time range:  (created_at, id)
+-- * user:                    (user_id, created_at, id)
+-- * pool:                    (pool_id, created_at, id)
+-- * type (buy/sell):         (type, created_at, id)
+-- * amount range:            checked while walking whichever index above
+--                            applies; nmbr_amount is INCLUDEd so that check
+--                            doesn't need the heap row
+
+CREATE INDEX IF NOT EXISTS idx_tx_created_id
+    ON transactions(created_at, id) INCLUDE (nmbr_amount);
+CREATE INDEX IF NOT EXISTS idx_tx_user_created_id
+    ON transactions(user_id, created_at, id) INCLUDE (nmbr_amount);
+CREATE INDEX IF NOT EXISTS idx_tx_pool_created_id
+    ON transactions(pool_id, created_at, id) INCLUDE (nmbr_amount);
+CREATE INDEX IF NOT EXISTS idx_tx_type_created_id
+    ON transactions(type, created_at, id) INCLUDE (nmbr_amount);
+
+-- Superseded by the composites above (same leading columns)
+DROP INDEX IF EXISTS idx_tx_created;
+DROP INDEX IF EXISTS idx_tx_user;
+DROP INDEX IF EXISTS idx_tx_pool;
+DROP INDEX IF EXISTS idx_tx_pool_created;
+
+-- Planner statistics back count="planned"/"estimated"
+ANALYZE transactions;
@@ -0,0 +1,142 @@
+-- Ledger Search
+-- Serves the admin ledger's `search` box in one call. Previously the API
+-- looked up matching users, creators and pools separately and pasted their
+-- ids into an or() filter, which could grow past URL limits.
+--
+-- search_transactions() matches a transaction when the search text is:
+-- * its id (full UUID), or
+-- * part of the trader's username / display name, or
+-- * part of the traded creator's token symbol / display name.
+-- It applies the same filters and paging as /admin/transactions (offset or
+-- keyset after (created_at, id)) and returns rows shaped like the
+-- PostgREST embed (users {...}, pools {creators {...}}).
+--
+-- Substring matching uses trigram indexes on the four name columns. The
+-- page is read newest-first straight off the (created_at, id) indexes from
+-- 014 and stops after page_limit + 1 matches; `total` is a separate full
+-- count, run only when count_mode = 'exact'.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_users_username_trgm ON users USING gin (username gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_users_display_name_trgm ON users USING gin (display_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_creators_token_symbol_trgm ON creators USING gin (token_symbol gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_creators_display_name_trgm ON creators USING gin (display_name gin_trgm_ops);
+
+-- Transactions matching a search and the ledger filters. A single-statement
+-- SQL function, so the planner inlines it into each caller and can push the
+-- caller's ORDER BY / LIMIT down to the indexes.
+CREATE OR REPLACE FUNCTION search_transaction_matches(
+    pattern TEXT,
+    tx_id UUID,
+    filter_user_id UUID,
+    filter_pool_id UUID,
+    filter_type TEXT,
+    min_amount DECIMAL,
+    max_amount DECIMAL,
+    since TIMESTAMPTZ
+)
+RETURNS SETOF transactions AS $$
+    SELECT t.*
+    FROM transactions t
+    WHERE (
+            t.id = tx_id
+            OR t.user_id IN (
+                SELECT u.id FROM users u
+                WHERE u.username ILIKE pattern OR u.display_name ILIKE pattern
+            )
+            OR t.pool_id IN (
+                SELECT p.id FROM pools p
+                JOIN creators c ON c.id = p.creator_id
+                WHERE c.token_symbol ILIKE pattern OR c.display_name ILIKE pattern
+            )
+        )
+      AND (filter_user_id IS NULL OR t.user_id = filter_user_id)
+      AND (filter_pool_id IS NULL OR t.pool_id = filter_pool_id)
+      AND (filter_type IS NULL OR t.type = filter_type)
+      AND (min_amount IS NULL OR t.nmbr_amount >= min_amount)
+      AND (max_amount IS NULL OR t.nmbr_amount <= max_amount)
+      AND (since IS NULL OR t.created_at >= since);
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION search_transactions(
+    search_query TEXT,
+    filter_user_id UUID DEFAULT NULL,
+    filter_pool_id UUID DEFAULT NULL,
+    filter_type TEXT DEFAULT NULL,
+    min_amount DECIMAL DEFAULT NULL,
+    max_amount DECIMAL DEFAULT NULL,
+    since TIMESTAMPTZ DEFAULT NULL,
+    after_created_at TIMESTAMPTZ DEFAULT NULL,
+    after_id UUID DEFAULT NULL,
+    page_offset INTEGER DEFAULT 0,
+    page_limit INTEGER DEFAULT 50,
+    count_mode TEXT DEFAULT 'exact'
+)
+RETURNS JSONB AS $$
+DECLARE
+    -- Escape LIKE wildcards so the text is matched literally
+    pattern TEXT := '%' || replace(replace(replace(search_query, '\', '\\'), '%', '\%'), '_', '\_') || '%';
+    tx_id UUID;
+    page JSONB;
+    total BIGINT;
+BEGIN
+    IF search_query ~* '^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$' THEN
+        tx_id := search_query::UUID;
+    END IF;
+
+    SELECT COALESCE(jsonb_agg(
+        to_jsonb(t) || jsonb_build_object(
+            'users', jsonb_build_object(
+                'id', u.id, 'display_name', u.display_name,
+                'username', u.username, 'avatar_url', u.avatar_url
+            ),
+            'pools', jsonb_build_object(
+                'creators', jsonb_build_object('display_name', c.display_name, 'token_symbol', c.token_symbol)
+            )
+        )
+        ORDER BY t.created_at DESC, t.id DESC
+    ), '[]'::jsonb)
+    INTO page
+    FROM (
+        SELECT m.*
+        FROM search_transaction_matches(
+            pattern, tx_id, filter_user_id, filter_pool_id, filter_type, min_amount, max_amount, since
+        ) m
+        -- Always a row comparison (no OR), so first pages use the index too
+        WHERE (m.created_at, m.id) < (
+            COALESCE(after_created_at, 'infinity'::TIMESTAMPTZ),
+            COALESCE(after_id, 'ffffffff-ffff-ffff-ffff-ffffffffffff'::UUID)
+        )
+        ORDER BY m.created_at DESC, m.id DESC
+        OFFSET CASE WHEN after_created_at IS NULL THEN page_offset ELSE 0 END
+        -- One extra row tells the caller whether there is a next page
+        LIMIT page_limit + 1
+    ) t
+    LEFT JOIN users u ON u.id = t.user_id
+    LEFT JOIN pools p ON p.id = t.pool_id
+    LEFT JOIN creators c ON c.id = p.creator_id;
+
+    IF count_mode = 'exact' THEN
+        SELECT COUNT(*) INTO total
+        FROM search_transaction_matches(
+            pattern, tx_id, filter_user_id, filter_pool_id, filter_type, min_amount, max_amount, since
+        );
+    END IF;
+
+    RETURN jsonb_build_object('transactions', page, 'total', total);
+END;
+$$ LANGUAGE plpgsql;
+
+REVOKE EXECUTE ON FUNCTION search_transaction_matches(
+    TEXT, UUID, UUID, UUID, TEXT, DECIMAL, DECIMAL, TIMESTAMPTZ
+) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION search_transaction_matches(
+    TEXT, UUID, UUID, UUID, TEXT, DECIMAL, DECIMAL, TIMESTAMPTZ
+) TO service_role;
+REVOKE EXECUTE ON FUNCTION search_transactions(
+    TEXT, UUID, UUID, TEXT, DECIMAL, DECIMAL, TIMESTAMPTZ, TIMESTAMPTZ, UUID, INTEGER, INTEGER, TEXT
+) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION search_transactions(
+    TEXT, UUID, UUID, TEXT, DECIMAL, DECIMAL, TIMESTAMPTZ, TIMESTAMPTZ, UUID, INTEGER, INTEGER, TEXT
+) TO service_role;